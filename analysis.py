@@ -0,0 +1,105 @@
+import argparse
+import json
+import sys
+import numpy as np
+import diagnostics
+import model
+import subdivision
+
+# Analysis of a project without the user interface: the save_project JSON
+# (units, nodes, elements, materials, sections, load patterns and
+# combinations, and the "udl", "vdl" and "point_loads" member loads) in, load
+# cases and displacements out. main.py builds its load cases with the same
+# functions.
+#
+# Nothing here imports tkinter, and scipy is only loaded by models too large
+# for the dense solver, so a batch worker starts in about the time it takes to
+# import numpy (see benchmark.py --startup):
+#
+#   python analysis.py project.json [more.json ...] [--output results.jsonl]
+
+DENSE_LIMIT = 600  # DOFs up to which a dense numpy solve is quicker than importing scipy
+
+PROJECT_FIELDS = {"units": dict, "properties": dict, "nodes": list, "elements": list, "materials": list,
+                  "sections": list, "load_patterns": list, "load_combinations": list, "udl": list, "vdl": list,
+                  "point_loads": list}
+
+def check_project(project):
+    # Projects come from files and the network: reject fields of the wrong JSON type up front
+    if not isinstance(project, dict):
+        raise ValueError("A project must be a JSON object.")
+    for field, kind in PROJECT_FIELDS.items():
+        if field in project and not isinstance(project[field], kind):
+            raise ValueError(f"Project field '{field}' must be a {'JSON object' if kind is dict else 'list'}.")
+
+def build_model(project, properties=None):
+    check_project(project)
+    nodes, elements, merged = model.merge_coincident_nodes(project["nodes"], project["elements"])
+    return model.build_model(nodes, elements, project["sections"], project["materials"],
+                             properties if properties is not None else project.get("properties", {}))
+
+def load_vector(frame_model, udl_data=(), vdl_data=(), point_load_data=(), members=None, default_load=None):
+    # Member loads as equivalent nodal loads of the members split at them. Stored loads are already in kN
+    # (Import and the load dialogs convert them), so there is no unit conversion here.
+    # default_load: full-length load vector used when there are no member loads; without it that is an error
+    if udl_data or vdl_data or point_load_data:
+        if members is None:
+            members = subdivision.MemberSubdivision(frame_model, udl_data, vdl_data, point_load_data)
+        return members.load_vector()
+    if default_load is None:
+        raise ValueError("Project has no loads.")
+    return np.asarray(default_load, dtype=float)
+
+def load_cases(frame_model, udl_data=(), vdl_data=(), point_load_data=(), load_combinations_data=(), default_load=None):
+    # (case names, load columns, combination factors, member subdivision).
+    # Loads are not assigned to patterns yet, so each combination scales them by its dead factor
+    members = subdivision.MemberSubdivision(frame_model, udl_data, vdl_data, point_load_data)
+    F = load_vector(frame_model, udl_data, vdl_data, point_load_data, members, default_load)
+    if not load_combinations_data:
+        return ["Unfactored"], F[:, None], [1.0], members
+    factors = [c[1] for c in load_combinations_data]
+    return [c[0] for c in load_combinations_data], np.column_stack([f * F for f in factors]), factors, members
+
+def project_load_cases(frame_model, project):
+    check_project(project)
+    return load_cases(frame_model, project.get("udl", []), project.get("vdl", []), project.get("point_loads", []),
+                      project.get("load_combinations", []))
+
+def analyze(project, sparse=None):
+    # Checks, load cases and displacements of one project, as the analysis server returns them.
+    # sparse: None picks the dense solver for models of up to DENSE_LIMIT DOFs
+    frame_model = build_model(project)
+    case_names, F, factors, members = project_load_cases(frame_model, project)
+    issues = diagnostics.diagnose(frame_model, F=F)
+    if issues:
+        raise ValueError(diagnostics.report(issues))
+    if sparse is None:
+        sparse = frame_model.num_dof > DENSE_LIMIT
+    U = frame_model.reanalysis_system(sparse).solve(F)
+    return {"cases": case_names, "displacements": U.T.tolist(), "max_displacement": float(np.abs(U).max())}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyse project JSON files without the user interface.")
+    parser.add_argument("projects", nargs="+", help="save_project JSON files")
+    parser.add_argument("--output", help="JSON lines file for the results, standard output by default")
+    args = parser.parse_args(argv)
+
+    output = open(args.output, 'w') if args.output else sys.stdout
+    failed = 0
+    try:
+        for path in args.projects:
+            try:
+                with open(path, 'r') as f:
+                    record = {"project": path, "status": "done", "result": analyze(json.load(f))}
+            except (OSError, ValueError, KeyError, TypeError, IndexError, np.linalg.LinAlgError) as error:
+                failed += 1
+                message = str(error) if not isinstance(error, KeyError) else f"Missing project field {error}."
+                record = {"project": path, "status": "failed", "error": message}
+            output.write(json.dumps(record) + "\n")
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,205 @@
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+import numpy as np
+import fem
+import generators
+
+KINDS = ["portal", "frame", "truss", "random"]
+DEFAULT_SIZES = [10, 100, 1000, 10000, 100000]  # 1000000 on request with --sizes, see README
+REFERENCE_LIMIT = 2000  # the object-based reference path is O(E * N); skip it above this size
+STARTUP_MODULES = ["numpy", "fem", "analysis", "server"]
+HEAVY_MODULES = ["scipy", "tkinter", "matplotlib"]
+STARTUP_BUDGET = 0.1  # seconds for a batch worker to start
+
+# Run in a fresh interpreter: prints the import time and the heavy packages the import pulled in
+_STARTUP_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+print(" ".join(sorted({{name.split(".")[0] for name in sys.modules}} & set(sys.argv[1:]))))
+"""
+
+def _reference_stages(frame_model, F):
+    nodes = [fem.Node(x, y) for x, y in frame_model.coords]
+    elements = [fem.FrameElement(nodes[a], nodes[b], frame_model.E[i], frame_model.A[i], frame_model.I[i],
+                                 "X" if frame_model.release_start[i] else "", "Y" if frame_model.release_end[i] else "")
+                for i, (a, b) in enumerate(frame_model.connectivity)]
+    state = {}
+    yield "reference_assembly", lambda: state.update(K=fem.assemble_stiffness_matrix(elements, nodes))
+    yield "reference_solve", lambda: state.update(U=fem.solve(state["K"], F, frame_model.boundary_conditions()))
+    yield "reference_recovery", lambda: [fem.get_element_forces(e, state["U"], nodes) for e in elements]
+
+def _batched_stages(frame_model, F):
+    state = {}
+
+    def element_matrices():
+        L, c, s = fem.element_geometry(frame_model.coords, frame_model.connectivity)
+        state["k_local"] = fem.local_stiffness_matrices(L, frame_model.E, frame_model.A, frame_model.I,
+                                                        frame_model.release_start, frame_model.release_end)
+        state["T"] = fem.transformation_matrices(c, s)
+        state["k_global"] = fem.to_global(state["k_local"], state["T"])
+        state["dof_map"] = fem.element_dof_map(frame_model.connectivity)
+
+    yield "element_matrices", element_matrices
+    yield "assembly", lambda: state.update(K=fem.assemble_global_matrix(state["k_global"], state["dof_map"], frame_model.num_dof))
+    yield "threaded_assembly", lambda: fem.assemble_threaded(frame_model.coords, frame_model.connectivity, frame_model.E,
+                                                             frame_model.A, frame_model.I, frame_model.release_start,
+                                                             frame_model.release_end)
+    yield "solve", lambda: state.update(U=fem.solve(state["K"], F, frame_model.boundary_conditions()))
+    yield "recovery", lambda: fem.element_forces(state["k_local"], state["T"], state["U"], state["dof_map"])
+
+def _run_stages(stages, measure_memory):
+    results = {}
+    for name, stage in stages:
+        if measure_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        stage()
+        elapsed = time.perf_counter() - start
+        peak = None
+        if measure_memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        results[name] = (elapsed, peak)
+    return results
+
+def run_case(kind, size, repeats=1, measure_memory=True):
+    frame_model = generators.model_of_size(kind, size)
+    F = generators.nodal_loads(frame_model)
+    stage_sets = [_batched_stages]
+    if frame_model.num_elements <= REFERENCE_LIMIT:
+        stage_sets.append(_reference_stages)
+
+    records = []
+    for stage_set in stage_sets:
+        # Timings come from untraced runs; peak memory from one extra traced run
+        timings = [_run_stages(stage_set(frame_model, F), False) for _ in range(repeats)]
+        memory = _run_stages(stage_set(frame_model, F), True) if measure_memory else {}
+        for name in timings[0]:
+            records.append({
+                "kind": kind,
+                "size": size,
+                "elements": frame_model.num_elements,
+                "dofs": frame_model.num_dof,
+                "stage": name,
+                "seconds": min(t[name][0] for t in timings),
+                "peak_bytes": memory[name][1] if name in memory else None,
+            })
+    return records
+
+def startup_times(modules=STARTUP_MODULES, repeats=5):
+    # Wall time of a new process that imports each module and exits, and of the import alone (best of repeats)
+    records = []
+    for module in modules:
+        runs = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            output = subprocess.run([sys.executable, "-c", _STARTUP_SCRIPT.format(module=module)] + HEAVY_MODULES,
+                                    capture_output=True, text=True, check=True).stdout.splitlines()
+            runs.append((time.perf_counter() - start, float(output[0]), output[1].split() if len(output) > 1 else []))
+        process, imported, heavy = min(runs)
+        records.append({"kind": "startup", "size": 0, "elements": 0, "dofs": 0, "stage": module, "seconds": process,
+                        "import_seconds": imported, "heavy_modules": heavy, "peak_bytes": None})
+    return records
+
+def scaling_exponents(records):
+    # Slope of log(time) against log(elements) for every kind and stage
+    exponents = {}
+    groups = {}
+    for r in records:
+        groups.setdefault((r["kind"], r["stage"]), []).append(r)
+    for (kind, stage), rows in groups.items():
+        rows = [r for r in rows if r["seconds"] > 0]
+        if len({r["elements"] for r in rows}) < 2:
+            continue
+        x = np.log([r["elements"] for r in rows])
+        y = np.log([r["seconds"] for r in rows])
+        exponents[f"{kind}/{stage}"] = float(np.polyfit(x, y, 1)[0])
+    return exponents
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def load_history(path):
+    try:
+        with open(path, 'r') as f:
+            return [json.loads(line) for line in f if line.strip()]
+    except FileNotFoundError:
+        return []
+
+def find_regressions(records, previous, threshold=1.5, min_seconds=1e-3):
+    if previous is None:
+        return []
+    before = {(r["kind"], r["size"], r["stage"]): r["seconds"] for r in previous["records"]}
+    regressions = []
+    for r in records:
+        old = before.get((r["kind"], r["size"], r["stage"]))
+        if old and r["seconds"] > min_seconds and r["seconds"] > threshold * old:
+            regressions.append((r["kind"], r["size"], r["stage"], old, r["seconds"]))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark assembly, solve and recovery across model sizes.")
+    parser.add_argument("--kinds", nargs="+", default=KINDS, choices=KINDS)
+    parser.add_argument("--sizes", nargs="+", type=int, default=DEFAULT_SIZES)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--no-memory", action="store_true", help="skip the traced run used for peak memory")
+    parser.add_argument("--history", default="bench_history.jsonl", help="JSON lines file the run is appended to")
+    parser.add_argument("--threshold", type=float, default=1.5, help="slowdown ratio reported as a regression")
+    parser.add_argument("--startup", nargs="*", metavar="MODULE",
+                        help=f"time worker start-up instead: new processes importing {', '.join(STARTUP_MODULES)} by default")
+    args = parser.parse_args(argv)
+
+    records = []
+    if args.startup is not None:
+        records = startup_times(args.startup or STARTUP_MODULES, max(args.repeats, 5))
+        print(f"{'module':12} {'process ms':>10} {'import ms':>10}  heavy modules")
+        for r in records:
+            over = "  OVER BUDGET" if r["seconds"] > STARTUP_BUDGET else ""
+            print(f"{r['stage']:12} {r['seconds'] * 1e3:10.1f} {r['import_seconds'] * 1e3:10.1f}  "
+                  f"{' '.join(r['heavy_modules']) or '-'}{over}")
+    else:
+        for kind in args.kinds:
+            for size in args.sizes:
+                records += run_case(kind, size, args.repeats, not args.no_memory)
+
+        print(f"{'kind':8} {'elements':>9} {'dofs':>9} {'stage':20} {'seconds':>10} {'peak MB':>9}")
+        for r in records:
+            peak = f"{r['peak_bytes'] / 1e6:9.2f}" if r["peak_bytes"] is not None else f"{'-':>9}"
+            print(f"{r['kind']:8} {r['elements']:9d} {r['dofs']:9d} {r['stage']:20} {r['seconds']:10.5f} {peak}")
+
+    exponents = scaling_exponents(records)
+    if exponents:
+        print("\nScaling exponents (time ~ elements^p):")
+    for key, p in sorted(exponents.items()):
+        print(f"  {key:32} {p:5.2f}")
+
+    # Start-up runs are compared with the previous start-up run, size runs with the previous size run
+    history = [h for h in load_history(args.history) if h.get("startup", False) == (args.startup is not None)]
+    for kind, size, stage, old, new in find_regressions(records, history[-1] if history else None, args.threshold):
+        print(f"REGRESSION {kind} size={size} {stage}: {old:.5f}s -> {new:.5f}s")
+
+    run = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "records": records,
+        "exponents": exponents,
+        "startup": args.startup is not None,
+    }
+    with open(args.history, 'a') as f:
+        f.write(json.dumps(run) + "\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import zipfile
+import numpy as np
+import fem
+
+# Persistent, content-addressed store for analysis artefacts. Entries are .npz
+# files named by a SHA-256 key of what produced them; each one also carries
+# its key and a checksum of its arrays, and an entry that fails either check
+# is deleted and treated as a miss. Reads refresh the file's modification
+# time, and once the directory grows past max_bytes the least recently used
+# entries are removed.
+#
+# cached_solve() keys the factorization by the stiffness model and solver
+# settings, and every load column by the model plus the column scaled to unit
+# peak, so load cases and combinations that are multiples of an earlier
+# column reuse its solution without touching the factorization.
+
+DEFAULT_DIRECTORY = os.path.join(os.path.expanduser("~"), ".cache", "frame_analyzer")
+DEFAULT_MAX_BYTES = 512 * 2**20
+
+def digest(*parts):
+    # SHA-256 over arrays (dtype, shape and bytes), or anything else as canonical JSON
+    h = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, np.ndarray):
+            array = np.ascontiguousarray(part)
+            h.update(f"{array.dtype.str}{array.shape}".encode())
+            h.update(array.tobytes())
+        else:
+            h.update(json.dumps(part, sort_keys=True, separators=(",", ":"), default=str).encode())
+        h.update(b"|")
+    return h.hexdigest()
+
+def model_key(frame_model, **settings):
+    return digest(frame_model.coords, frame_model.connectivity, frame_model.E, frame_model.A, frame_model.I,
+                  frame_model.release_start, frame_model.release_end, list(frame_model.supports), settings)
+
+def _checksum(arrays):
+    return digest(*[arrays[name] for name in sorted(arrays)], sorted(arrays))
+
+class ResultCache:
+    def __init__(self, directory=DEFAULT_DIRECTORY, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+        # Running total of the entry sizes: the directory is only scanned here and when the total passes max_bytes.
+        # Other processes writing to the same directory make it drift until the next scan
+        self.lock = threading.Lock()
+        self.total = self.size()
+
+    def path(self, key):
+        return os.path.join(self.directory, key + ".npz")
+
+    def get(self, key):
+        path = self.path(key)
+        try:
+            with np.load(path, allow_pickle=False) as stored:
+                arrays = {name: stored[name] for name in stored.files}
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, ValueError, EOFError, zipfile.BadZipFile):
+            arrays = None
+        if arrays is not None and str(arrays.pop("_key", "")) == key and str(arrays.pop("_checksum", "")) == _checksum(arrays):
+            os.utime(path)
+            self.hits += 1
+            return arrays
+        self.remove(key)
+        self.misses += 1
+        return None
+
+    def put(self, key, arrays):
+        arrays = {name: np.asarray(value) for name, value in arrays.items()}
+        handle, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(handle, "wb") as f:
+                np.savez(f, _key=np.array(key), _checksum=np.array(_checksum(arrays)), **arrays)
+            size = os.path.getsize(temporary)
+            replaced = _file_size(self.path(key))
+            os.replace(temporary, self.path(key))
+        except BaseException:
+            os.unlink(temporary)
+            raise
+        with self.lock:
+            self.total += size - replaced
+            full = self.total > self.max_bytes
+        if full:
+            self.evict()
+
+    def remove(self, key):
+        size = _file_size(self.path(key))
+        try:
+            os.unlink(self.path(key))
+        except FileNotFoundError:
+            return
+        with self.lock:
+            self.total -= size
+
+    def entries(self):
+        # (modification time, size, path) of every entry, least recently used first
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".npz"):
+                try:
+                    info = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((info.st_mtime_ns, info.st_size, entry.path))
+        return sorted(entries)
+
+    def size(self):
+        return sum(size for mtime, size, path in self.entries())
+
+    def evict(self):
+        entries = self.entries()
+        total = sum(size for mtime, size, path in entries)
+        for mtime, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        with self.lock:
+            self.total = total
+
+    def clear(self):
+        for mtime, size, path in self.entries():
+            os.unlink(path)
+        with self.lock:
+            self.total = 0
+
+def _file_size(path):
+    try:
+        return os.path.getsize(path)
+    except FileNotFoundError:
+        return 0
+
+def _unit_columns(F):
+    # Every column divided by its largest entry (by magnitude), and those scales
+    index = np.abs(F).argmax(axis=0)
+    scale = F[index, np.arange(F.shape[1])]
+    unit = F / np.where(scale == 0, 1.0, scale)
+    # Rounded so that a combination factor's last-bit error does not change the key
+    return np.round(unit, 12) + 0.0, scale
+
+def cached_solve(cache, system, frame_model, F, **settings):
+    # system: a fem.ReanalysisSystem or anything else with solve(F), factorize(factor=None) and factored;
+    # settings: solver options that change the result (precision, sparse, ...)
+    shape = F.shape
+    F = np.asarray(F, dtype=float).reshape(frame_model.num_dof, -1)
+    stiffness = model_key(frame_model, **settings)
+    unit, scale = _unit_columns(F)
+    U = np.zeros(F.shape)
+    missing = {}
+    for j in np.flatnonzero(scale).tolist():
+        key = digest(stiffness, unit[:, j])
+        stored = None if key in missing else cache.get(key)
+        if stored is None:
+            missing.setdefault(key, []).append(j)
+        else:
+            U[:, j] = scale[j] * stored["U"]
+    if missing:
+        factor_key = digest(stiffness, "factor")
+        stored = None if system.factored else cache.get(factor_key)
+        if stored is not None:
+            system.factorize(fem.stored_factor(stored))
+        elif not system.factored:
+            arrays = fem.factor_arrays(system.factorize())
+            if arrays is not None:
+                cache.put(factor_key, arrays)
+        solved = system.solve(unit[:, [columns[0] for columns in missing.values()]])
+        for column, (key, columns) in enumerate(missing.items()):
+            cache.put(key, {"U": solved[:, column]})
+            U[:, columns] = solved[:, [column]] * scale[columns]
+    return U.reshape(shape)
@@ -0,0 +1,146 @@
+import numpy as np
+import fem
+
+# Checks run before the stiffness matrix is factorized, all linear in the
+# model size: connected parts of the element graph, whether each
+# part is supported against both translations and rotation, members with
+# invalid geometry or properties, and free DOFs that no member stiffens (for
+# example a rotation where every member end is released). Each issue names
+# the nodes and elements involved.
+
+GRAPH_LIMIT = 5000  # members above which scipy's graph traversal is worth importing scipy for
+
+class UnionFind:
+    def __init__(self, n):
+        self.parent = list(range(n))
+        self.size = [1] * n
+
+    def find(self, i):
+        parent = self.parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(self, a, b):
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return
+        if self.size[a] < self.size[b]:
+            a, b = b, a
+        self.parent[b] = a
+        self.size[a] += self.size[b]
+
+    def labels(self):
+        return np.array([self.find(i) for i in range(len(self.parent))], dtype=int)
+
+def components(num_nodes, connectivity):
+    # Component label of every node; scipy's traversal for large models when available, union-find otherwise
+    connectivity = np.asarray(connectivity, dtype=int).reshape(-1, 2)
+    csgraph = fem.optional_module("scipy.sparse.csgraph") if len(connectivity) > GRAPH_LIMIT else None
+    if csgraph is not None:
+        graph = fem.sp.csr_matrix((np.ones(len(connectivity)), (connectivity[:, 0], connectivity[:, 1])), shape=(num_nodes, num_nodes))
+        return csgraph.connected_components(graph, directed=False)[1]
+    groups = UnionFind(num_nodes)
+    for a, b in connectivity.tolist():
+        groups.union(a, b)
+    return groups.labels()
+
+def _names(prefix, indices, limit=10):
+    indices = list(indices)
+    names = ", ".join(f"{prefix}{i + 1}" for i in indices[:limit])
+    return names + (f" and {len(indices) - limit} more" if len(indices) > limit else "")
+
+def _issue(kind, message, nodes=(), elements=()):
+    return {"kind": kind, "message": message, "nodes": [int(n) for n in nodes], "elements": [int(e) for e in elements]}
+
+def diagnose(frame_model, tolerance=1e-12, F=None):
+    # F: optional load vector or (num_dof, cases) columns, checked for loads the model cannot carry
+    issues = []
+    coords = frame_model.coords
+    connectivity = frame_model.connectivity
+    n, m = frame_model.num_nodes, frame_model.num_elements
+    supports = frame_model.supports
+
+    # Members that cannot have a stiffness matrix
+    d = coords[connectivity[:, 1]] - coords[connectivity[:, 0]]
+    L = np.hypot(d[:, 0], d[:, 1])
+    bad = np.flatnonzero(L <= 0)
+    if len(bad):
+        issues.append(_issue("geometry", f"Zero-length members: {_names('E', bad)}.", elements=bad))
+    properties = np.column_stack([frame_model.E, frame_model.A, frame_model.I])
+    bad = np.flatnonzero(~np.isfinite(properties).all(axis=1) | (properties <= 0).any(axis=1))
+    if len(bad):
+        issues.append(_issue("properties", f"Members without positive E, A and I: {_names('E', bad)}.", elements=bad))
+
+    # Nodes no member reaches
+    used = np.zeros(n, dtype=bool)
+    used[connectivity.ravel()] = True
+    loose = [i for i in np.flatnonzero(~used).tolist() if not all(c in supports[i] for c in "xyZ")]
+    if loose:
+        issues.append(_issue("unconnected", f"Nodes not connected to any member: {_names('N', loose)}.", nodes=loose))
+
+    # Every connected part needs an x and a y restraint and something that stops it rotating:
+    # a Z restraint, or x restraints at different heights, or y restraints at different x
+    labels = components(n, connectivity)
+    restrained = {c: np.array([c in s for s in supports], dtype=bool) for c in "xyZ"}
+    part_nodes = np.flatnonzero(used)
+    part_nodes = part_nodes[np.argsort(labels[part_nodes], kind="stable")]
+    part_elements = np.argsort(labels[connectivity[:, 0]], kind="stable")
+    node_bounds = np.flatnonzero(np.diff(labels[part_nodes])) + 1
+    element_bounds = np.flatnonzero(np.diff(labels[connectivity[part_elements, 0]])) + 1
+    for nodes, elements in zip(np.split(part_nodes, node_bounds), np.split(part_elements, element_bounds)):
+        x_nodes = nodes[restrained["x"][nodes]]
+        y_nodes = nodes[restrained["y"][nodes]]
+        if len(x_nodes) == 0 or len(y_nodes) == 0:
+            missing = " and ".join(c for c, r in (("x", x_nodes), ("y", y_nodes)) if len(r) == 0)
+            problem = "has no supports" if len(x_nodes) + len(y_nodes) == 0 else f"is not restrained in {missing}"
+        elif not restrained["Z"][nodes].any() and np.ptp(coords[x_nodes, 1]) <= tolerance and np.ptp(coords[y_nodes, 0]) <= tolerance:
+            problem = "can rotate about its supports"
+        else:
+            continue
+        issues.append(_issue("supports", f"The part with nodes {_names('N', nodes)} {problem}.", nodes, elements))
+
+    # Free DOFs without stiffness, from the diagonal of every member's global stiffness matrix
+    if m and not any(i["kind"] in ("geometry", "properties") for i in issues):
+        c, s = d[:, 0] / L, d[:, 1] / L
+        k_local = fem.local_stiffness_matrices(L, frame_model.E, frame_model.A, frame_model.I,
+                                               frame_model.release_start, frame_model.release_end)
+        T = fem.transformation_matrices(c, s)
+        diagonal = np.zeros(frame_model.num_dof)
+        np.add.at(diagonal, fem.element_dof_map(connectivity), np.einsum('eji,ejk,eki->ei', T, k_local, T))
+        free = np.ones(frame_model.num_dof, dtype=bool)
+        free[frame_model.boundary_conditions()] = False
+        free &= np.repeat(used, 3)
+        weak = np.flatnonzero(free & (diagonal <= tolerance * np.abs(diagonal).max()))
+        rotations = weak[weak % 3 == 2] // 3
+        if len(rotations):
+            attached = np.flatnonzero(np.isin(connectivity, rotations).any(axis=1))
+            issues.append(_issue("released", f"Every member end is released at {_names('N', rotations)}; "
+                                 "restrain the rotation (Z) or connect one member rigidly.", rotations, attached))
+        translations = np.unique(weak[weak % 3 != 2] // 3)
+        if len(translations):
+            attached = np.flatnonzero(np.isin(connectivity, translations).any(axis=1))
+            issues.append(_issue("stiffness", f"No member resists movement at {_names('N', translations)} in some "
+                                 "direction.", translations, attached))
+    if F is not None:
+        issues += dropped_loads(frame_model, F, tolerance)
+    return issues
+
+def dropped_loads(frame_model, F, tolerance=1e-12):
+    # Moments at nodes that only connect to truss members: their rotation is held out of the system,
+    # so the moment would silently vanish
+    F = np.asarray(F, dtype=float).reshape(frame_model.num_dof, -1)
+    dofs = fem.truss_rotation_dofs(frame_model.connectivity, frame_model.release_start, frame_model.release_end,
+                                   frame_model.num_nodes)
+    dofs = dofs[["Z" not in frame_model.supports[dof // 3] for dof in dofs.tolist()]]
+    loaded = dofs[np.abs(F[dofs]).max(axis=1) > tolerance * max(np.abs(F).max(), 1.0)] if len(dofs) else dofs
+    if not len(loaded):
+        return []
+    nodes = loaded // 3
+    attached = np.flatnonzero(np.isin(frame_model.connectivity, nodes).any(axis=1))
+    return [_issue("loads", f"Moments at {_names('N', nodes)} cannot be carried: only pin-ended members meet there. "
+                   "Connect a member rigidly, restrain the rotation (Z) or move the moment.", nodes, attached)]
+
+def report(issues):
+    return "\n".join(issue["message"] for issue in issues)
@@ -0,0 +1,155 @@
+import numpy as np
+import subdivision
+
+# Result overlays: deformed shape by Hermite interpolation of the end
+# displacements and N/V/M along every member (or the sub-elements of members
+# split at their loads), evaluated for all of them at once. Members that
+# follow each other in the element list are chained into one polyline so the
+# canvas gets a few long items instead of one per member.
+
+KINDS = ["Deformed", "N", "V", "M"]
+
+def stations(count):
+    return np.linspace(0.0, 1.0, count)
+
+def hermite(count):
+    t = stations(count)
+    return t, np.stack([1 - 3 * t**2 + 2 * t**3, t - 2 * t**2 + t**3, 3 * t**2 - 2 * t**3, -t**2 + t**3])
+
+def deformed_shape(start, u_local, L, c, s, scale, count=11):
+    # (elements, count, 2) displaced positions along every (sub-)element for one load case
+    t, (N1, N2, N3, N4) = hermite(count)
+    L = L[:, None]
+    axial = np.outer(u_local[:, 0], 1 - t) + np.outer(u_local[:, 3], t)
+    transverse = (np.outer(u_local[:, 1], N1) + u_local[:, 2:3] * L * N2
+                  + np.outer(u_local[:, 4], N3) + u_local[:, 5:6] * L * N4)
+    c, s = c[:, None], s[:, None]
+    x = start[:, 0:1] + t * L * c + scale * (c * axial - s * transverse)
+    y = start[:, 1:2] + t * L * s + scale * (s * axial + c * transverse)
+    return np.stack([x, y], axis=2)
+
+def internal_forces(forces_local, L, count=11, p=None, q=None):
+    # N (tension positive), V and M (sagging positive) at the stations of every (sub-)element from
+    # its local end forces and the axial (p) and transverse (q) load varying linearly along it
+    t = stations(count)
+    x = np.outer(L, t)
+    N = np.repeat(-forces_local[:, 0:1], count, axis=1)
+    V = np.repeat(forces_local[:, 1:2], count, axis=1)
+    M = -forces_local[:, 2:3] + forces_local[:, 1:2] * x
+    if p is not None:
+        dp = (p[:, 1:2] - p[:, 0:1]) / L[:, None]
+        N = N - p[:, 0:1] * x - dp * x**2 / 2
+    if q is not None:
+        dq = (q[:, 1:2] - q[:, 0:1]) / L[:, None]
+        V = V + q[:, 0:1] * x + dq * x**2 / 2
+        M = M + q[:, 0:1] * x**2 / 2 + dq * x**3 / 6
+    return {"N": N, "V": V, "M": M}
+
+def diagram(start, values, L, c, s, scale, first=None, last=None):
+    # (elements, count + 2, 2): baseline, the diagram drawn normal to the member, baseline again.
+    # Sub-elements inside a member (first/last False) repeat their own end point instead of the baseline.
+    count = values.shape[1]
+    t = stations(count)
+    along_x = start[:, 0:1] + t * L[:, None] * c[:, None]
+    along_y = start[:, 1:2] + t * L[:, None] * s[:, None]
+    x = along_x - scale * values * s[:, None]
+    y = along_y + scale * values * c[:, None]
+    points = np.stack([x, y], axis=2)
+    before = np.stack([along_x[:, :1], along_y[:, :1]], axis=2)
+    after = np.stack([along_x[:, -1:], along_y[:, -1:]], axis=2)
+    if first is not None:
+        before = np.where(first[:, None, None], before, points[:, :1])
+    if last is not None:
+        after = np.where(last[:, None, None], after, points[:, -1:])
+    return np.concatenate([before, points, after], axis=1)
+
+def chains(connectivity):
+    # [start, stop) runs of consecutive elements where each one starts at the previous one's end node
+    connectivity = np.asarray(connectivity, dtype=int).reshape(-1, 2)
+    if len(connectivity) == 0:
+        return []
+    breaks = np.flatnonzero(connectivity[1:, 0] != connectivity[:-1, 1]) + 1
+    bounds = np.concatenate([[0], breaks, [len(connectivity)]])
+    return list(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
+
+def chain_polylines(points, runs, continuous):
+    # One flattened (x, y, x, y, ...) array per chain. Continuous curves (the deformed shape) share
+    # their end points with the next member, so each member after the first drops its first point.
+    lines = []
+    for start, stop in runs:
+        if continuous:
+            line = np.concatenate([points[start, :1], points[start:stop, 1:].reshape(-1, 2)])
+        else:
+            line = points[start:stop].reshape(-1, 2)
+        lines.append(line.reshape(-1))
+    return lines
+
+class Results:
+    # Displacements for every load case of one analysis; overlays are built on first use.
+    # members is the MemberSubdivision the load vector came from and factors scale its
+    # member loads for each case.
+    def __init__(self, frame_model, U, case_names, count=11, members=None, factors=None):
+        self.frame_model = frame_model
+        self.U = U.reshape(U.shape[0], -1)
+        self.case_names = list(case_names)
+        self.count = count
+        self.members = subdivision.MemberSubdivision(frame_model) if members is None else members
+        self.factors = np.ones(self.U.shape[1]) if factors is None else np.asarray(factors, dtype=float)
+
+        # Sub-elements, in member order
+        members = self.members
+        m = members.segment_member
+        self.L = members.segment_length
+        self.c, self.s = members.c[m], members.s[m]
+        origin = frame_model.coords[frame_model.connectivity[m, 0]]
+        self.start = origin + members.segment_start[:, None] * np.column_stack([self.c, self.s])
+        offsets = members.segment_offsets
+        self.first = np.zeros(len(m), dtype=bool)
+        self.first[offsets[:-1][members.points > 1]] = True
+        self.last = np.zeros(len(m), dtype=bool)
+        self.last[offsets[1:][members.points > 1] - 1] = True
+        self.runs = [(int(offsets[a]), int(offsets[b])) for a, b in chains(frame_model.connectivity)]
+
+        extent = np.ptp(frame_model.coords, axis=0).max() if frame_model.num_nodes else 1.0
+        self.extent = extent if extent > 0 else 1.0
+        self._cache = {}
+
+    def case(self, name):
+        return self.case_names.index(name)
+
+    def displacements(self, case):
+        return self.U[:, case]
+
+    def recover(self, case):
+        # (local end displacements, local end forces) of every sub-element
+        key = ("recover", case)
+        if key not in self._cache:
+            self._cache[key] = self.members.recover(self.U[:, case], self.factors[case])
+        return self._cache[key]
+
+    def deformed_scale(self):
+        # Largest translation across all cases drawn as 5% of the model size
+        translations = np.abs(self.U.reshape(-1, 3, self.U.shape[1])[:, :2]).max() if self.U.size else 0.0
+        return 0.05 * self.extent / translations if translations > 0 else 0.0
+
+    def polylines(self, kind, case):
+        key = (kind, case)
+        if key not in self._cache:
+            self._cache[key] = self._polylines(kind, case)
+        return self._cache[key]
+
+    def _polylines(self, kind, case):
+        if kind == "Deformed":
+            u = self.recover(case)[0]
+            points = deformed_shape(self.start, u, self.L, self.c, self.s, self.deformed_scale(), self.count)
+            return chain_polylines(points, self.runs, continuous=True)
+        # Moments are drawn on the tension side
+        values = self.internal_forces(case)[kind] * (-1 if kind == "M" else 1)
+        peak = np.abs(values).max() if values.size else 0.0
+        scale = 0.1 * self.extent / peak if peak > 0 else 0.0
+        points = diagram(self.start, values, self.L, self.c, self.s, scale, self.first, self.last)
+        return chain_polylines(points, self.runs, continuous=False)
+
+    def internal_forces(self, case):
+        factor = self.factors[case]
+        return internal_forces(self.recover(case)[1], self.L, self.count, factor * self.members.p, factor * self.members.q)
@@ -0,0 +1,235 @@
+import multiprocessing
+import os
+from multiprocessing import shared_memory
+import numpy as np
+import fem
+import profiling
+import substructure
+
+# Domain decomposition across worker processes. The elements are split into
+# subdomains by recursive coordinate bisection; nodes used by more than one
+# subdomain form the interface. Each worker assembles its own subdomain from
+# the element matrices in shared memory, factorizes the interior block once
+# and returns its dense interface Schur complement. The parent solves the
+# assembled interface system, and the workers then back-substitute their
+# interiors straight into the shared displacement array.
+
+def partition(frame_model, parts):
+    # Subdomain per element; element midpoints are bisected along the longer side until there are `parts` groups
+    coords = frame_model.coords
+    middle = (coords[frame_model.connectivity[:, 0]] + coords[frame_model.connectivity[:, 1]]) / 2
+    labels = np.zeros(len(middle), dtype=np.int64)
+    pending = [(np.arange(len(middle)), 0, max(1, min(parts, len(middle))))]
+    while pending:
+        indices, first, count = pending.pop()
+        if count == 1:
+            labels[indices] = first
+            continue
+        left = count // 2
+        k = len(indices) * left // count
+        points = middle[indices]
+        axis = np.ptp(points, axis=0).argmax()
+        order = np.argpartition(points[:, axis], k)
+        pending.append((indices[order[:k]], first, left))
+        pending.append((indices[order[k:]], first + left, count - left))
+    return labels
+
+def _share(array):
+    array = np.ascontiguousarray(array)
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, array.dtype, buffer=block.buf)[...] = array
+    return block, (block.name, array.shape, array.dtype.str)
+
+def _attach(spec):
+    name, shape, dtype = spec
+    block = shared_memory.SharedMemory(name=name)
+    return block, np.ndarray(shape, np.dtype(dtype), buffer=block.buf)
+
+def _matrix(rows, cols, values, n, sparse):
+    keep = (rows >= 0) & (cols >= 0)
+    if sparse:
+        return fem.sp.csr_matrix((values[keep], (rows[keep], cols[keep])), shape=(n, n))
+    K = np.zeros((n, n))
+    np.add.at(K, (rows[keep], cols[keep]), values[keep])
+    return K
+
+def _dense(K):
+    return K.toarray() if fem.issparse(K) else np.asarray(K)
+
+def _worker(connection, specs, start, stop):
+    blocks = {}
+    arrays = {}
+    try:
+        for name, spec in specs.items():
+            blocks[name], arrays[name] = _attach(spec)
+        elements = arrays["order"][start:stop]
+        dof_map = arrays["dof_map"][elements]
+        reduced = arrays["reduced"]
+        interface = arrays["interface"]
+
+        # Local numbering: interior DOFs first, then this subdomain's interface DOFs
+        dofs = np.unique(dof_map)
+        dofs = dofs[reduced[dofs] >= 0]
+        interior = dofs[interface[dofs] < 0]
+        boundary = dofs[interface[dofs] >= 0]
+        local = np.full(len(reduced), -1)
+        local[interior] = np.arange(len(interior))
+        local[boundary] = len(interior) + np.arange(len(boundary))
+        d = local[dof_map]
+        K = _matrix(np.repeat(d, 6, axis=1).ravel(), np.tile(d, (1, 6)).ravel(), arrays["k_global"][elements].ravel(),
+                    len(dofs), fem.sp is not None)
+        ni = len(interior)
+        Kib = _dense(K[:ni, ni:])
+        Kbb = _dense(K[ni:, ni:])
+        if ni:
+            factor = fem.factorize(K[:ni, :ni])
+            X = factor.solve(Kib).reshape(ni, -1)
+            S = Kbb - Kib.T @ X
+        else:
+            S = Kbb
+    except (RuntimeError, np.linalg.LinAlgError) as error:
+        connection.send((None, f"Subdomain interior cannot be factorized: {error}"))
+        S = None
+    except Exception as error:
+        # Anything else (out of memory, a bad shared block) is reported too, so the parent can shut down cleanly
+        connection.send((None, f"Subdomain worker failed: {type(error).__name__}: {error}"))
+        S = None
+    if S is not None:
+        connection.send((interface[boundary], S))
+
+    y = None
+    while True:
+        message = connection.recv()
+        if message[0] == "forward":
+            block, F = _attach(message[1])
+            y = factor.solve(F[interior]).reshape(ni, -1) if ni else np.zeros((0, F.shape[1]))
+            connection.send(Kib.T @ y)
+            del F
+            block.close()
+        elif message[0] == "back":
+            block, U = _attach(message[1])
+            if ni:
+                U[interior] = y - X @ U[boundary]
+            connection.send("done")
+            del U
+            block.close()
+        else:
+            break
+    arrays.clear()
+    for block in blocks.values():
+        block.close()
+
+class DomainSolver:
+    def __init__(self, frame_model, parts=None, context=None):
+        # parts: number of subdomains and worker processes, all cores by default
+        parts = parts or os.cpu_count() or 1
+        self.num_dof = frame_model.num_dof
+        L, c, s = fem.element_geometry(frame_model.coords, frame_model.connectivity)
+        k_local = fem.local_stiffness_matrices(L, frame_model.E, frame_model.A, frame_model.I,
+                                               frame_model.release_start, frame_model.release_end)
+        k_global = fem.to_global(k_local, fem.transformation_matrices(c, s))
+        dof_map = fem.element_dof_map(frame_model.connectivity)
+
+        self.labels = partition(frame_model, parts)
+        internal_node = substructure.internal_nodes(frame_model.connectivity, self.labels, frame_model.num_nodes)
+        self.free_dof = fem.get_free_dofs(self.num_dof, frame_model.boundary_conditions())
+        reduced = np.full(self.num_dof, -1)
+        reduced[self.free_dof] = np.arange(len(self.free_dof))
+        self.interface_dof = self.free_dof[~np.repeat(internal_node, 3)[self.free_dof]]
+        interface = np.full(self.num_dof, -1)
+        interface[self.interface_dof] = np.arange(len(self.interface_dof))
+
+        order = np.argsort(self.labels, kind="stable")
+        bounds = np.concatenate([[0], np.flatnonzero(np.diff(self.labels[order])) + 1, [len(order)]])
+        self.blocks = []
+        self.workers = []
+        try:
+            self._start(k_global, dof_map, order, bounds, reduced, interface, context)
+        except BaseException:
+            # No worker processes or shared memory blocks outlive a failed start
+            self.close()
+            raise
+
+    def _start(self, k_global, dof_map, order, bounds, reduced, interface, context):
+        specs = {}
+        for name, array in (("k_global", k_global.reshape(-1, 36)), ("dof_map", dof_map), ("order", order),
+                            ("reduced", reduced), ("interface", interface)):
+            block, specs[name] = _share(array)
+            self.blocks.append(block)
+
+        context = context or multiprocessing.get_context()
+        for start, stop in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+            parent, child = context.Pipe()
+            process = context.Process(target=_worker, args=(child, specs, start, stop), daemon=True)
+            process.start()
+            self.workers.append((process, parent))
+
+        # Interface system from the subdomain Schur complements
+        rows, cols, values = [], [], []
+        self.worker_interface = []
+        errors = []
+        for process, connection in self.workers:
+            indices, S = connection.recv()
+            if indices is None:
+                errors.append(S)
+                continue
+            self.worker_interface.append(indices)
+            rows.append(np.repeat(indices, len(indices)))
+            cols.append(np.tile(indices, len(indices)))
+            values.append(S.ravel())
+        if errors:
+            raise ValueError(errors[0])
+        n = len(self.interface_dof)
+        S = _matrix(np.concatenate(rows), np.concatenate(cols), np.concatenate(values), n, fem.sp is not None)
+        self._factor = fem.factorize(S) if n else None
+
+    @profiling.profiled("domain_solve")
+    def solve(self, F):
+        shape = F.shape
+        F = np.asarray(F, dtype=float).reshape(self.num_dof, -1)
+        F_block, F_spec = _share(F)
+        U_block, U_spec = _share(np.zeros_like(F))
+        try:
+            for process, connection in self.workers:
+                connection.send(("forward", F_spec))
+            g = F[self.interface_dof]
+            for (process, connection), indices in zip(self.workers, self.worker_interface):
+                g[indices] -= connection.recv()
+            U = np.ndarray(F.shape, F.dtype, buffer=U_block.buf)
+            if self._factor is not None:
+                U[self.interface_dof] = self._factor.solve(g).reshape(len(self.interface_dof), -1)
+            for process, connection in self.workers:
+                connection.send(("back", U_spec))
+            for process, connection in self.workers:
+                connection.recv()
+            result = U.copy().reshape(shape)
+            del U
+            return result
+        finally:
+            for block in (F_block, U_block):
+                block.close()
+                block.unlink()
+
+    def close(self):
+        for process, connection in self.workers:
+            try:
+                connection.send(("stop",))
+            except OSError:
+                pass  # the worker has already exited
+        for process, connection in self.workers:
+            process.join(5)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+            connection.close()
+        self.workers = []
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+        self.blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,4 +1,34 @@
+import importlib
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
+import profiling
+
+# scipy takes longer to import than numpy and every analysis module together,
+# so it is imported on first use: fem.sp, fem.sla and fem.spla resolve through
+# __getattr__, and the functions here call _scipy() before using them. A
+# process that only solves small dense models never loads it.
+_SCIPY = {"sp": "scipy.sparse", "sla": "scipy.linalg", "spla": "scipy.sparse.linalg"}
+
+def optional_module(name):
+    # The module, or None when it is not installed
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+def _scipy():
+    # Imports sp, sla and spla (None without scipy); True when scipy is available
+    if "sp" not in globals():
+        globals().update({alias: optional_module(name) for alias, name in _SCIPY.items()})
+    return sp is not None
+
+def __getattr__(name):
+    if name in _SCIPY:
+        _scipy()
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 class FrameElement:
     def __init__(self, node1, node2, E, A, I, moment_release_start="", moment_release_end=""):
@@ -38,16 +68,6 @@ def get_element_stiffness_matrix(element):
     k[2, 4] = -6 * E * I / L**2
     k[2, 5] = 2 * E * I / L
 
-    if "X" in element.moment_release_start:
-        k[2,2] = 0
-        k[2,5] = 0
-        k[5,2] = 0
-
-    if "Y" in element.moment_release_end:
-        k[5,5] = 0
-        k[2,5] = 0
-        k[5,2] = 0
-
     k[4, 1] = -12 * E * I / L**3
     k[4, 2] = -6 * E * I / L**2
     k[4, 4] = 12 * E * I / L**3
@@ -58,6 +78,21 @@ def get_element_stiffness_matrix(element):
     k[5, 4] = -6 * E * I / L**2
     k[5, 5] = 4 * E * I / L
 
+    # Moment releases: statically condense the released rotation
+    if "X" in element.moment_release_start:
+        k = condense_dof(k, 2)
+
+    if "Y" in element.moment_release_end:
+        k = condense_dof(k, 5)
+
+    return k
+
+def condense_dof(k, dof):
+    if k[dof, dof] == 0:
+        return k
+    k = k - np.outer(k[:, dof], k[dof, :]) / k[dof, dof]
+    k[dof, :] = 0
+    k[:, dof] = 0
     return k
 
 def get_transformation_matrix(element):
@@ -80,43 +115,72 @@ def get_transformation_matrix(element):
 
     return T
 
+@profiling.profiled()
 def assemble_stiffness_matrix(elements, nodes):
     num_nodes = len(nodes)
     K = np.zeros((num_nodes * 3, num_nodes * 3))
+    if not elements:
+        return K
 
+    index = {id(node): i for i, node in enumerate(nodes)}
+    k_global = np.empty((len(elements), 6, 6))
+    ends = np.empty((len(elements), 2), dtype=int)
     for i, element in enumerate(elements):
         k_local = get_element_stiffness_matrix(element)
         T = get_transformation_matrix(element)
-        k_global = T.T @ k_local @ T
-
-        n1 = nodes.index(element.node1)
-        n2 = nodes.index(element.node2)
-
-        dof_map = [n1*3, n1*3+1, n1*3+2, n2*3, n2*3+1, n2*3+2]
-
-        for r in range(6):
-            for c in range(6):
-                K[dof_map[r], dof_map[c]] += k_global[r, c]
+        k_global[i] = T.T @ k_local @ T
+        ends[i] = index[id(element.node1)], index[id(element.node2)]
 
+    # One scatter-add for all elements instead of 36 item updates each
+    dof_map = element_dof_map(ends)
+    np.add.at(K, (np.repeat(dof_map, 6, axis=1), np.tile(dof_map, (1, 6))), k_global.reshape(-1, 36))
     return K
 
-def solve(K, F, boundary_conditions):
-    num_dof = K.shape[0]
-    free_dof = []
-    for i in range(num_dof):
-        if i not in boundary_conditions:
-            free_dof.append(i)
+def get_free_dofs(num_dof, boundary_conditions):
+    free = np.ones(num_dof, dtype=bool)
+    free[np.asarray(boundary_conditions, dtype=int)] = False
+    return np.flatnonzero(free)
 
-    K_free = K[np.ix_(free_dof, free_dof)]
+@profiling.profiled()
+def solve(K, F, boundary_conditions, prescribed=None, precision="double"):
+    # prescribed: optional full-length displacement vector; its values at the
+    # restrained DOFs are imposed as support settlements. precision="mixed"
+    # factorizes in float32 and refines to float64 accuracy (see factorize)
+    num_dof = K.shape[0]
+    free_dof = get_free_dofs(num_dof, boundary_conditions)
+    fixed_dof = np.asarray(boundary_conditions, dtype=int)
     F_free = F[free_dof]
+    U = np.zeros((num_dof,) + F.shape[1:])
+
+    if issparse(K):
+        K = K.tocsr()
+        K_free = K[free_dof][:, free_dof]
+        if prescribed is not None:
+            U[fixed_dof] = np.asarray(prescribed)[fixed_dof]
+            F_free = F_free - K[free_dof][:, fixed_dof] @ U[fixed_dof]
+        U_free = factorize(K_free, precision).solve(F_free)
+    elif precision != "double":
+        K_free = K[np.ix_(free_dof, free_dof)]
+        if prescribed is not None:
+            U[fixed_dof] = np.asarray(prescribed)[fixed_dof]
+            F_free = F_free - K[np.ix_(free_dof, fixed_dof)] @ U[fixed_dof]
+        U_free = factorize(K_free, precision).solve(F_free)
+    else:
+        K_free = K[np.ix_(free_dof, free_dof)]
+        if prescribed is not None:
+            U[fixed_dof] = np.asarray(prescribed)[fixed_dof]
+            F_free = F_free - K[np.ix_(free_dof, fixed_dof)] @ U[fixed_dof]
+        U_free = np.linalg.solve(K_free, F_free)
+        profiling.note(solver="dense", iterations=1)
 
-    U_free = np.linalg.solve(K_free, F_free)
+    if profiling.enabled():
+        profiling.note(**profiling.matrix_info(K_free))
 
-    U = np.zeros(num_dof)
     U[free_dof] = U_free
 
     return U
 
+@profiling.profiled()
 def get_element_forces(element, U, nodes):
     n1 = nodes.index(element.node1)
     n2 = nodes.index(element.node2)
@@ -128,3 +192,383 @@ def get_element_forces(element, U, nodes):
 
     f_local = k_local @ T @ u_element
     return f_local
+
+# ---------------- Batched element kernels ----------------
+# Array counterparts of the functions above, evaluated for all elements at once.
+
+def issparse(K):
+    # Only a scipy that is already imported can have made a sparse K
+    return "scipy.sparse" in sys.modules and _scipy() and sp.issparse(K)
+
+def element_geometry(coords, connectivity):
+    d = coords[connectivity[:, 1]] - coords[connectivity[:, 0]]
+    L = np.hypot(d[:, 0], d[:, 1])
+    return L, d[:, 0] / L, d[:, 1] / L
+
+def _condense_dofs(k, dof, mask):
+    mask = mask & (k[:, dof, dof] != 0)
+    if not mask.any():
+        return
+    kc = k[mask]
+    col = kc[:, :, dof]
+    kc -= col[:, :, None] * col[:, None, :] / kc[:, dof, dof][:, None, None]
+    kc[:, dof, :] = 0
+    kc[:, :, dof] = 0
+    k[mask] = kc
+
+def unit_stiffness_matrices(L, release_start=None, release_end=None):
+    # Local stiffness split as k = E*A*ka + E*I*kb; releases only affect kb
+    m = len(L)
+    ka = np.zeros((m, 6, 6))
+    ka[:, 0, 0] = ka[:, 3, 3] = 1 / L
+    ka[:, 0, 3] = ka[:, 3, 0] = -1 / L
+
+    kb = np.zeros((m, 6, 6))
+    kb[:, 1, 1] = kb[:, 4, 4] = 12 / L**3
+    kb[:, 1, 4] = kb[:, 4, 1] = -12 / L**3
+    kb[:, 1, 2] = kb[:, 2, 1] = kb[:, 1, 5] = kb[:, 5, 1] = 6 / L**2
+    kb[:, 2, 4] = kb[:, 4, 2] = kb[:, 4, 5] = kb[:, 5, 4] = -6 / L**2
+    kb[:, 2, 2] = kb[:, 5, 5] = 4 / L
+    kb[:, 2, 5] = kb[:, 5, 2] = 2 / L
+
+    if release_start is not None:
+        _condense_dofs(kb, 2, np.asarray(release_start, dtype=bool))
+    if release_end is not None:
+        _condense_dofs(kb, 5, np.asarray(release_end, dtype=bool))
+    if release_start is not None and release_end is not None:
+        # Members pinned at both ends are axial-only truss elements; drop the condensation round-off
+        kb[truss_members(release_start, release_end)] = 0.0
+
+    return ka, kb
+
+def truss_members(release_start, release_end):
+    return np.asarray(release_start, dtype=bool) & np.asarray(release_end, dtype=bool)
+
+def truss_rotation_dofs(connectivity, release_start, release_end, num_nodes):
+    # Rotation DOFs of nodes that only connect to truss members. Nothing stiffens them,
+    # so they are held at zero, which drops them from the system
+    connectivity = np.asarray(connectivity, dtype=int).reshape(-1, 2)
+    truss = truss_members(release_start, release_end)
+    used = np.zeros(num_nodes, dtype=bool)
+    used[connectivity.ravel()] = True
+    framed = np.zeros(num_nodes, dtype=bool)
+    framed[connectivity[~truss].ravel()] = True
+    return np.flatnonzero(used & ~framed) * 3 + 2
+
+@profiling.profiled()
+def local_stiffness_matrices(L, E, A, I, release_start=None, release_end=None):
+    ka, kb = unit_stiffness_matrices(L, release_start, release_end)
+    return (E * A)[:, None, None] * ka + (E * I)[:, None, None] * kb
+
+def transformation_matrices(c, s):
+    T = np.zeros((len(c), 6, 6))
+    for i in (0, 3):
+        T[:, i, i] = c
+        T[:, i, i + 1] = s
+        T[:, i + 1, i] = -s
+        T[:, i + 1, i + 1] = c
+        T[:, i + 2, i + 2] = 1
+    return T
+
+@profiling.profiled()
+def to_global(k_local, T):
+    return np.einsum('eji,ejk,ekl->eil', T, k_local, T, optimize=True)
+
+def element_dof_map(connectivity, dofs_per_node=3):
+    nodes = np.repeat(np.asarray(connectivity), dofs_per_node, axis=1)
+    return nodes * dofs_per_node + np.tile(np.arange(dofs_per_node), 2)
+
+@profiling.profiled()
+def assemble_global_matrix(k_global, dof_map, num_dof, sparse=True):
+    # Any element size: k_global is (elements, n, n) for n DOFs per element
+    n = dof_map.shape[1]
+    rows = np.repeat(dof_map, n, axis=1).ravel()
+    cols = np.tile(dof_map, (1, n)).ravel()
+    if sparse and _scipy():
+        return sp.csr_matrix((k_global.ravel(), (rows, cols)), shape=(num_dof, num_dof))
+    K = np.zeros((num_dof, num_dof))
+    np.add.at(K, (rows, cols), k_global.ravel())
+    return K
+
+# ---------------- Threaded assembly ----------------
+# Chunks of elements are turned into sorted, duplicate-free (key, value) runs
+# on a thread pool, key = row * num_dof + column. The runs are then merged
+# band by band of rows, also on the pool, and the bands joined end to end are
+# already in CSR order. The heavy steps are NumPy calls that release the GIL,
+# so the threads overlap.
+
+ASSEMBLY_CHUNK = 10000
+
+def _reduce_sorted(keys, values):
+    # Sum values of equal keys; keys must be sorted
+    if len(keys) == 0:
+        return keys, values
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    return keys[starts], np.add.reduceat(values, starts)
+
+def _chunk_triplets(coords, connectivity, E, A, I, release_start, release_end, num_dof):
+    L, c, s = element_geometry(coords, connectivity)
+    ka, kb = unit_stiffness_matrices(L, release_start, release_end)
+    k_local = (E * A)[:, None, None] * ka + (E * I)[:, None, None] * kb
+    T = transformation_matrices(c, s)
+    k_global = np.matmul(np.matmul(T.transpose(0, 2, 1), k_local), T)
+    dof_map = element_dof_map(connectivity)
+    keys = (np.repeat(dof_map, 6, axis=1) * num_dof + np.tile(dof_map, (1, 6))).ravel()
+    order = np.argsort(keys)
+    return _reduce_sorted(keys[order], k_global.ravel()[order])
+
+def _merge_range(runs, low, high):
+    # Entries of every run with low <= key < high, merged; each run is sorted, so the stable sort merges runs
+    pieces = [(keys[a:b], values[a:b]) for keys, values in runs
+              for a, b in [np.searchsorted(keys, [low, high])]]
+    keys = np.concatenate([p[0] for p in pieces])
+    values = np.concatenate([p[1] for p in pieces])
+    order = np.argsort(keys, kind="stable")
+    return _reduce_sorted(keys[order], values[order])
+
+@profiling.profiled()
+def assemble_threaded(coords, connectivity, E, A, I, release_start=None, release_end=None, num_dof=None,
+                      threads=None, chunk=ASSEMBLY_CHUNK, sparse=True):
+    coords = np.asarray(coords, dtype=float)
+    connectivity = np.asarray(connectivity, dtype=int).reshape(-1, 2)
+    m = len(connectivity)
+    num_dof = len(coords) * 3 if num_dof is None else num_dof
+    release_start = np.zeros(m, dtype=bool) if release_start is None else np.asarray(release_start, dtype=bool)
+    release_end = np.zeros(m, dtype=bool) if release_end is None else np.asarray(release_end, dtype=bool)
+    E, A, I = (np.broadcast_to(np.asarray(x, dtype=float), (m,)) for x in (E, A, I))
+    bounds = list(range(0, m, chunk)) + [m]
+
+    with ThreadPoolExecutor(max_workers=threads or os.cpu_count()) as pool:
+        runs = list(pool.map(lambda b: _chunk_triplets(coords, connectivity[b[0]:b[1]], E[b[0]:b[1]], A[b[0]:b[1]],
+                                                       I[b[0]:b[1]], release_start[b[0]:b[1]], release_end[b[0]:b[1]],
+                                                       num_dof), zip(bounds[:-1], bounds[1:])))
+        # Each thread merges one band of rows from all runs, so every entry is merged once
+        edges = np.linspace(0, num_dof, len(runs) + 1).astype(np.int64) * num_dof
+        bands = list(pool.map(lambda r: _merge_range(runs, edges[r], edges[r + 1]), range(len(runs))))
+    keys = np.concatenate([b[0] for b in bands] or [np.zeros(0, dtype=np.int64)])
+    values = np.concatenate([b[1] for b in bands] or [np.zeros(0)])
+
+    rows, cols = np.divmod(keys, num_dof)
+    if sparse and _scipy():
+        indptr = np.searchsorted(rows, np.arange(num_dof + 1))
+        return sp.csr_matrix((values, cols, indptr), shape=(num_dof, num_dof))
+    K = np.zeros((num_dof, num_dof))
+    K[rows, cols] = values
+    return K
+
+@profiling.profiled()
+def element_forces(k_local, T, U, dof_map):
+    return np.einsum('eij,ejk,ek->ei', k_local, T, U[dof_map], optimize=True)
+
+class _DenseFactor:
+    def __init__(self, K):
+        self.K = K
+
+    def solve(self, F):
+        return np.linalg.solve(self.K, F)
+
+class _SingleFactor:
+    # Factorization of K in float32; solves return float64
+    def __init__(self, K):
+        if issparse(K):
+            self.factor = spla.splu(K.astype(np.float32).tocsc())
+            self.solve32 = self.factor.solve
+        elif _scipy():
+            self.factor = sla.lu_factor(np.asarray(K, dtype=np.float32))
+            self.solve32 = lambda b: sla.lu_solve(self.factor, b)
+        else:
+            K32 = np.asarray(K, dtype=np.float32)
+            self.solve32 = lambda b: np.linalg.solve(K32, b)
+
+    def solve(self, F):
+        return self.solve32(np.asarray(F, dtype=np.float32)).astype(np.float64)
+
+class _MixedFactor:
+    # float32 factorization with float64 iterative refinement on residuals of the original K.
+    # When the residual stops shrinking (ill-conditioned K) it switches to a float64 factorization.
+    def __init__(self, K, tolerance=1e-13, max_iterations=20):
+        self.K = K
+        self.tolerance = tolerance
+        self.max_iterations = max_iterations
+        self.norm = abs(K).sum(axis=1).max() if issparse(K) else np.abs(K).sum(axis=1).max()
+        self.single = _SingleFactor(K)
+        self.full = None
+        self.iterations = 0
+
+    @property
+    def fallback(self):
+        return self.full is not None
+
+    def solve(self, F):
+        if self.full is not None:
+            return self.full.solve(F)
+        F = np.asarray(F, dtype=np.float64)
+        U = self.single.solve(F)
+        previous = np.inf
+        for self.iterations in range(1, self.max_iterations + 1):
+            R = F - self.K @ U
+            residual = np.abs(R).max()
+            if residual <= self.tolerance * (self.norm * np.abs(U).max() + np.abs(F).max()):
+                profiling.note(iterations=self.iterations)
+                return U
+            if residual > 0.5 * previous:
+                break
+            previous = residual
+            U = U + self.single.solve(R)
+        self.full = factorize(self.K)
+        profiling.note(precision="fallback to double")
+        return self.full.solve(F)
+
+@profiling.profiled()
+def factorize(K, precision="double"):
+    # precision: "double", or "mixed" for a float32 factorization refined to float64 accuracy
+    if precision == "mixed":
+        factor = _MixedFactor(K)
+        profiling.note(precision="mixed")
+        return factor
+    if issparse(K):
+        factor = spla.splu(K.tocsc())
+        if profiling.enabled():
+            profiling.note(solver="splu", iterations=1, nnz=int(K.nnz), factor_nnz=int(factor.L.nnz + factor.U.nnz),
+                           fill_in=(factor.L.nnz + factor.U.nnz) / max(K.nnz, 1))
+        return factor
+    return _DenseFactor(K)
+
+class _StoredFactor:
+    # Sparse LU factors kept from an earlier splu: Pr K Pc = L U
+    def __init__(self, L, U, perm_r, perm_c):
+        self.L = L.tocsr()
+        self.U = U.tocsr()
+        self.perm_r = perm_r
+        self.perm_c = perm_c
+
+    def solve(self, F):
+        F = np.asarray(F, dtype=np.float64)
+        y = np.empty_like(F)
+        y[self.perm_r] = F
+        y = spla.spsolve_triangular(self.L, y, lower=True, unit_diagonal=True)
+        return spla.spsolve_triangular(self.U, y, lower=False)[self.perm_c]
+
+def factor_arrays(factor):
+    # Arrays that rebuild a double precision factorization with stored_factor(), or None
+    if isinstance(factor, _DenseFactor):
+        return {"kind": np.array("dense"), "K": np.asarray(factor.K)}
+    if isinstance(factor, _StoredFactor):
+        factor = factor.L, factor.U, factor.perm_r, factor.perm_c
+    elif _scipy() and isinstance(factor, spla.SuperLU):
+        factor = factor.L, factor.U, factor.perm_r, factor.perm_c
+    else:
+        return None
+    L, U, perm_r, perm_c = factor
+    arrays = {"kind": np.array("lu"), "perm_r": perm_r, "perm_c": perm_c}
+    for name, matrix in (("L", L.tocsr()), ("U", U.tocsr())):
+        arrays.update({name + "_data": matrix.data, name + "_indices": matrix.indices, name + "_indptr": matrix.indptr})
+    return arrays
+
+def stored_factor(arrays):
+    if str(arrays["kind"]) == "dense":
+        return _DenseFactor(arrays["K"])
+    _scipy()
+    n = len(arrays["perm_r"])
+    L, U = (sp.csr_matrix((arrays[name + "_data"], arrays[name + "_indices"], arrays[name + "_indptr"]), shape=(n, n))
+            for name in ("L", "U"))
+    return _StoredFactor(L, U, arrays["perm_r"], arrays["perm_c"])
+
+# ---------------- Fast reanalysis ----------------
+
+class ReanalysisSystem:
+    # Reduced stiffness matrix over the free DOFs that can be updated element by
+    # element when A or I change, without reassembling it.
+    def __init__(self, coords, connectivity, E, A, I, release_start, release_end, boundary_conditions, sparse=True,
+                 precision="double"):
+        coords = np.asarray(coords, dtype=float)
+        self.connectivity = np.asarray(connectivity, dtype=int)
+        self.E = np.array(E, dtype=float)
+        self.A = np.array(A, dtype=float)
+        self.I = np.array(I, dtype=float)
+        self.L, c, s = element_geometry(coords, self.connectivity)
+        self.ka, self.kb = unit_stiffness_matrices(self.L, release_start, release_end)
+        self.T = transformation_matrices(c, s)
+        self.ka_global = to_global(self.ka, self.T)
+        self.kb_global = to_global(self.kb, self.T)
+        self.dof_map = element_dof_map(self.connectivity)
+        self.num_dof = len(coords) * 3
+
+        self.free_dof = get_free_dofs(self.num_dof, boundary_conditions)
+        reduced = np.full(self.num_dof, -1)
+        reduced[self.free_dof] = np.arange(len(self.free_dof))
+        dofs = reduced[self.dof_map]
+        rows = np.repeat(dofs, 6, axis=1)
+        cols = np.tile(dofs, (1, 6))
+        self.entry_mask = (rows >= 0) & (cols >= 0)
+        n = len(self.free_dof)
+
+        values = self._element_matrices(np.arange(len(self.E)), self.A, self.I).reshape(-1, 36)
+        if sparse and _scipy():
+            K = sp.csr_matrix((values[self.entry_mask], (rows[self.entry_mask], cols[self.entry_mask])), shape=(n, n))
+            K.sum_duplicates()
+            keys = np.repeat(np.arange(n), np.diff(K.indptr)) * n + K.indices
+            positions = np.searchsorted(keys, rows * n + cols)
+        else:
+            K = np.zeros((n, n))
+            np.add.at(K, (rows[self.entry_mask], cols[self.entry_mask]), values[self.entry_mask])
+            positions = rows * n + cols
+        self.positions = np.where(self.entry_mask, positions, 0)
+        self.K = K
+        self.precision = precision
+        self._factor = None
+
+    def _element_matrices(self, elements, A, I):
+        E = self.E[elements][:, None, None]
+        return E * A[:, None, None] * self.ka_global[elements] + E * I[:, None, None] * self.kb_global[elements]
+
+    def update(self, elements, A, I, E=None):
+        elements = np.asarray(elements, dtype=int)
+        A = np.broadcast_to(np.asarray(A, dtype=float), elements.shape)
+        I = np.broadcast_to(np.asarray(I, dtype=float), elements.shape)
+        if E is None:
+            delta = self._element_matrices(elements, A - self.A[elements], I - self.I[elements])
+        else:
+            old = self._element_matrices(elements, self.A[elements], self.I[elements])
+            self.E[elements] = E
+            delta = self._element_matrices(elements, A, I) - old
+        delta = delta.reshape(-1, 36)
+        mask = self.entry_mask[elements]
+        data = self.K.data if issparse(self.K) else self.K.reshape(-1)
+        np.add.at(data, self.positions[elements][mask], delta[mask])
+        self.A[elements] = A
+        self.I[elements] = I
+        self._factor = None
+
+    def factorize(self, factor=None):
+        # Factorization of K, computed on first use; pass a factor restored from a cache to use it instead
+        if factor is not None:
+            self._factor = factor
+        elif self._factor is None:
+            self._factor = factorize(self.K, self.precision)
+        return self._factor
+
+    @property
+    def factored(self):
+        return self._factor is not None
+
+    @profiling.profiled("reanalysis_solve")
+    def solve(self, F):
+        U = np.zeros((self.num_dof,) + F.shape[1:])
+        U[self.free_dof] = self.factorize().solve(F[self.free_dof])
+        return U
+
+    def local_stiffness(self, elements=slice(None)):
+        E = self.E[elements][:, None, None]
+        return E * self.A[elements][:, None, None] * self.ka[elements] + E * self.I[elements][:, None, None] * self.kb[elements]
+
+    def element_forces(self, U):
+        return element_forces(self.local_stiffness(), self.T, U, self.dof_map)
+
+    def sensitivities(self, U, adjoint):
+        # d(adjoint . U)/dA and d(adjoint . U)/dI, i.e. -adjoint^T dK/dx U, for every element
+        u = U[self.dof_map]
+        lam = adjoint[self.dof_map]
+        dA = -self.E * np.einsum('ei,eij,ej->e', lam, self.ka_global, u, optimize=True)
+        dI = -self.E * np.einsum('ei,eij,ej->e', lam, self.kb_global, u, optimize=True)
+        return dA, dI
@@ -0,0 +1,111 @@
+import numpy as np
+from model import FrameModel
+from space import SpaceFrameModel
+
+# Parametric models for benchmarks and verification. Default properties are a
+# steel member in kN and m.
+E_STEEL = 2e8
+A_DEFAULT = 0.01
+I_DEFAULT = 1e-4
+G_STEEL = 7.7e7
+J_DEFAULT = 2e-4
+
+def _frame_model(coords, connectivity, supports, release_start=None, release_end=None):
+    m = len(connectivity)
+    if release_start is None:
+        release_start = np.zeros(m, dtype=bool)
+    if release_end is None:
+        release_end = np.zeros(m, dtype=bool)
+    return FrameModel(coords, connectivity, np.full(m, E_STEEL), np.full(m, A_DEFAULT), np.full(m, I_DEFAULT),
+                      release_start, release_end, supports)
+
+def multi_storey_frame(bays, storeys, width=6.0, height=3.5, beam_segments=1):
+    n = bays + 1
+    x, y = np.meshgrid(np.arange(n) * width, np.arange(storeys + 1) * height)
+    coords = np.column_stack([x.ravel(), y.ravel()])
+    ids = np.arange(n * (storeys + 1)).reshape(storeys + 1, n)
+    columns = np.column_stack([ids[:-1].ravel(), ids[1:].ravel()])
+    beams = np.column_stack([ids[1:, :-1].ravel(), ids[1:, 1:].ravel()])
+    if beam_segments > 1:
+        # Beams split into equal members; the intermediate nodes are numbered after the grid
+        t = np.arange(1, beam_segments) / beam_segments
+        start, end = coords[beams[:, 0]], coords[beams[:, 1]]
+        inner = (start[:, None] + t[:, None] * (end - start)[:, None]).reshape(-1, 2)
+        inner_ids = len(coords) + np.arange(len(inner)).reshape(len(beams), -1)
+        chain = np.column_stack([beams[:, :1], inner_ids, beams[:, 1:]])
+        beams = np.column_stack([chain[:, :-1].ravel(), chain[:, 1:].ravel()])
+        coords = np.vstack([coords, inner])
+    supports = ["xyZ" if i < n else "" for i in range(len(coords))]
+    return _frame_model(coords, np.vstack([columns, beams]), supports)
+
+def portal_frame(bays=1, width=6.0, height=3.5):
+    return multi_storey_frame(bays, 1, width, height)
+
+def truss(panels, width=2.0, height=2.0, pinned=False):
+    # Pratt truss: continuous chords (pin-jointed too if pinned), pin-ended verticals and diagonals,
+    # pin and roller supports
+    n = panels + 1
+    bottom = np.arange(n)
+    top = bottom + n
+    coords = np.vstack([np.column_stack([bottom * width, np.zeros(n)]), np.column_stack([bottom * width, np.full(n, height)])])
+    chords = np.vstack([np.column_stack([bottom[:-1], bottom[1:]]), np.column_stack([top[:-1], top[1:]])])
+    verticals = np.column_stack([bottom, top])
+    half = panels // 2
+    diagonals = np.vstack([
+        np.column_stack([top[:half], bottom[1:half + 1]]),
+        np.column_stack([bottom[half:-1], top[half + 1:]]),
+    ])
+    webs = np.vstack([verticals, diagonals])
+    connectivity = np.vstack([chords, webs])
+    released = np.r_[np.full(len(chords), pinned), np.ones(len(webs), dtype=bool)]
+    supports = [""] * len(coords)
+    supports[0] = "xy"
+    supports[n - 1] = "y"
+    return _frame_model(coords, connectivity, supports, released, released)
+
+def random_mesh(nx, ny, spacing=3.0, jitter=0.25, diagonal_fraction=0.5, seed=0):
+    # Jittered grid with random diagonal braces; the bottom row is fixed
+    rng = np.random.default_rng(seed)
+    x, y = np.meshgrid(np.arange(nx) * spacing, np.arange(ny) * spacing)
+    coords = np.column_stack([x.ravel(), y.ravel()])
+    coords[nx:] += rng.uniform(-jitter, jitter, size=(len(coords) - nx, 2)) * spacing
+    ids = np.arange(nx * ny).reshape(ny, nx)
+    horizontal = np.column_stack([ids[1:, :-1].ravel(), ids[1:, 1:].ravel()])
+    vertical = np.column_stack([ids[:-1].ravel(), ids[1:].ravel()])
+    diagonal = np.column_stack([ids[:-1, :-1].ravel(), ids[1:, 1:].ravel()])
+    diagonal = diagonal[rng.random(len(diagonal)) < diagonal_fraction]
+    supports = ["xyZ" if i < nx else "" for i in range(len(coords))]
+    return _frame_model(coords, np.vstack([horizontal, vertical, diagonal]), supports)
+
+def space_frame(bays_x, bays_z, storeys, width=6.0, depth=6.0, height=3.5):
+    # Building frame with columns along y and beams along x and z; the ground nodes are fixed
+    nx, nz = bays_x + 1, bays_z + 1
+    y, z, x = np.meshgrid(np.arange(storeys + 1) * height, np.arange(nz) * depth, np.arange(nx) * width, indexing="ij")
+    coords = np.column_stack([x.ravel(), y.ravel(), z.ravel()])
+    ids = np.arange(len(coords)).reshape(storeys + 1, nz, nx)
+    columns = np.column_stack([ids[:-1].ravel(), ids[1:].ravel()])
+    beams_x = np.column_stack([ids[1:, :, :-1].ravel(), ids[1:, :, 1:].ravel()])
+    beams_z = np.column_stack([ids[1:, :-1, :].ravel(), ids[1:, 1:, :].ravel()])
+    supports = ["xyzXYZ" if i < nx * nz else "" for i in range(len(coords))]
+    return SpaceFrameModel(coords, np.vstack([columns, beams_x, beams_z]), E_STEEL, G_STEEL, A_DEFAULT,
+                           I_DEFAULT, I_DEFAULT, J_DEFAULT, supports)
+
+def model_of_size(kind, num_elements, seed=0):
+    # Pick generator parameters so the model has roughly num_elements members
+    if kind == "portal":
+        return portal_frame(max(1, (num_elements - 1) // 2))
+    if kind == "frame":
+        side = max(1, int(round(np.sqrt(num_elements / 2))))
+        return multi_storey_frame(side, side)
+    if kind == "truss":
+        return truss(max(2, (num_elements - 1) // 4))
+    if kind == "random":
+        side = max(2, int(round(np.sqrt(num_elements / 2.5))) + 1)
+        return random_mesh(side, side, seed=seed)
+    raise ValueError(f"Unknown model kind: {kind}")
+
+def nodal_loads(frame_model, lateral=10.0, gravity=-50.0):
+    F = np.zeros(frame_model.num_dof)
+    F[0::3] = lateral
+    F[1::3] = gravity
+    return F
@@ -0,0 +1,142 @@
+import copy
+
+# Undo/redo over the model tables (name -> list of rows). Each step stores
+# only the rows it changed: equal-length tables keep the changed indices, and
+# tables that grew or shrank keep the spliced span between the common prefix
+# and suffix. Unchanged rows are shared between the snapshot and every step.
+
+class History:
+    def __init__(self, state, limit=1000):
+        self.limit = limit
+        self.reset(state)
+
+    def reset(self, state):
+        self.snapshot = {name: [copy.deepcopy(row) for row in rows] for name, rows in state.items()}
+        self.undo_stack = []
+        self.redo_stack = []
+
+    def can_undo(self):
+        return bool(self.undo_stack)
+
+    def can_redo(self):
+        return bool(self.redo_stack)
+
+    def commit(self, state, label=""):
+        # Record the difference between the last snapshot and state; returns the changed rows per table
+        diffs = {}
+        for name, rows in state.items():
+            diff = _diff(self.snapshot.get(name, []), rows)
+            if diff is not None:
+                diffs[name] = diff
+        if not diffs:
+            return {}
+        for name, diff in diffs.items():
+            _apply(self.snapshot.setdefault(name, []), diff, True, False)
+        self.undo_stack.append((label, diffs))
+        if len(self.undo_stack) > self.limit:
+            self.undo_stack.pop(0)
+        self.redo_stack = []
+        return changes(diffs)
+
+    def undo(self, state):
+        # Roll state (and the snapshot) back by one step in place; returns the changed rows per table
+        if not self.undo_stack:
+            return {}
+        label, diffs = self.undo_stack.pop()
+        for name, diff in diffs.items():
+            _apply(self.snapshot[name], diff, False, False)
+            _apply(state[name], diff, False, True)
+        self.redo_stack.append((label, diffs))
+        return changes(diffs)
+
+    def redo(self, state):
+        if not self.redo_stack:
+            return {}
+        label, diffs = self.redo_stack.pop()
+        for name, diff in diffs.items():
+            _apply(self.snapshot[name], diff, True, False)
+            _apply(state[name], diff, True, True)
+        self.undo_stack.append((label, diffs))
+        return changes(diffs)
+
+    def labels(self):
+        return [label for label, diffs in self.undo_stack], [label for label, diffs in reversed(self.redo_stack)]
+
+def _diff(old, new):
+    if len(old) == len(new):
+        indices = [i for i, (a, b) in enumerate(zip(old, new)) if a != b]
+        if not indices:
+            return None
+        return ("rows", indices, [old[i] for i in indices], [copy.deepcopy(new[i]) for i in indices])
+    start = 0
+    limit = min(len(old), len(new))
+    while start < limit and old[start] == new[start]:
+        start += 1
+    end = 0
+    while end < limit - start and old[len(old) - 1 - end] == new[len(new) - 1 - end]:
+        end += 1
+    return ("splice", start, old[start:len(old) - end], [copy.deepcopy(row) for row in new[start:len(new) - end]])
+
+def _apply(rows, diff, forward, copy_rows):
+    # The snapshot shares row objects with the stored steps; the live tables get their own copies
+    kind, where, old, new = diff
+    if not forward:
+        old, new = new, old
+    if copy_rows:
+        new = [copy.deepcopy(row) for row in new]
+    if kind == "rows":
+        for i, row in zip(where, new):
+            rows[i] = row
+    else:
+        rows[where:where + len(old)] = new
+
+def changes(diffs):
+    # name -> (changed row indices in the resulting table, whether the table was resized,
+    # changed column indices or None when unknown)
+    result = {}
+    for name, (kind, where, old, new) in diffs.items():
+        if kind == "rows":
+            columns = set()
+            for a, b in zip(old, new):
+                if len(a) != len(b):
+                    columns = None
+                    break
+                columns |= {c for c, (x, y) in enumerate(zip(a, b)) if x != y}
+            result[name] = (set(where), False, columns)
+        else:
+            result[name] = (set(range(where, where + len(new))), len(old) != len(new), None)
+    return result
+
+def merge_changes(a, b):
+    merged = dict(a)
+    for name, (indices, resized, columns) in b.items():
+        if name in merged:
+            old_indices, old_resized, old_columns = merged[name]
+            merged[name] = (old_indices | indices, old_resized or resized,
+                            None if old_columns is None or columns is None else old_columns | columns)
+        else:
+            merged[name] = (set(indices), resized, columns)
+    return merged
+
+def invalidated(changed, elements_data, sections_data):
+    # What a stiffness analysis has to redo after the changes: (rebuild everything, element indices
+    # whose E, A or I must be recomputed, whether only the load vector is stale)
+    if "nodes" in changed:
+        return True, set(), False
+    elements = set()
+    if "elements" in changed:
+        indices, resized, columns = changed["elements"]
+        # Only a new section keeps the element's geometry and releases
+        if resized or columns is None or columns - {6}:
+            return True, set(), False
+        elements |= indices
+    materials = changed.get("materials", (set(), False, None))
+    section_indices = changed.get("sections", (set(), False, None))
+    if materials[1] or section_indices[1]:
+        return True, set(), False
+    affected_sections = set(section_indices[0])
+    affected_sections |= {i for i, section in enumerate(sections_data) if section[3] in materials[0]}
+    if affected_sections:
+        elements |= {i for i, e in enumerate(elements_data) if len(e) > 6 and e[6] in affected_sections}
+    loads = bool(set(changed) & {"udl", "vdl", "point_loads", "load_patterns", "load_combinations"})
+    return False, elements, loads
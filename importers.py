@@ -0,0 +1,198 @@
+import csv
+import numpy as np
+import model
+import spatial
+from sections import SECTION_DIMENSIONS
+
+# Bulk import of CSV tables and DXF LINE entities straight into nodes_data,
+# elements_data, sections_data and the load tables. Columns are converted with
+# numpy in one go and element ends are de-duplicated through the node grid.
+#
+# CSV tables need a header row; the kind of table is recognised from it:
+#   nodes:    x, y[, support]
+#   elements: x1, y1, x2, y2 or start, end (node numbers such as 3 or N3),
+#             [release_start, release_end, section]
+#   sections: name, type[, material] and one column per dimension symbol (h, b, tw, ...)
+#   loads:    type (udl, vdl or point), element, magnitude[, end_magnitude], direction,
+#             start, end (udl/vdl) or distance (point)
+
+def read_csv(filepath):
+    # header -> list of cell strings, streamed row by row
+    with open(filepath, newline='') as f:
+        reader = csv.reader(f)
+        header = [name.strip().lower() for name in next(reader)]
+        columns = [[] for _ in header]
+        for row in reader:
+            if not row:
+                continue
+            for column, value in zip(columns, row):
+                column.append(value.strip())
+            for column in columns[len(row):]:
+                column.append("")
+    return dict(zip(header, columns))
+
+def table_kind(columns):
+    if "type" in columns and "element" in columns:
+        return "loads"
+    if "x1" in columns or "start" in columns:
+        return "elements"
+    if "x" in columns and "y" in columns:
+        return "nodes"
+    if "name" in columns and "type" in columns:
+        return "sections"
+    raise ValueError("Unrecognised CSV header: " + ", ".join(columns))
+
+def _numbers(column, default=0.0):
+    values = np.array(column, dtype=object)
+    values[values == ""] = default
+    return values.astype(float)
+
+def _indices(column, prefix):
+    # "N3", "n3" or "3" -> 2
+    return np.char.lstrip(np.char.upper(np.array(column, dtype=str)), prefix).astype(int) - 1
+
+def _optional(columns, name, count, default=""):
+    return columns.get(name, [default] * count)
+
+# ---------------- Geometry ----------------
+def merge_segments(nodes_data, segments, release_start=None, release_end=None, section_index=None,
+                   tolerance=model.NODE_TOLERANCE):
+    # New members between points; ends that coincide with an existing node or with each other share one node.
+    # Returns (nodes_data, new elements)
+    segments = np.asarray(segments, dtype=float).reshape(-1, 4)
+    count = len(segments)
+    existing = model.node_coordinates(nodes_data)
+    points = np.vstack([existing, segments[:, :2], segments[:, 2:]])
+    labels = spatial.merge_points(points, tolerance)
+
+    new = np.flatnonzero(labels[len(existing):] == np.arange(len(existing), len(points))) + len(existing)
+    renumber = np.arange(len(points))
+    renumber[new] = len(existing) + np.arange(len(new))
+    node_of = renumber[labels]
+    coords = np.vstack([existing, points[new]])
+    start = node_of[len(existing):len(existing) + count]
+    end = node_of[len(existing) + count:]
+
+    nodes = list(nodes_data) + [[x, y, ""] for x, y in points[new].tolist()]
+    release_start = [""] * count if release_start is None else release_start
+    release_end = [""] * count if release_end is None else release_end
+    section_index = [None] * count if section_index is None else section_index
+    ends = np.hstack([coords[start], coords[end]]).tolist()
+    elements = [[x1, y1, x2, y2, rs, re, section] for (x1, y1, x2, y2), rs, re, section
+                in zip(ends, release_start, release_end, section_index)]
+    return nodes, elements
+
+def nodes_from_columns(columns, length_factor=1.0):
+    x = _numbers(columns["x"]) * length_factor
+    y = _numbers(columns["y"]) * length_factor
+    supports = _optional(columns, "support", len(x))
+    return [[a, b, support] for a, b, support in zip(x.tolist(), y.tolist(), supports)]
+
+def elements_from_columns(columns, nodes_data=(), sections_data=(), length_factor=1.0, tolerance=model.NODE_TOLERANCE):
+    count = len(next(iter(columns.values()))) if columns else 0
+    names = {}
+    for i, section in enumerate(sections_data):
+        names.setdefault(section[0], i)
+    sections = [names.get(name) for name in _optional(columns, "section", count)]
+    release_start = _optional(columns, "release_start", count)
+    release_end = _optional(columns, "release_end", count)
+
+    if "start" in columns:
+        coords = model.node_coordinates(nodes_data)
+        start = _indices(columns["start"], "N")
+        end = _indices(columns["end"], "N")
+        if count and (min(start.min(), end.min()) < 0 or max(start.max(), end.max()) >= len(coords)):
+            raise ValueError("Element table refers to a node that does not exist.")
+        segments = np.hstack([coords[start], coords[end]])
+    else:
+        segments = np.column_stack([_numbers(columns[name]) for name in ("x1", "y1", "x2", "y2")]) * length_factor
+    return merge_segments(nodes_data, segments, release_start, release_end, sections, tolerance)
+
+def sections_from_columns(columns, materials_data=(), length_factor=1.0):
+    count = len(columns["name"])
+    materials = {}
+    for i, material in enumerate(materials_data):
+        materials.setdefault(material[0], i)
+    material_names = _optional(columns, "material", count)
+    symbols = {symbol.lower(): symbol for dims in SECTION_DIMENSIONS.values() for symbol in dims}
+    dimensions = {symbols[name]: _numbers(values) * length_factor for name, values in columns.items() if name in symbols}
+
+    sections_data = []
+    for i, (name, section_type) in enumerate(zip(columns["name"], columns["type"])):
+        if section_type not in SECTION_DIMENSIONS:
+            raise ValueError(f"Unknown section type: {section_type}")
+        properties = {symbol: float(dimensions[symbol][i]) for symbol in SECTION_DIMENSIONS[section_type] if symbol in dimensions}
+        sections_data.append([name, section_type, properties, materials.get(material_names[i])])
+    return sections_data
+
+def loads_from_columns(columns, length_factor=1.0, force_factor=1.0, num_elements=None):
+    # Returns (udl_data, vdl_data, point_load_data); magnitudes are per unit length for udl/vdl.
+    # num_elements: number of elements in the model, to reject loads on elements that do not exist
+    count = len(columns["type"])
+    kinds = np.char.lower(np.array(columns["type"], dtype=str))
+    unknown = set(kinds.tolist()) - {"udl", "vdl", "point"}
+    if unknown:
+        raise ValueError("Unknown load type: " + ", ".join(sorted(unknown)))
+    element = _indices(columns["element"], "E")
+    if count and num_elements is not None and (element.min() < 0 or element.max() >= num_elements):
+        raise ValueError("Load table refers to an element that does not exist.")
+    element = element.tolist()
+    magnitude = _numbers(_optional(columns, "magnitude", count)) * force_factor
+    end_magnitude = _numbers(_optional(columns, "end_magnitude", count)) * force_factor
+    direction = _optional(columns, "direction", count, "Y")
+    start = (_numbers(_optional(columns, "start", count)) * length_factor).tolist()
+    end = (_numbers(_optional(columns, "end", count)) * length_factor).tolist()
+    distance = (_numbers(_optional(columns, "distance", count)) * length_factor).tolist()
+    distributed = magnitude / length_factor
+    end_distributed = end_magnitude / length_factor
+    magnitude = magnitude.tolist()
+
+    udl_data, vdl_data, point_load_data = [], [], []
+    for i in np.flatnonzero(kinds == "udl").tolist():
+        udl_data.append([element[i], float(distributed[i]), direction[i], start[i], end[i]])
+    for i in np.flatnonzero(kinds == "vdl").tolist():
+        vdl_data.append([element[i], float(distributed[i]), float(end_distributed[i]), direction[i], start[i], end[i]])
+    for i in np.flatnonzero(kinds == "point").tolist():
+        point_load_data.append([element[i], magnitude[i], direction[i], distance[i]])
+    return udl_data, vdl_data, point_load_data
+
+# ---------------- DXF ----------------
+def read_dxf_lines(filepath):
+    # LINE entities of an ASCII DXF file: (n x 4 array of x1, y1, x2, y2, list of layer names)
+    with open(filepath, errors="replace") as f:
+        lines = [line.strip() for line in f]
+    codes = np.array(lines[0::2][:len(lines) // 2])
+    values = np.array(lines[1::2][:len(lines) // 2])
+
+    # Only the ENTITIES section
+    entities = np.flatnonzero((codes == "2") & (values == "ENTITIES"))
+    if len(entities) == 0:
+        return np.zeros((0, 4)), []
+    first = entities[0] + 1
+    ends = np.flatnonzero((codes[first:] == "0") & (values[first:] == "ENDSEC"))
+    last = first + ends[0] if len(ends) else len(codes)
+    codes, values = codes[first:last], values[first:last]
+
+    starts = codes == "0"
+    entity = np.cumsum(starts) - 1
+    is_line = (values[starts] == "LINE")[entity] & (entity >= 0)
+    count = int(starts.sum())
+    result = np.full((count, 4), np.nan)
+    layers = np.array([""] * count, dtype=object)
+    for column, code in enumerate(("10", "20", "11", "21")):
+        rows = is_line & (codes == code)
+        result[entity[rows], column] = values[rows].astype(float)
+    rows = is_line & (codes == "8")
+    layers[entity[rows]] = values[rows]
+
+    keep = (values[starts] == "LINE") & ~np.isnan(result).any(axis=1)
+    return result[keep], layers[keep].tolist()
+
+def elements_from_dxf(filepath, nodes_data=(), sections_data=(), length_factor=1.0, tolerance=model.NODE_TOLERANCE):
+    # Layers named after a section assign that section to their lines
+    segments, layers = read_dxf_lines(filepath)
+    names = {}
+    for i, section in enumerate(sections_data):
+        names.setdefault(section[0], i)
+    return merge_segments(nodes_data, segments * length_factor, section_index=[names.get(layer) for layer in layers],
+                          tolerance=tolerance)
@@ -1,8 +1,20 @@
 import tkinter as tk
-from tkinter import filedialog, Text, messagebox, ttk
+from tkinter import filedialog, Text, messagebox, simpledialog, ttk
+import analysis
+import cache
+import diagrams
+import diagnostics
 import fem
+import history
+import importers
+import model
+import optimize
+import profiling
+import sections
 import numpy as np
 import json
+import render
+import tables
 
 class FrameAnalyzer:
     def __init__(self, master):
@@ -21,6 +33,22 @@ class FrameAnalyzer:
         self.analyze_button = tk.Button(master, text="Analyze", command=self.analyze)
         self.analyze_button.pack(side=tk.RIGHT)
 
+        self.optimize_button = tk.Button(master, text="Optimize", command=self.optimize_sections)
+        self.optimize_button.pack(side=tk.RIGHT)
+
+        self.profile_var = tk.BooleanVar()
+        self.profile_check = tk.Checkbutton(master, text="Profile", variable=self.profile_var)
+        self.profile_check.pack(side=tk.RIGHT)
+
+        # Result overlay selection
+        self.result_kind_var = tk.StringVar(value="None")
+        self.result_kind_menu = tk.OptionMenu(master, self.result_kind_var, "None", *diagrams.KINDS, command=lambda kind: self.show_results())
+        self.result_kind_menu.pack(side=tk.RIGHT)
+        self.result_case_var = tk.StringVar()
+        self.result_case_menu = ttk.Combobox(master, textvariable=self.result_case_var, state="readonly", width=12)
+        self.result_case_menu.bind("<<ComboboxSelected>>", lambda event: self.show_results())
+        self.result_case_menu.pack(side=tk.RIGHT)
+
         self.toolbar = tk.Frame(master)
         self.toolbar.pack(side=tk.RIGHT, fill=tk.Y)
 
@@ -30,15 +58,27 @@ class FrameAnalyzer:
         self.open_button = tk.Button(self.toolbar, text="Open", command=self.open_project)
         self.open_button.pack(side=tk.TOP)
 
+        self.import_button = tk.Button(self.toolbar, text="Import", command=self.import_file)
+        self.import_button.pack(side=tk.TOP)
+
         self.geometry_button = tk.Button(self.toolbar, text="Geometry", command=self.open_geometry_dialog)
         self.geometry_button.pack(side=tk.TOP)
 
-        self.load_comb_button = tk.Button(self.toolbar, text="Load Comb", command=self.open_load_comb_dialog)
+        self.load_comb_button = tk.Button(self.toolbar, text="Load Comb", command=self.open_loads_dialog)
         self.load_comb_button.pack(side=tk.TOP)
 
         self.loads_button = tk.Button(self.toolbar, text="Loads", command=self.open_loads_dialog)
         self.loads_button.pack(side=tk.TOP)
 
+        self.fit_button = tk.Button(self.toolbar, text="Fit", command=self.fit_view)
+        self.fit_button.pack(side=tk.TOP)
+
+        self.undo_button = tk.Button(self.toolbar, text="Undo", command=self.undo)
+        self.undo_button.pack(side=tk.TOP)
+
+        self.redo_button = tk.Button(self.toolbar, text="Redo", command=self.redo)
+        self.redo_button.pack(side=tk.TOP)
+
         # Unit selection dropdown
         self.units_var = tk.StringVar()
         self.units_var.set("kN, m, C")
@@ -47,7 +87,6 @@ class FrameAnalyzer:
         self.unit_menu.pack(side=tk.TOP)
 
         # Data storage
-        self.lines = []
         self.elements_data = []  # [x1, y1, x2, y2, support_start, support_end]
         self.nodes_data = [] # [x, y, support]
         self.materials_data = [] # [name, unit_weight, E, nu, G, alpha]
@@ -60,13 +99,33 @@ class FrameAnalyzer:
         self.properties = {}
         self.current_units = {"force": "kN", "length": "m", "temperature": "C"}
 
+        # Undo history, and what the cached analysis system has not seen yet
+        self.history = history.History(self.model_state())
+        self.pending_changes = {}
+        self.analysis_system = None
+        self.analysis_model = None
+        self.results = None
+        # Factorizations and solutions of earlier runs, kept across sessions
+        try:
+            self.result_cache = cache.ResultCache()
+        except OSError:
+            self.result_cache = None
+        self.master.bind("<Control-z>", lambda event: self.undo())
+        self.master.bind("<Control-y>", lambda event: self.redo())
+
+        self.renderer = render.ModelRenderer(self.canvas)
+        self.node_names = [""]
+        self.selected_entity = None
+        self.pan_start = None
+        self.refresh_job = None
         self.draw_axes()
+        self.bind_navigation()
 
     def draw_axes(self):
-        self.canvas.create_line(50, 550, 750, 550, arrow=tk.LAST)
-        self.canvas.create_text(760, 550, text="X")
-        self.canvas.create_line(50, 550, 50, 50, arrow=tk.LAST)
-        self.canvas.create_text(50, 40, text="Y")
+        self.canvas.create_line(50, 550, 750, 550, arrow=tk.LAST, tags="axes")
+        self.canvas.create_text(760, 550, text="X", tags="axes")
+        self.canvas.create_line(50, 550, 50, 50, arrow=tk.LAST, tags="axes")
+        self.canvas.create_text(50, 40, text="Y", tags="axes")
 
     def load_properties(self):
         filepath = filedialog.askopenfilename()
@@ -76,6 +135,7 @@ class FrameAnalyzer:
                 self.properties_text.delete('1.0', tk.END)
                 self.properties_text.insert(tk.END, content)
                 self.parse_properties(content)
+                self.analysis_system = None
 
     def parse_properties(self, content):
         for line in content.splitlines():
@@ -106,6 +166,9 @@ class FrameAnalyzer:
             "sections": self.sections_data,
             "load_patterns": self.load_patterns_data,
             "load_combinations": self.load_combinations_data,
+            "udl": self.udl_data,
+            "vdl": self.vdl_data,
+            "point_loads": self.point_load_data,
         }
 
         filepath = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON Files", "*.json")])
@@ -127,10 +190,87 @@ class FrameAnalyzer:
             self.sections_data = project_data["sections"]
             self.load_patterns_data = project_data.get("load_patterns", [])
             self.load_combinations_data = project_data.get("load_combinations", [])
-
-            self.display_model()
+            self.udl_data = project_data.get("udl", [])
+            self.vdl_data = project_data.get("vdl", [])
+            self.point_load_data = project_data.get("point_loads", [])
+            self.merge_coincident_nodes()
+            self.history.reset(self.model_state())
+            self.pending_changes = {}
+            self.analysis_system = None
+            self.clear_results()
+
+            self.display_model(fit=True)
             self.change_units(self.units_var.get())
 
+    def import_file(self):
+        filepath = filedialog.askopenfilename(filetypes=[("CSV or DXF", "*.csv *.dxf"), ("CSV Files", "*.csv"), ("DXF Files", "*.dxf")])
+        if not filepath:
+            return
+        length_factor = self.get_length_factor()
+        try:
+            if filepath.lower().endswith(".dxf"):
+                self.nodes_data, elements = importers.elements_from_dxf(filepath, self.nodes_data, self.sections_data, length_factor)
+                self.elements_data = self.elements_data + elements
+            else:
+                columns = importers.read_csv(filepath)
+                kind = importers.table_kind(columns)
+                if kind == "nodes":
+                    self.nodes_data = self.nodes_data + importers.nodes_from_columns(columns, length_factor)
+                    self.merge_coincident_nodes()
+                elif kind == "elements":
+                    self.nodes_data, elements = importers.elements_from_columns(columns, self.nodes_data, self.sections_data, length_factor)
+                    self.elements_data = self.elements_data + elements
+                elif kind == "sections":
+                    self.sections_data = self.sections_data + importers.sections_from_columns(columns, self.materials_data, length_factor)
+                else:
+                    udl, vdl, point = importers.loads_from_columns(columns, length_factor, self.get_force_factor(),
+                                                                     len(self.elements_data))
+                    self.udl_data = self.udl_data + udl
+                    self.vdl_data = self.vdl_data + vdl
+                    self.point_load_data = self.point_load_data + point
+        except (ValueError, KeyError, IndexError) as e:
+            messagebox.showerror("Import Error", str(e))
+            return
+        self.record_change("Import")
+        self.display_model(fit=True)
+
+    # ----------------- HISTORY -----------------
+    def model_state(self):
+        return {
+            "nodes": self.nodes_data,
+            "elements": self.elements_data,
+            "materials": self.materials_data,
+            "sections": self.sections_data,
+            "udl": self.udl_data,
+            "vdl": self.vdl_data,
+            "point_loads": self.point_load_data,
+            "load_patterns": self.load_patterns_data,
+            "load_combinations": self.load_combinations_data,
+        }
+
+    def record_change(self, label):
+        changed = self.history.commit(self.model_state(), label)
+        self.pending_changes = history.merge_changes(self.pending_changes, changed)
+        if changed:
+            self.clear_results()
+
+    def undo(self):
+        self.apply_history(self.history.undo(self.model_state()))
+
+    def redo(self):
+        self.apply_history(self.history.redo(self.model_state()))
+
+    def apply_history(self, changed):
+        if not changed:
+            return
+        self.pending_changes = history.merge_changes(self.pending_changes, changed)
+        self.clear_results()
+        if hasattr(self, "geometry_dialog") and self.geometry_dialog.winfo_exists():
+            self.geometry_dialog.destroy()
+        if hasattr(self, "loads_dialog") and self.loads_dialog.winfo_exists():
+            self.loads_dialog.destroy()
+        self.display_model()
+
     def update_material_dialog_display(self, material_index=None):
         force_unit = self.current_units["force"]
         length_unit = self.current_units["length"]
@@ -176,23 +316,11 @@ class FrameAnalyzer:
         self.update_element_tab_dropdowns()
 
     def setup_section_tab(self, tab):
-        self.section_table_frame = tk.Frame(tab)
-        self.section_table_frame.pack()
-
-        headers = ["No.", "Section Name", "Material"]
-        for i, header in enumerate(headers):
-            tk.Label(self.section_table_frame, text=header, relief=tk.RIDGE, width=15).grid(row=0, column=i)
-
-        self.section_table_entries = []
+        self.section_table = tables.EditableTable(tab, ["No.", "Section Name", "Material"], editors={2: self.get_material_names},
+                                                  label="{}", on_select=self.select_section)
+        self.section_table.pack(fill=tk.BOTH, expand=True)
+        self.section_table.set_rows([["", section[0], self.get_material_name(section[3])] for section in self.sections_data])
         self.selected_section_index = None
-        if self.sections_data:
-            for section in self.sections_data:
-                material_name = self.materials_data[section[3]][0] if section[3] is not None and section[3] < len(self.materials_data) else ""
-                self.add_section_table_row(section[0], material_name)
-                if section[3] is not None:
-                    material_name = self.materials_data[section[3]][0] if section[3] is not None and section[3] < len(self.materials_data) else ""
-                    self.section_table_entries[-1][2].set(material_name)
-
 
         button_frame = tk.Frame(tab)
         button_frame.pack()
@@ -203,6 +331,12 @@ class FrameAnalyzer:
         self.modify_section_button = tk.Button(button_frame, text="Modify", command=self.modify_section, state=tk.DISABLED)
         self.modify_section_button.pack(side=tk.LEFT)
 
+    def select_section(self, index):
+        self.selected_section_index = index
+        state = tk.NORMAL if index is not None else tk.DISABLED
+        self.remove_section_button.config(state=state)
+        self.modify_section_button.config(state=state)
+
     def open_section_type_dialog(self):
         self.section_type_dialog = tk.Toplevel(self.geometry_dialog)
         self.section_type_dialog.title("Select Section Type")
@@ -267,63 +401,46 @@ class FrameAnalyzer:
             entry.grid(row=i+1, column=1)
             self.section_properties_entries[label_text] = entry
 
-        ok_button = tk.Button(self.section_properties_dialog, text="OK", command=lambda: self.save_section(section_type))
-        ok_button.grid(row=len(labels), column=0)
-
-        cancel_button = tk.Button(self.section_properties_dialog, text="Cancel", command=self.section_properties_dialog.destroy)
-        cancel_button.grid(row=len(labels), column=1)
-
-    def add_section_table_row(self, name, material_name=""):
-        row_num = len(self.section_table_entries) + 1
-
-        no_label = tk.Label(self.section_table_frame, text=str(row_num), relief=tk.RIDGE, width=15)
-        no_label.grid(row=row_num, column=0)
-
-        name_label = tk.Label(self.section_table_frame, text=name, relief=tk.RIDGE, width=15)
-        name_label.grid(row=row_num, column=1)
-
-        material_names = [m[0] for m in self.materials_data]
-        if not material_names:
-            material_names = [""]
-        material_var = tk.StringVar()
-        if material_name:
-            material_var.set(material_name)
-        material_menu = tk.OptionMenu(self.section_table_frame, material_var, *material_names)
-        material_menu.grid(row=row_num, column=2)
+        # Material
+        tk.Label(self.section_properties_dialog, text="Material:").grid(row=len(labels)+1, column=0, sticky="w")
+        self.selected_material_var = tk.StringVar()
+        material_menu = ttk.Combobox(self.section_properties_dialog, textvariable=self.selected_material_var, values=self.get_material_names())
+        material_menu.grid(row=len(labels)+1, column=1)
 
-        def on_click(event, index=row_num-1):
-            self.selected_section_index = index
-            for row in self.section_table_entries:
-                row[0].config(bg="white")
-                row[1].config(bg="white")
-            self.section_table_entries[index][0].config(bg="lightblue")
-            self.section_table_entries[index][1].config(bg="lightblue")
-            self.remove_section_button.config(state=tk.NORMAL)
-            self.modify_section_button.config(state=tk.NORMAL)
+        if modify:
+            section_data = self.sections_data[section_index]
+            name_entry.insert(0, section_data[0])
+            for label_text, value in section_data[2].items():
+                self.section_properties_entries[label_text].insert(0, round(value / self.get_length_factor(), 6))
+            self.selected_material_var.set(self.get_material_name(section_data[3]))
 
-        no_label.bind("<Button-1>", on_click)
-        name_label.bind("<Button-1>", on_click)
+        ok_button = tk.Button(self.section_properties_dialog, text="OK", command=lambda: self.save_section(section_type, modify, section_index))
+        ok_button.grid(row=len(labels)+2, column=0)
 
-        self.section_table_entries.append((no_label, name_label, material_var))
+        cancel_button = tk.Button(self.section_properties_dialog, text="Cancel", command=self.section_properties_dialog.destroy)
+        cancel_button.grid(row=len(labels)+2, column=1)
 
+    def add_section_table_row(self, name, material_name=""):
+        self.section_table.append(["", name, material_name])
 
     def save_section(self, section_type, modify=False, section_index=None):
         properties = {}
         section_name = self.section_properties_entries["Section Name:"].get()
         for label, entry in self.section_properties_entries.items():
             if label != "Section Name:":
-                properties[label] = float(entry.get())
+                properties[label] = float(entry.get()) * self.get_length_factor()
 
         material_name = self.selected_material_var.get()
         material_index = self.get_material_index_from_name(material_name)
 
         if modify:
             self.sections_data[section_index] = [section_name, section_type, properties, material_index]
-            self.section_table_entries[section_index][1].config(text=section_name)
-            self.section_table_entries[section_index][2].set(material_name)
+            self.section_table.set(section_index, 1, section_name)
+            self.section_table.set(section_index, 2, material_name)
         else:
             self.sections_data.append([section_name, section_type, properties, material_index])
             self.add_section_table_row(section_name, material_name)
+        self.record_change("Section")
 
         self.section_properties_dialog.destroy()
         if hasattr(self, 'section_type_dialog'):
@@ -333,42 +450,20 @@ class FrameAnalyzer:
     def remove_section(self):
         if self.selected_section_index is not None:
             self.sections_data.pop(self.selected_section_index)
-            for widget in self.section_table_entries[self.selected_section_index]:
-                if isinstance(widget, tk.StringVar):
-                    continue
-                widget.destroy()
-            self.section_table_entries.pop(self.selected_section_index)
-            # Re-number the remaining sections
-            for i, row in enumerate(self.section_table_entries):
-                row[0].config(text=str(i+1))
-            self.selected_section_index = None
+            self.section_table.delete(self.selected_section_index)
+            self.select_section(None)
+            self.record_change("Remove section")
 
     def modify_section(self):
         if self.selected_section_index is not None:
             section_data = self.sections_data[self.selected_section_index]
-            section_type = section_data[1]
-            labels = list(section_data[2].keys())
-
-            # Open dialog and populate
-            self.open_section_properties_dialog(section_type, labels, modify=True, section_index=self.selected_section_index)
-
-            # Change the OK button to call save_section with modify=True
-            ok_button = self.section_properties_dialog.grid_slaves(row=len(self.section_properties_entries), column=0)[0]
-            ok_button.config(command=lambda: self.save_section(section_type, modify=True, section_index=self.selected_section_index))
+            self.open_section_properties_dialog(section_data[1], list(section_data[2].keys()), modify=True, section_index=self.selected_section_index)
 
     def setup_material_tab(self, tab):
-        self.material_table_frame = tk.Frame(tab)
-        self.material_table_frame.pack()
-
-        headers = ["No.", "Material"]
-        for i, header in enumerate(headers):
-            tk.Label(self.material_table_frame, text=header, relief=tk.RIDGE, width=15).grid(row=0, column=i)
-
-        self.material_table_entries = []
+        self.material_table = tables.EditableTable(tab, ["No.", "Material"], label="{}", on_select=self.select_material)
+        self.material_table.pack(fill=tk.BOTH, expand=True)
+        self.material_table.set_rows([["", material[0]] for material in self.materials_data])
         self.selected_material_index = None
-        if self.materials_data:
-            for material in self.materials_data:
-                self.add_material_table_row(material[0])
 
         button_frame = tk.Frame(tab)
         button_frame.pack()
@@ -379,6 +474,20 @@ class FrameAnalyzer:
         self.modify_material_button = tk.Button(button_frame, text="Modify", command=self.modify_material, state=tk.DISABLED)
         self.modify_material_button.pack(side=tk.LEFT)
 
+    def select_material(self, index):
+        self.selected_material_index = index
+        state = tk.NORMAL if index is not None else tk.DISABLED
+        self.remove_material_button.config(state=state)
+        self.modify_material_button.config(state=state)
+
+    def get_material_names(self):
+        return [m[0] for m in self.materials_data] or [""]
+
+    def get_material_name(self, material_index):
+        if material_index is not None and material_index < len(self.materials_data):
+            return self.materials_data[material_index][0]
+        return ""
+
     def open_material_dialog(self, modify=False, material_index=None):
         self.material_dialog = tk.Toplevel(self.geometry_dialog)
         self.material_dialog.title("Material Properties")
@@ -403,28 +512,7 @@ class FrameAnalyzer:
         cancel_button.grid(row=6, column=1)
 
     def add_material_table_row(self, name):
-        row_num = len(self.material_table_entries) + 1
-
-        no_label = tk.Label(self.material_table_frame, text=str(row_num), relief=tk.RIDGE, width=15)
-        no_label.grid(row=row_num, column=0)
-
-        name_label = tk.Label(self.material_table_frame, text=name, relief=tk.RIDGE, width=15)
-        name_label.grid(row=row_num, column=1)
-
-        def on_click(event, index=row_num-1):
-            self.selected_material_index = index
-            for row in self.material_table_entries:
-                row[0].config(bg="white")
-                row[1].config(bg="white")
-            self.material_table_entries[index][0].config(bg="lightblue")
-            self.material_table_entries[index][1].config(bg="lightblue")
-            self.remove_material_button.config(state=tk.NORMAL)
-            self.modify_material_button.config(state=tk.NORMAL)
-
-        no_label.bind("<Button-1>", on_click)
-        name_label.bind("<Button-1>", on_click)
-
-        self.material_table_entries.append((no_label, name_label))
+        self.material_table.append(["", name])
 
     def save_material(self, modify, material_index):
         try:
@@ -449,92 +537,37 @@ class FrameAnalyzer:
         if modify:
             self.materials_data[material_index] = material_data
             # Update the table
-            self.material_table_entries[material_index][1].config(text=name)
+            self.material_table.set(material_index, 1, name)
         else:
             self.materials_data.append(material_data)
             self.add_material_table_row(name)
 
         self.material_dialog.destroy()
-        self.update_section_tab_material_dropdown()
-
-    def update_section_tab_material_dropdown(self):
-        material_names = [m[0] for m in self.materials_data]
-        if not material_names:
-            material_names = [""]
-
-        for row in self.section_table_entries:
-            material_var = row[2]
-            material_menu = self.section_table_frame.grid_slaves(row=self.section_table_entries.index(row)+1, column=2)[0]
-            material_menu['menu'].delete(0, 'end')
-            for name in material_names:
-                material_menu['menu'].add_command(label=name, command=tk._setit(material_var, name))
+        self.record_change("Material")
 
     def remove_material(self):
         if self.selected_material_index is not None:
             self.materials_data.pop(self.selected_material_index)
-            for widget in self.material_table_entries[self.selected_material_index]:
-                widget.destroy()
-            self.material_table_entries.pop(self.selected_material_index)
-            # Re-number the remaining materials
-            for i, row in enumerate(self.material_table_entries):
-                row[0].config(text=str(i+1))
-            self.selected_material_index = None
+            self.material_table.delete(self.selected_material_index)
+            self.select_material(None)
+            self.record_change("Remove material")
 
     def modify_material(self):
         if self.selected_material_index is not None:
             self.open_material_dialog(modify=True, material_index=self.selected_material_index)
 
     def update_node_dialog_display(self):
-        unit = self.current_units["length"]
-        for i, data in enumerate(self.nodes_data):
-            if unit == "mm":
-                x_display = data[0] * 1000
-                y_display = data[1] * 1000
-            else:
-                x_display = data[0]
-                y_display = data[1]
-
-            self.node_table_entries[i][1].delete(0, tk.END)
-            self.node_table_entries[i][1].insert(0, round(x_display, 3))
-
-            self.node_table_entries[i][2].delete(0, tk.END)
-            self.node_table_entries[i][2].insert(0, round(y_display, 3))
-
-            self.node_table_entries[i][3].delete(0, tk.END)
-            self.node_table_entries[i][3].insert(0, data[2])
-
+        length_factor = 1000 if self.current_units["length"] == "mm" else 1
+        self.node_table.set_rows(tables.node_rows(self.nodes_data, length_factor))
 
     def setup_element_tab(self, tab):
-        self.element_table_frame = tk.Frame(tab)
-        self.element_table_frame.pack()
-
-        headers = ["Element", "Start", "End", "Section", "Moment Release Start", "Moment Release End"]
-        for i, header in enumerate(headers):
-            tk.Label(self.element_table_frame, text=header, relief=tk.RIDGE, width=15).grid(row=0, column=i)
-
-        self.element_table_entries = []
-        if self.elements_data:
-            for i, data in enumerate(self.elements_data):
-                self.add_element_table_row()
-                start_node_index = self.get_node_index_from_coords(data[0], data[1])
-                end_node_index = self.get_node_index_from_coords(data[2], data[3])
-                self.element_table_entries[i][1].set(f"N{start_node_index+1}")  # Start node
-                self.element_table_entries[i][2].set(f"N{end_node_index+1}")    # End node
-
-                # Section dropdown (StringVar)
-                # Check if section index exists in data
-                if len(data) > 6 and data[6] is not None and 0 <= data[6] < len(self.sections_data):
-                    section_name = self.sections_data[data[6]][0]
-                else:
-                    section_name = self.sections_data[0][0] if self.sections_data else ""
-                self.element_table_entries[i][3].set(section_name)
-
-
-                # Moment release entries (these are now at index 4 and 5)
-                self.element_table_entries[i][4].insert(0, data[4])
-                self.element_table_entries[i][5].insert(0, data[5])
-
-        else:
+        self.element_table = tables.EditableTable(
+            tab, ["Element", "Start", "End", "Section", "Moment Release Start", "Moment Release End"],
+            editors={1: lambda: self.node_names, 2: lambda: self.node_names, 3: self.get_section_names, 4: "entry", 5: "entry"},
+            label="E{}")
+        self.element_table.pack(fill=tk.BOTH, expand=True)
+        self.element_table.set_rows(tables.element_rows(self.nodes_data, self.elements_data, self.sections_data))
+        if not self.elements_data:
             self.add_element_table_row()
 
         button_frame = tk.Frame(tab)
@@ -547,96 +580,29 @@ class FrameAnalyzer:
         tk.Button(button_frame, text="Cancel", command=self.geometry_dialog.destroy).pack(side=tk.LEFT)
 
     def add_element_table_row(self):
-        row_entries = []
-        row_num = len(self.element_table_entries) + 1
-
-        # Element No.
-        element_label = tk.Label(self.element_table_frame, text=f"E{row_num}", relief=tk.RIDGE, width=15)
-        element_label.grid(row=row_num, column=0)
-        row_entries.append(element_label)
-
-        # Start Node Dropdown
-        node_names = [f"N{i+1}" for i in range(len(self.nodes_data))] or [""]
-        start_node_var = tk.StringVar()
-        start_node_menu = tk.OptionMenu(self.element_table_frame, start_node_var, *node_names)
-        start_node_menu.grid(row=row_num, column=1)
-        row_entries.append(start_node_var)
-
-        # End Node Dropdown
-        end_node_var = tk.StringVar()
-        end_node_menu = tk.OptionMenu(self.element_table_frame, end_node_var, *node_names)
-        end_node_menu.grid(row=row_num, column=2)
-        row_entries.append(end_node_var)
-
-        # Section Dropdown
-        section_names = [s[0] for s in self.sections_data] or [""]
-        section_var = tk.StringVar()
-        if section_names:
-            section_var.set(section_names[0])
-        section_menu = tk.OptionMenu(self.element_table_frame, section_var, *section_names)
-        section_menu.grid(row=row_num, column=3)
-        row_entries.append(section_var)
-
-        # Moment Release Start
-        moment_release_start_entry = tk.Entry(self.element_table_frame, width=15)
-        moment_release_start_entry.grid(row=row_num, column=4)
-        row_entries.append(moment_release_start_entry)
-
-        # Moment Release End
-        moment_release_end_entry = tk.Entry(self.element_table_frame, width=15)
-        moment_release_end_entry.grid(row=row_num, column=5)
-        row_entries.append(moment_release_end_entry)
-
-        self.element_table_entries.append(row_entries)
+        self.element_table.append(["", "", "", self.get_section_names()[0], "", ""])
 
+    def get_section_names(self):
+        return [s[0] for s in self.sections_data] or [""]
 
     def update_element_tab_dropdowns(self):
-        node_names = [f"N{i+1}" for i in range(len(self.nodes_data))]
-        if not node_names:
-            node_names = [""]
-
-        for row in self.element_table_entries:
-            start_node_var = row[1]
-            start_node_menu = self.element_table_frame.grid_slaves(row=self.element_table_entries.index(row)+1, column=1)[0]
-            start_node_menu['menu'].delete(0, 'end')
-            for name in node_names:
-                start_node_menu['menu'].add_command(label=name, command=tk._setit(start_node_var, name))
-
-            end_node_var = row[2]
-            end_node_menu = self.element_table_frame.grid_slaves(row=self.element_table_entries.index(row)+1, column=2)[0]
-            end_node_menu['menu'].delete(0, 'end')
-            for name in node_names:
-                end_node_menu['menu'].add_command(label=name, command=tk._setit(end_node_var, name))
+        # Every node editor shares this list
+        self.node_names = tables.node_names(len(self.nodes_data)) or [""]
 
     def remove_element_table_row(self):
-        if len(self.element_table_entries) > 1:
-            row_to_remove = self.element_table_entries.pop()
-            for widget in row_to_remove:
-                if isinstance(widget, tk.StringVar):
-                    continue
-                widget.destroy()
+        if len(self.element_table.rows) > 1:
+            self.element_table.delete(len(self.element_table.rows) - 1)
 
     def save_elements_from_table(self, close_dialog=True):
         try:
-            self.elements_data = []
-            for row in self.element_table_entries:
-                start_node = int(row[1].get().replace("N", "")) - 1
-                end_node = int(row[2].get().replace("N", "")) - 1
-                section_name = row[3].get()
-                section_index = self.get_section_index_from_name(section_name)
-                moment_release_start = row[4].get()
-                moment_release_end = row[5].get()
-
-                x1, y1, _ = self.nodes_data[start_node]
-                x2, y2, _ = self.nodes_data[end_node]
-
-                self.elements_data.append([x1, y1, x2, y2, moment_release_start, moment_release_end, section_index])
-
-            if close_dialog:
-                self.geometry_dialog.destroy()
+            self.elements_data = tables.elements_from_rows(self.element_table.rows, self.nodes_data, self.sections_data)
         except ValueError:
             messagebox.showerror("Input Error", "Please select start, end nodes and section for all elements.")
             return
+        self.record_change("Elements")
+
+        if close_dialog:
+            self.geometry_dialog.destroy()
 
     def get_section_index_from_name(self, name):
         for i, section_data in enumerate(self.sections_data):
@@ -649,27 +615,13 @@ class FrameAnalyzer:
         self.display_model()
 
     def setup_node_tab(self, tab):
-        self.node_table_frame = tk.Frame(tab)
-        self.node_table_frame.grid(row=1, column=0, sticky="nsew")
         note = tk.Label(tab, text="Support input: x = X-restrain, y = Y-restrain, Z = moment fix.\nExamples: 'xy' = pin, 'xyZ' = fixed, 'y' = vertical roller", fg="gray", font=("Arial", 8))
         note.grid(row=0, column=0, sticky="w")
 
-        headers = ["Node", "x", "y", "Support"]
-        for i, header in enumerate(headers):
-            tk.Label(self.node_table_frame, text=header, relief=tk.RIDGE, width=15).grid(row=0, column=i)
-
-        self.node_table_entries = []
-        if self.nodes_data:
-            for i, data in enumerate(self.nodes_data):
-                self.add_node_table_row()
-                length_unit = self.current_units["length"]
-                x_display = data[0] * 1000 if length_unit == "mm" else data[0]
-                y_display = data[1] * 1000 if length_unit == "mm" else data[1]
-                self.node_table_entries[i][1].insert(0, round(x_display, 3))
-                self.node_table_entries[i][2].insert(0, round(y_display, 3))
-                self.node_table_entries[i][3].insert(0, data[2])
-
-        else:
+        self.node_table = tables.EditableTable(tab, ["Node", "x", "y", "Support"], editors={1: "entry", 2: "entry", 3: "entry"}, label="N{}")
+        self.node_table.grid(row=1, column=0, sticky="nsew")
+        self.update_node_dialog_display()
+        if not self.nodes_data:
             self.add_node_table_row()
 
         button_frame = tk.Frame(tab)
@@ -682,61 +634,49 @@ class FrameAnalyzer:
         tk.Button(button_frame, text="Cancel", command=self.geometry_dialog.destroy).pack(side=tk.LEFT)
 
     def add_node_table_row(self):
-        row_entries = []
-        row_num = len(self.node_table_entries) + 1
-
-        node_label = tk.Label(self.node_table_frame, text=f"N{row_num}", relief=tk.RIDGE, width=15)
-        node_label.grid(row=row_num, column=0)
-        row_entries.append(node_label)
-
-        for i in range(1, 4):
-            entry = tk.Entry(self.node_table_frame, width=15)
-            entry.grid(row=row_num, column=i)
-            row_entries.append(entry)
-        self.node_table_entries.append(row_entries)
+        self.node_table.append(["", "", "", ""])
 
     def remove_node_table_row(self):
-        if len(self.node_table_entries) > 1:
-            row_to_remove = self.node_table_entries.pop()
-            for widget in row_to_remove:
-                widget.destroy()
+        if len(self.node_table.rows) > 1:
+            self.node_table.delete(len(self.node_table.rows) - 1)
 
     def save_nodes_from_table(self, close_dialog=True):
         try:
-            self.nodes_data = []
-            unit = self.current_units["length"]
-            for row in self.node_table_entries:
-                x_input = float(row[1].get())
-                y_input = float(row[2].get())
-                support = row[3].get()
-
-                if unit == "mm":
-                    x = x_input / 1000
-                    y = y_input / 1000
-                else:
-                    x = x_input
-                    y = y_input
+            old_nodes = self.nodes_data
+            length_factor = 1000 if self.current_units["length"] == "mm" else 1
+            self.nodes_data = tables.nodes_from_rows(self.node_table.rows, length_factor)
 
-                self.nodes_data.append([x, y, support])
+            self.move_attached_elements(old_nodes)
+            self.merge_coincident_nodes()
 
             # Save section material mapping
             self.save_sections_from_table()
+            self.record_change("Nodes")
 
             if close_dialog:
                 self.geometry_dialog.destroy()
         except ValueError:
             messagebox.showerror("Input Error", "Coordinate fields cannot be empty.")
 
+    def move_attached_elements(self, old_nodes):
+        # Elements store their end coordinates, so carry them along with moved nodes
+        moved = {}
+        for old, new in zip(old_nodes, self.nodes_data):
+            if (old[0], old[1]) != (new[0], new[1]):
+                moved.setdefault((old[0], old[1]), (new[0], new[1]))
+        if not moved:
+            return
+        for e in self.elements_data:
+            if (e[0], e[1]) in moved:
+                e[0], e[1] = moved[(e[0], e[1])]
+            if (e[2], e[3]) in moved:
+                e[2], e[3] = moved[(e[2], e[3])]
 
     def save_sections_from_table(self):
-        for i, row in enumerate(self.section_table_entries):
-            section_name = row[1].cget("text")  # Label text for section name
-            material_name = row[2].get()  # Selected material from dropdown
-            material_index = self.get_material_index_from_name(material_name)
-
-            # Update section data
-            self.sections_data[i][0] = section_name
-            self.sections_data[i][3] = material_index
+        for i, row in enumerate(self.section_table.rows):
+            # Update section data with the selected material
+            self.sections_data[i][0] = row[1]
+            self.sections_data[i][3] = self.get_material_index_from_name(row[2])
 
     def get_material_index_from_name(self, name):
         for i, material_data in enumerate(self.materials_data):
@@ -750,200 +690,223 @@ class FrameAnalyzer:
         self.display_model()
 
     # ----------------- DRAWING -----------------
-    def draw_support(self, x, y, support):
-        size = 20
-        base = 8
-
-        if support == "xy":  # Pinned
-            self.canvas.create_polygon(x - base, y + size, x + base, y + size, x, y, fill="blue", outline="black")
-
-        elif support == "y":  # Vertical Roller
-            self.canvas.create_polygon(x - base, y + size, x + base, y + size, x, y, fill="white", outline="black")
-            self.canvas.create_oval(x - 10, y + size, x - 6, y + size + 4, fill="black")
-            self.canvas.create_oval(x + 6, y + size, x + 10, y + size + 4, fill="black")
-
-        elif support == "x":  # Horizontal Roller
-            self.canvas.create_polygon(x, y - base, x, y + base, x - size, y, fill="white", outline="black")
-            self.canvas.create_oval(x - size - 8, y - 5, x - size - 4, y - 1, fill="black")
-            self.canvas.create_oval(x - size - 8, y + 1, x - size - 4, y + 5, fill="black")
-
-        elif support == "xyZ":  # Fixed
-            self.canvas.create_line(x - base, y + size, x + base, y + size, width=4, fill="black")
-            self.canvas.create_line(x, y, x, y + size, width=2, fill="blue")
-
-        elif support == "Z":  # Only moment fixed
-            self.canvas.create_oval(x - 5, y - 5, x + 5, y + 5, outline="green", width=2)
-
-        else:
-            # Fallback logic for any combinations
-            if "x" in support:
-                self.canvas.create_line(x - base, y, x + base, y, fill="red", width=2)
-            if "y" in support:
-                self.canvas.create_line(x, y - base, x, y + base, fill="red", width=2)
-            if "Z" in support:
-                self.canvas.create_oval(x - 5, y - 5, x + 5, y + 5, outline="green", width=2)
-
-
-    def draw_moment_release(self, x, y, release):
-        size = 5
-        if "X" in release:
-            self.canvas.create_oval(x - size, y - size, x + size, y + size, outline="green", width=2)
-        if "Y" in release:
-            self.canvas.create_oval(x - size, y - size, x + size, y + size, outline="green", width=2)
-
-    def draw_udl(self, x1, y1, x2, y2, magnitude, direction):
-        length = np.sqrt((x2 - x1)**2 + (y2 - y1)**2)
-        num_arrows = int(length / 20)
-        if num_arrows == 0: num_arrows = 1
-
-        for i in range(num_arrows + 1):
-            t = i / num_arrows
-            x = x1 + t * (x2 - x1)
-            y = y1 + t * (y2 - y1)
-
-            if direction == "Y":
-                self.canvas.create_line(x, y, x, y + magnitude, arrow=tk.LAST, fill="purple")
-            elif direction == "X":
-                self.canvas.create_line(x, y, x + magnitude, y, arrow=tk.LAST, fill="purple")
-
-    def draw_vdl(self, x1, y1, x2, y2, start_mag, end_mag, direction):
-        length = np.sqrt((x2 - x1)**2 + (y2 - y1)**2)
-        num_arrows = int(length / 20)
-        if num_arrows == 0: num_arrows = 1
-
-        for i in range(num_arrows + 1):
-            t = i / num_arrows
-            x = x1 + t * (x2 - x1)
-            y = y1 + t * (y2 - y1)
-            mag = start_mag + t * (end_mag - start_mag)
-
-            if direction == "Y":
-                self.canvas.create_line(x, y, x, y + mag, arrow=tk.LAST, fill="orange")
-            elif direction == "X":
-                self.canvas.create_line(x, y, x + mag, y, arrow=tk.LAST, fill="orange")
-
-    def draw_point_load(self, x, y, magnitude, direction):
-        if direction == "Y":
-            self.canvas.create_line(x, y, x, y + magnitude, arrow=tk.LAST, fill="red", width=2)
-        elif direction == "X":
-            self.canvas.create_line(x, y, x + magnitude, y, arrow=tk.LAST, fill="red", width=2)
-
-    def display_model(self):
-        self.canvas.delete("all")
-        self.draw_axes()
-        self.lines = []
-
-        if not self.nodes_data and not self.elements_data:
+    def display_model(self, fit=False):
+        self.renderer.render(self.nodes_data, self.elements_data, self.udl_data, self.vdl_data, self.point_load_data, fit=fit)
+        self.renderer.highlight(self.selected_entity)
+
+    # ----------------- NAVIGATION -----------------
+    def bind_navigation(self):
+        self.canvas.bind("<MouseWheel>", lambda event: self.zoom_at(event, 1.2 if event.delta > 0 else 1 / 1.2))
+        self.canvas.bind("<Button-4>", lambda event: self.zoom_at(event, 1.2))
+        self.canvas.bind("<Button-5>", lambda event: self.zoom_at(event, 1 / 1.2))
+        for button in (2, 3):
+            self.canvas.bind(f"<ButtonPress-{button}>", self.start_pan)
+            self.canvas.bind(f"<B{button}-Motion>", self.pan_to)
+        self.canvas.bind("<Button-1>", self.select_at)
+        self.canvas.bind("<Configure>", self.resize_view)
+
+    def resize_view(self, event):
+        self.renderer.resize(event.width, event.height)
+        self.renderer.highlight(self.selected_entity)
+
+    def zoom_at(self, event, factor):
+        self.renderer.zoom(factor, event.x, event.y)
+        self.schedule_refresh()
+
+    def start_pan(self, event):
+        self.pan_start = (event.x, event.y)
+
+    def pan_to(self, event):
+        if self.pan_start is None:
             return
-
-        x_coords = [n[0] for n in self.nodes_data] + [e[0] for e in self.elements_data] + [e[2] for e in self.elements_data]
-        y_coords = [n[1] for n in self.nodes_data] + [e[1] for e in self.elements_data] + [e[3] for e in self.elements_data]
-        min_x, max_x = min(x_coords), max(x_coords)
-        min_y, max_y = min(y_coords), max(y_coords)
-        width_m = max_x - min_x if max_x != min_x else 1
-        height_m = max_y - min_y if max_y != min_y else 1
-
-        canvas_width, canvas_height = 800, 600
-        scale = min((canvas_width - 100) / width_m, (canvas_height - 100) / height_m) * 0.9
-        center_x, center_y = (max_x + min_x) / 2, (max_y + min_y) / 2
-        canvas_center_x, canvas_center_y = 400, 300
-
-        node_map = {}
-        node_id = 1
-
-        for i, node_data in enumerate(self.nodes_data):
-            x = canvas_center_x + (node_data[0] - center_x) * scale
-            y = canvas_center_y - (node_data[1] - center_y) * scale
-
-            if (x, y) not in node_map:
-                node_map[(x,y)] = f"N{i+1}"
-                self.canvas.create_oval(x - 4, y - 4, x + 4, y + 4, fill="black")
-                self.canvas.create_text(x + 10, y - 10, text=f"N{i+1}", fill="blue")
-
-            if node_data[2]:
-                self.draw_support(x, y, node_data[2])
-
-        for e in self.elements_data:
-            x1 = canvas_center_x + (e[0] - center_x) * scale
-            y1 = canvas_center_y - (e[1] - center_y) * scale
-            x2 = canvas_center_x + (e[2] - center_x) * scale
-            y2 = canvas_center_y - (e[3] - center_y) * scale
-
-            line = self.canvas.create_line(x1, y1, x2, y2, width=2)
-            self.lines.append(line)
-
-            if e[4]:
-                self.draw_moment_release(x1, y1, e[4])
-            if e[5]:
-                self.draw_moment_release(x2, y2, e[5])
-
-        for udl in self.udl_data:
-            element_index, magnitude, direction, start_pos, end_pos = udl
-            element = self.elements_data[element_index]
-            x1, y1, x2, y2 = element[0], element[1], element[2], element[3]
-            self.draw_udl(x1, y1, x2, y2, magnitude, direction)
-
-        for vdl in self.vdl_data:
-            element_index, start_mag, end_mag, direction, start_pos, end_pos = vdl
-            element = self.elements_data[element_index]
-            x1, y1, x2, y2 = element[0], element[1], element[2], element[3]
-            self.draw_vdl(x1, y1, x2, y2, start_mag, end_mag, direction)
-
-        for pl in self.point_load_data:
-            element_index, magnitude, direction, distance = pl
-            element = self.elements_data[element_index]
-            x1, y1, x2, y2 = element[0], element[1], element[2], element[3]
-            t = distance / np.sqrt((x2 - x1)**2 + (y2 - y1)**2)
-            x = x1 + t * (x2 - x1)
-            y = y1 + t * (y2 - y1)
-            self.draw_point_load(x, y, magnitude, direction)
+        self.renderer.pan(event.x - self.pan_start[0], event.y - self.pan_start[1])
+        self.pan_start = (event.x, event.y)
+        self.schedule_refresh()
+
+    def schedule_refresh(self):
+        # Re-cull and re-pick the level of detail once navigation settles
+        if self.refresh_job is not None:
+            self.master.after_cancel(self.refresh_job)
+        self.refresh_job = self.master.after(150, self.refresh_view)
+
+    def refresh_view(self):
+        self.refresh_job = None
+        self.renderer.refresh()
+        self.renderer.highlight(self.selected_entity)
+
+    def fit_view(self):
+        self.renderer.fit_view()
+        self.renderer.highlight(self.selected_entity)
+
+    def select_at(self, event):
+        self.selected_entity = self.renderer.pick(event.x, event.y)
+        self.renderer.highlight(self.selected_entity)
+        if self.selected_entity is None:
+            self.master.title("2D Frame Analyzer")
+        elif self.selected_entity.startswith("node"):
+            self.master.title(f"2D Frame Analyzer - Node {int(self.selected_entity[4:]) + 1}")
+        else:
+            self.master.title(f"2D Frame Analyzer - Element {int(self.selected_entity[7:]) + 1}")
 
     # ---------------- FEM Analysis ----------------
     def analyze(self):
         if not self.elements_data:
             messagebox.showerror("Error", "No elements to analyze.")
             return
-        if not self.properties:
-            messagebox.showerror("Error", "Load properties first.")
-            return
 
-        # Prepare node list
-        fem_nodes = [fem.Node(x, y) for x, y, support in self.nodes_data]
-
-        # Prepare elements
-        elements = []
-        for e in self.elements_data:
-            start_node_index = self.get_node_index_from_coords(e[0], e[1])
-            end_node_index = self.get_node_index_from_coords(e[2], e[3])
-            n1 = fem_nodes[start_node_index]
-            n2 = fem_nodes[end_node_index]
-            elements.append(fem.FrameElement(n1, n2, self.properties['E'], self.properties['A'], self.properties['I'], e[4], e[5]))
-
-        # Assemble global stiffness matrix
-        K = fem.assemble_stiffness_matrix(elements, fem_nodes)
-
-        # Apply example load: downward force on node 2
-        F = np.zeros(len(fem_nodes) * 3)
-        F[5] = -100 * self.get_force_factor()  # Example load scaled by units
+        if not self.profile_var.get():
+            U = self.run_analysis()
+        else:
+            with profiling.profile(track_memory=True) as profiler:
+                U = self.run_analysis()
+            filepath = filedialog.asksaveasfilename(title="Save Profile", defaultextension=".json", filetypes=[("JSON Files", "*.json")])
+            if filepath:
+                profiler.save(filepath)
+
+        if U is not None:
+            case_names, U = U
+            self.results = diagrams.Results(self.analysis_model, U, case_names, members=self.analysis_members, factors=self.load_factors)
+            self.renderer.clear_overlays()
+            self.result_case_menu.config(values=case_names)
+            if self.result_case_var.get() not in case_names:
+                self.result_case_var.set(case_names[0])
+            if self.result_kind_var.get() == "None":
+                self.result_kind_var.set("Deformed")
+            self.show_results()
+            case = self.results.case(self.result_case_var.get())
+            messagebox.showinfo("Analysis Complete", f"Displacements ({case_names[case]}):\n{self.results.displacements(case)}")
+
+    def show_results(self):
+        kind = self.result_kind_var.get()
+        if self.results is None or kind == "None" or self.result_case_var.get() not in self.results.case_names:
+            self.renderer.show_overlay(None)
+            return
+        case = self.results.case(self.result_case_var.get())
+        key = (kind, case)
+        if key in self.renderer.overlay_data:
+            self.renderer.show_overlay(key)
+        else:
+            self.renderer.show_overlay(key, self.results.polylines(kind, case), "red" if kind == "Deformed" else "blue")
+
+    def clear_results(self):
+        # Results belong to the analysed model; the overlays go with them
+        self.results = None
+        self.renderer.clear_overlays()
+        self.result_case_menu.config(values=[])
+        self.result_case_var.set("")
+
+    def run_analysis(self):
+        with profiling.stage("analyze", nodes=len(self.nodes_data), elements=len(self.elements_data)):
+            with profiling.stage("stiffness"):
+                system = self.get_analysis_system()
+            if system is None:
+                return None
+
+            with profiling.stage("loads"):
+                try:
+                    case_names, F = self.get_load_cases(self.analysis_model)
+                except ValueError as error:
+                    messagebox.showerror("Error", str(error))
+                    return None
+
+            # Mechanisms, loose parts and loads the model cannot carry are reported by name
+            # before the factorization can fail on them
+            with profiling.stage("diagnostics"):
+                issues = diagnostics.diagnose(self.analysis_model, F=F)
+            if issues:
+                issue = issues[0]
+                self.renderer.highlight(f"node{issue['nodes'][0]}" if issue["nodes"] else f"element{issue['elements'][0]}")
+                messagebox.showerror("Unstable Model", diagnostics.report(issues))
+                return None
+
+            # Solve every load case against one factorization, reusing stored ones for unchanged models
+            if self.result_cache is None:
+                return case_names, system.solve(F)
+            return case_names, cache.cached_solve(self.result_cache, system, self.analysis_model, F,
+                                                  sparse=fem.issparse(system.K), precision=system.precision)
+
+    def get_analysis_system(self):
+        # Reuse the last stiffness matrix when the edits since then only changed member properties
+        rebuild, elements, loads = history.invalidated(self.pending_changes, self.elements_data, self.sections_data)
+        try:
+            if self.analysis_system is None or rebuild:
+                self.analysis_model = model.build_model(self.nodes_data, self.elements_data, self.sections_data, self.materials_data, self.properties)
+                self.analysis_system = self.analysis_model.reanalysis_system()
+            elif elements:
+                elements = sorted(elements)
+                section_properties = sections.compute_sections(self.sections_data)
+                values = [model.element_properties(self.elements_data[i], self.sections_data, self.materials_data, section_properties, self.properties)
+                          for i in elements]
+                if None in values:
+                    raise ValueError("Load properties first.")
+                E, A, I = np.array(values, dtype=float).T
+                self.analysis_system.update(elements, A, I, E)
+                self.analysis_model.E[elements] = E
+                self.analysis_model.A[elements] = A
+                self.analysis_model.I[elements] = I
+        except ValueError as error:
+            self.analysis_system = None
+            messagebox.showerror("Error", str(error))
+            return None
+        self.pending_changes = {}
+        return self.analysis_system
+
+    def example_load(self, frame_model):
+        # Placeholder when no member loads are defined: moment of 100 on node 2 (DOF 5 is its rotation)
+        F = np.zeros(frame_model.num_dof)
+        F[5] = -100 * self.get_force_factor()
+        return F
+
+    def get_load_cases(self, frame_model):
+        case_names, F, self.load_factors, self.analysis_members = analysis.load_cases(
+            frame_model, self.udl_data, self.vdl_data, self.point_load_data, self.load_combinations_data,
+            self.example_load(frame_model))
+        return case_names, F
+
+    def get_load_vector(self, frame_model, members=None):
+        return analysis.load_vector(frame_model, self.udl_data, self.vdl_data, self.point_load_data, members,
+                                    self.example_load(frame_model))
+
+    def optimize_sections(self):
+        if not self.elements_data or not self.sections_data:
+            messagebox.showerror("Error", "Define elements and at least one section first.")
+            return
+        allowable_stress = simpledialog.askfloat("Optimize", "Allowable stress:", parent=self.master)
+        if allowable_stress is None:
+            return
+        drift_limit = simpledialog.askfloat("Optimize", "Inter-storey drift limit (storey drift / storey height), 0 for none:", parent=self.master)
+        if drift_limit is None:
+            return
 
-        # Boundary conditions
-        bcs = []
-        for i, node_data in enumerate(self.nodes_data):
-            support = node_data[2]
-            if "x" in support: bcs.append(i * 3)
-            if "y" in support: bcs.append(i * 3 + 1)
-            if "X" in support: bcs.append(i * 3 + 2)
+        try:
+            frame_model = model.build_model(self.nodes_data, self.elements_data, self.sections_data, self.materials_data, self.properties)
+            F = self.get_load_vector(frame_model)
+        except ValueError as error:
+            messagebox.showerror("Error", str(error))
+            return
 
-        # Solve
-        U = fem.solve(K, F, bcs)
+        # Allowable stress is entered in the current force / length^2 units
+        stress = allowable_stress * self.get_force_factor() / self.get_length_factor()**2
+        result = optimize.size_sections(frame_model, self.sections_data, F, stress, drift_limit or None,
+                                        materials_data=self.materials_data)
+        for e, section_index in zip(self.elements_data, result["sections"]):
+            if len(e) > 6:
+                e[6] = int(section_index)
+            else:
+                e.append(int(section_index))
+        self.record_change("Optimize sections")
 
-        messagebox.showinfo("Analysis Complete", f"Displacements:\n{U}")
+        status = "Converged" if result["converged"] else "Did not converge"
+        messagebox.showinfo("Optimization Complete", f"{status} after {result['iterations']} iterations.\n"
+                            f"Max stress ratio: {result['stress_ratio']:.3f}\nMax drift ratio: {result['drift_ratio']:.5f}")
 
     def get_node_index_from_coords(self, x, y):
-        for i, node_data in enumerate(self.nodes_data):
-            if node_data[0] == x and node_data[1] == y:
-                return i
-        return -1
+        return int(model.locate_nodes(self.nodes_data, [(x, y)])[0])
+
+    def merge_coincident_nodes(self):
+        self.nodes_data, self.elements_data, merged = model.merge_coincident_nodes(self.nodes_data, self.elements_data)
+        if merged:
+            messagebox.showinfo("Nodes Merged", f"Merged {merged} coincident node(s).")
 
     def change_units(self, selected):
         force, length, temp = selected.split(", ")
@@ -955,7 +918,7 @@ class FrameAnalyzer:
         self.loads_dialog = tk.Toplevel(self.master)
         self.loads_dialog.title("Applied Loads")
 
-        notebook = ttk.Notebook(self.load_comb_dialog)
+        notebook = ttk.Notebook(self.loads_dialog)
         notebook.pack(expand=True, fill="both")
 
         load_pattern_tab = tk.Frame(notebook)
@@ -968,21 +931,12 @@ class FrameAnalyzer:
         self.setup_load_combinations_tab(load_combinations_tab)
 
     def setup_load_combinations_tab(self, tab):
-        self.load_combination_table_frame = tk.Frame(tab)
-        self.load_combination_table_frame.pack()
-
-        headers = ["Combination", "Dead", "Live", "Snow", "Wind"]
-        for i, header in enumerate(headers):
-            tk.Label(self.load_combination_table_frame, text=header, relief=tk.RIDGE, width=15).grid(row=0, column=i)
-
-        self.load_combination_table_entries = []
+        self.load_combination_table = tables.EditableTable(tab, ["Combination", "Dead", "Live", "Snow", "Wind"],
+                                                           editors={i: "entry" for i in range(5)}, on_select=self.select_load_combination)
+        self.load_combination_table.pack(fill=tk.BOTH, expand=True)
+        self.load_combination_table.set_rows(self.load_combinations_data)
         self.selected_load_combination_index = None
-        if self.load_combinations_data:
-            for data in self.load_combinations_data:
-                self.add_load_combination_table_row()
-                for i, value in enumerate(data):
-                    self.load_combination_table_entries[-1][i].insert(0, value)
-        else:
+        if not self.load_combinations_data:
             self.add_load_combination_table_row()
 
         button_frame = tk.Frame(tab)
@@ -991,80 +945,51 @@ class FrameAnalyzer:
         tk.Button(button_frame, text="Add", command=self.add_load_combination_table_row).pack(side=tk.LEFT)
         self.remove_load_combination_button = tk.Button(button_frame, text="Remove", command=self.remove_load_combination, state=tk.DISABLED)
         self.remove_load_combination_button.pack(side=tk.LEFT)
-        self.modify_load_combination_button = tk.Button(button_frame, text="Modify", command=self.modify_load_combination, state=tk.DISABLED)
-        self.modify_load_combination_button.pack(side=tk.LEFT)
         tk.Button(button_frame, text="OK", command=self.save_load_combinations_and_close).pack(side=tk.LEFT)
-        tk.Button(button_frame, text="Cancel", command=self.load_comb_dialog.destroy).pack(side=tk.LEFT)
-
-    def add_load_combination_table_row(self):
-        row_entries = []
-        row_num = len(self.load_combination_table_entries) + 1
-
-        for i in range(5):
-            entry = tk.Entry(self.load_combination_table_frame, width=15)
-            entry.grid(row=row_num, column=i)
-            row_entries.append(entry)
-
-        def on_click(event, index=row_num-1):
-            self.selected_load_combination_index = index
-            for row in self.load_combination_table_entries:
-                for entry in row:
-                    entry.config(bg="white")
-            for entry in self.load_combination_table_entries[index]:
-                entry.config(bg="lightblue")
-            self.remove_load_combination_button.config(state=tk.NORMAL)
-            self.modify_load_combination_button.config(state=tk.NORMAL)
+        tk.Button(button_frame, text="Cancel", command=self.loads_dialog.destroy).pack(side=tk.LEFT)
 
-        for entry in row_entries:
-            entry.bind("<Button-1>", on_click)
+    def select_load_combination(self, index):
+        self.selected_load_combination_index = index
+        self.remove_load_combination_button.config(state=tk.NORMAL if index is not None else tk.DISABLED)
 
-        self.load_combination_table_entries.append(row_entries)
+    def add_load_combination_table_row(self):
+        self.load_combination_table.append(["", "", "", "", ""])
 
     def remove_load_combination(self):
         if self.selected_load_combination_index is not None:
-            self.load_combinations_data.pop(self.selected_load_combination_index)
-            for widget in self.load_combination_table_entries[self.selected_load_combination_index]:
-                widget.destroy()
-            self.load_combination_table_entries.pop(self.selected_load_combination_index)
-            self.selected_load_combination_index = None
-
-    def modify_load_combination(self):
-        # For now, just re-enable the entry widgets for editing
-        if self.selected_load_combination_index is not None:
-            row = self.load_combination_table_entries[self.selected_load_combination_index]
-            for entry in row:
-                entry.config(state=tk.NORMAL)
+            if self.selected_load_combination_index < len(self.load_combinations_data):
+                self.load_combinations_data.pop(self.selected_load_combination_index)
+            self.load_combination_table.delete(self.selected_load_combination_index)
+            self.select_load_combination(None)
 
     def save_load_combinations_and_close(self):
-        self.save_load_combinations()
-        self.load_comb_dialog.destroy()
+        try:
+            self.save_load_combinations()
+        except ValueError:
+            messagebox.showerror("Input Error", "Load combination factors must be numbers.")
+            return
+        self.save_load_patterns()
+        self.record_change("Load combinations")
+        self.loads_dialog.destroy()
 
     def save_load_combinations(self):
         self.load_combinations_data = []
-        for row in self.load_combination_table_entries:
-            name = row[0].get()
-            dead = float(row[1].get())
-            live = float(row[2].get())
-            snow = float(row[3].get())
-            wind = float(row[4].get())
+        for row in self.load_combination_table.rows:
+            name = row[0]
+            dead = float(row[1])
+            live = float(row[2])
+            snow = float(row[3])
+            wind = float(row[4])
             self.load_combinations_data.append([name, dead, live, snow, wind])
 
     def setup_load_pattern_tab(self, tab):
-        self.load_pattern_table_frame = tk.Frame(tab)
-        self.load_pattern_table_frame.pack()
-
-        headers = ["Load Name", "Load Type"]
-        for i, header in enumerate(headers):
-            tk.Label(self.load_pattern_table_frame, text=header, relief=tk.RIDGE, width=15).grid(row=0, column=i)
-
-        self.load_pattern_table_entries = []
+        self.load_pattern_table = tables.EditableTable(tab, ["Load Name", "Load Type"],
+                                                       editors={0: "entry", 1: lambda: ["Dead", "Live", "Snow", "Wind"]},
+                                                       on_select=self.select_load_pattern)
+        self.load_pattern_table.pack(fill=tk.BOTH, expand=True)
+        self.load_pattern_table.set_rows(self.load_patterns_data)
         self.selected_load_pattern_index = None
-        if self.load_patterns_data:
-            for data in self.load_patterns_data:
-                self.add_load_pattern_table_row()
-                self.load_pattern_table_entries[-1][0].insert(0, data[0])
-                self.load_pattern_table_entries[-1][1].set(data[1])
-        else:
+        if not self.load_patterns_data:
             self.add_load_pattern_table_row()
 
         button_frame = tk.Frame(tab)
@@ -1073,65 +998,32 @@ class FrameAnalyzer:
         tk.Button(button_frame, text="Add", command=self.add_load_pattern_table_row).pack(side=tk.LEFT)
         self.remove_load_pattern_button = tk.Button(button_frame, text="Remove", command=self.remove_load_pattern, state=tk.DISABLED)
         self.remove_load_pattern_button.pack(side=tk.LEFT)
-        self.modify_load_pattern_button = tk.Button(button_frame, text="Modify", command=self.modify_load_pattern, state=tk.DISABLED)
-        self.modify_load_pattern_button.pack(side=tk.LEFT)
         tk.Button(button_frame, text="OK", command=self.save_load_patterns_and_close).pack(side=tk.LEFT)
         tk.Button(button_frame, text="Cancel", command=self.loads_dialog.destroy).pack(side=tk.LEFT)
 
-    def add_load_pattern_table_row(self):
-        row_entries = []
-        row_num = len(self.load_pattern_table_entries) + 1
-
-        name_entry = tk.Entry(self.load_pattern_table_frame, width=15)
-        name_entry.grid(row=row_num, column=0)
-        row_entries.append(name_entry)
-
-        load_types = ["Dead", "Live", "Snow", "Wind"]
-        load_type_var = tk.StringVar()
-        load_type_menu = tk.OptionMenu(self.load_pattern_table_frame, load_type_var, *load_types)
-        load_type_menu.grid(row=row_num, column=1)
-        row_entries.append(load_type_var)
-
-        def on_click(event, index=row_num-1):
-            self.selected_load_pattern_index = index
-            for row in self.load_pattern_table_entries:
-                row[0].config(bg="white")
-            self.load_pattern_table_entries[index][0].config(bg="lightblue")
-            self.remove_load_pattern_button.config(state=tk.NORMAL)
-            self.modify_load_pattern_button.config(state=tk.NORMAL)
+    def select_load_pattern(self, index):
+        self.selected_load_pattern_index = index
+        self.remove_load_pattern_button.config(state=tk.NORMAL if index is not None else tk.DISABLED)
 
-        name_entry.bind("<Button-1>", on_click)
-
-        self.load_pattern_table_entries.append(row_entries)
+    def add_load_pattern_table_row(self):
+        self.load_pattern_table.append(["", ""])
 
     def remove_load_pattern(self):
         if self.selected_load_pattern_index is not None:
-            self.load_patterns_data.pop(self.selected_load_pattern_index)
-            for widget in self.load_pattern_table_entries[self.selected_load_pattern_index]:
-                widget.destroy()
-            self.load_pattern_table_entries.pop(self.selected_load_pattern_index)
-            self.selected_load_pattern_index = None
-
-    def modify_load_pattern(self):
-        # For now, just re-enable the entry widgets for editing
-        if self.selected_load_pattern_index is not None:
-            row = self.load_pattern_table_entries[self.selected_load_pattern_index]
-            row[0].config(state=tk.NORMAL)
+            if self.selected_load_pattern_index < len(self.load_patterns_data):
+                self.load_patterns_data.pop(self.selected_load_pattern_index)
+            self.load_pattern_table.delete(self.selected_load_pattern_index)
+            self.select_load_pattern(None)
 
     def save_load_patterns_and_close(self):
         self.save_load_patterns()
-        self.load_comb_dialog.destroy()
+        self.record_change("Load patterns")
+        self.loads_dialog.destroy()
 
     def save_load_patterns(self):
-        self.load_patterns_data = []
-        for row in self.load_pattern_table_entries:
-            name = row[0].get()
-            load_type = row[1].get()
-            self.load_patterns_data.append([name, load_type])
+        self.load_patterns_data = [[row[0], row[1]] for row in self.load_pattern_table.rows]
 
 if __name__ == "__main__":
     root = tk.Tk()
     app = FrameAnalyzer(root)
     root.mainloop()
-
-[end of main.py]
@@ -0,0 +1,130 @@
+import numpy as np
+import fem
+import sections
+import spatial
+
+# Element ends and nodes closer than this (in metres) are the same point
+NODE_TOLERANCE = 1e-6
+
+class FrameModel:
+    def __init__(self, coords, connectivity, E, A, I, release_start, release_end, supports, section_index=None):
+        self.coords = np.asarray(coords, dtype=float).reshape(-1, 2)
+        self.connectivity = np.asarray(connectivity, dtype=int).reshape(-1, 2)
+        self.E = np.asarray(E, dtype=float)
+        self.A = np.asarray(A, dtype=float)
+        self.I = np.asarray(I, dtype=float)
+        self.release_start = np.asarray(release_start, dtype=bool)
+        self.release_end = np.asarray(release_end, dtype=bool)
+        self.supports = list(supports)
+        if section_index is None:
+            section_index = np.full(len(self.connectivity), -1)
+        self.section_index = np.asarray(section_index, dtype=int)
+
+    @property
+    def num_nodes(self):
+        return len(self.coords)
+
+    @property
+    def num_elements(self):
+        return len(self.connectivity)
+
+    @property
+    def num_dof(self):
+        return self.num_nodes * 3
+
+    def boundary_conditions(self):
+        # Supported DOFs, plus the rotations of nodes that only connect to truss members
+        bcs = support_dofs(self.supports)
+        truss = fem.truss_rotation_dofs(self.connectivity, self.release_start, self.release_end, self.num_nodes)
+        return sorted(set(bcs).union(truss.tolist())) if len(truss) else bcs
+
+    def reanalysis_system(self, sparse=True):
+        return fem.ReanalysisSystem(self.coords, self.connectivity, self.E, self.A, self.I,
+                                    self.release_start, self.release_end, self.boundary_conditions(), sparse)
+
+def support_dofs(supports, codes="xyZ"):
+    # Support codes from the Node tab: x = X-restrain, y = Y-restrain, Z = moment fix.
+    # codes: the code of each DOF of a node, in DOF order
+    bcs = []
+    for i, support in enumerate(supports):
+        for j, code in enumerate(codes):
+            if code in support: bcs.append(i * len(codes) + j)
+    return bcs
+
+def element_properties(element_data, sections_data, materials_data, section_properties, properties):
+    # E from the section's material and A, I from its geometry; properties.txt fills any gaps
+    section_index = element_data[6] if len(element_data) > 6 else None
+    E = properties.get('E')
+    A = properties.get('A')
+    I = properties.get('I')
+    if section_index is not None and 0 <= section_index < len(sections_data):
+        A = section_properties[section_index]["A"]
+        I = section_properties[section_index]["Ix"]
+        material_index = sections_data[section_index][3]
+        if material_index is not None and 0 <= material_index < len(materials_data):
+            E = materials_data[material_index][2]
+    if E is None or A is None or I is None:
+        return None
+    return E, A, I
+
+def node_coordinates(nodes_data):
+    return np.array([n[:2] for n in nodes_data], dtype=float).reshape(-1, 2)
+
+def locate_nodes(nodes_data, points, tolerance=NODE_TOLERANCE):
+    # Index of the node at each point, -1 where no node is within tolerance
+    return spatial.tolerance_index(node_coordinates(nodes_data), tolerance).locate(points, tolerance)
+
+def element_nodes(nodes_data, elements_data, tolerance=NODE_TOLERANCE):
+    # Start and end node of every element in one pass over the node index
+    ends = np.array([e[:4] for e in elements_data], dtype=float).reshape(-1, 4)
+    located = locate_nodes(nodes_data, np.vstack([ends[:, :2], ends[:, 2:]]), tolerance)
+    return located[:len(ends)], located[len(ends):]
+
+def merge_coincident_nodes(nodes_data, elements_data, tolerance=NODE_TOLERANCE):
+    # Collapse nodes within tolerance of each other into the first of them, combining their
+    # supports, and snap element ends onto the surviving nodes. Returns (nodes, elements, merged count)
+    labels = spatial.merge_points(node_coordinates(nodes_data), tolerance)
+    keep = np.flatnonzero(labels == np.arange(len(labels)))
+    supports = {}
+    for i, label in enumerate(labels.tolist()):
+        supports.setdefault(label, set()).update(nodes_data[i][2])
+    nodes = [[nodes_data[i][0], nodes_data[i][1], "".join(c for c in "xyZ" if c in supports[i])
+              + "".join(sorted(supports[i] - set("xyZ")))] for i in keep.tolist()]
+
+    renumber = np.full(len(labels), -1)
+    renumber[keep] = np.arange(len(keep))
+    start, end = element_nodes(nodes_data, elements_data, tolerance)
+    elements = []
+    for e, a, b in zip(elements_data, start.tolist(), end.tolist()):
+        e = list(e)
+        if a >= 0:
+            e[0], e[1] = nodes[renumber[labels[a]]][:2]
+        if b >= 0:
+            e[2], e[3] = nodes[renumber[labels[b]]][:2]
+        elements.append(e)
+    return nodes, elements, len(nodes_data) - len(nodes)
+
+def build_model(nodes_data, elements_data, sections_data, materials_data, properties, tolerance=NODE_TOLERANCE):
+    start, end = element_nodes(nodes_data, elements_data, tolerance)
+    missing = np.flatnonzero((start < 0) | (end < 0))
+    if len(missing):
+        raise ValueError(f"Element E{missing[0]+1} does not connect two nodes.")
+
+    section_properties = sections.compute_sections(sections_data)
+    values = []
+    for i, e in enumerate(elements_data):
+        props = element_properties(e, sections_data, materials_data, section_properties, properties)
+        if props is None:
+            raise ValueError(f"Element E{i+1} has no section or default properties.")
+        values.append(props)
+
+    values = np.array(values, dtype=float).reshape(-1, 3)
+    return FrameModel(
+        node_coordinates(nodes_data),
+        np.column_stack([start, end]),
+        values[:, 0], values[:, 1], values[:, 2],
+        ["X" in e[4] for e in elements_data],
+        ["Y" in e[5] for e in elements_data],
+        [support for x, y, support in nodes_data],
+        [e[6] if len(e) > 6 and e[6] is not None else -1 for e in elements_data],
+    )
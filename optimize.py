@@ -0,0 +1,140 @@
+import numpy as np
+import sections
+
+def catalogue_arrays(catalogue, materials_data=()):
+    # Catalogue sections (sections_data rows) sorted from lightest to heaviest. E comes from each
+    # section's material, NaN for sections without one (the member keeps its own E)
+    props = sections.compute_sections(catalogue)
+    A = np.array([p["A"] for p in props])
+    order = np.argsort(A, kind="stable")
+    I = np.array([p["Ix"] for p in props])
+    S = np.array([p["Sx"] for p in props])
+    E = np.full(len(catalogue), np.nan)
+    for i, section in enumerate(catalogue):
+        material_index = section[3]
+        if material_index is not None and 0 <= material_index < len(materials_data):
+            E[i] = materials_data[material_index][2]
+    return order, A[order], I[order], S[order], E[order]
+
+def _member_E(own_E, cat_E, choice):
+    # E of every member with its chosen section
+    return np.where(np.isnan(cat_E[choice]), own_E, cat_E[choice])
+
+def storeys(coords, decimals=6):
+    # Level of every node (nodes at the same height, rounded to decimals) and the heights of the levels
+    heights, level = np.unique(np.round(coords[:, 1], decimals), return_inverse=True)
+    return level.ravel(), heights
+
+def drift_ratios(coords, U):
+    # Inter-storey drift at every node per load case: its lateral displacement less the mean of the
+    # level below, over the storey height. Nodes on the lowest level have none
+    level, heights = storeys(coords)
+    lateral = U[0::3]
+    mean = np.zeros((len(heights),) + U.shape[1:])
+    np.add.at(mean, level, lateral)
+    mean /= np.bincount(level, minlength=len(heights)).reshape((-1,) + (1,) * (U.ndim - 1))
+    ratios = np.zeros((len(coords),) + U.shape[1:])
+    upper = level > 0
+    storey = (heights[level[upper]] - heights[level[upper] - 1]).reshape((-1,) + (1,) * (U.ndim - 1))
+    ratios[upper] = np.abs(lateral[upper] - mean[level[upper] - 1]) / storey
+    return ratios
+
+def _drift_vector(coords, node):
+    # Drift of node over its storey as a . U
+    level, heights = storeys(coords)
+    below = np.flatnonzero(level == level[node] - 1)
+    a = np.zeros(len(coords) * 3)
+    a[node * 3] = 1.0
+    a[below * 3] -= 1.0 / len(below)
+    return a / (heights[level[node]] - heights[level[node] - 1])
+
+def member_stress_ratios(forces, A, S, allowable_stress):
+    # forces: (members, 6, cases) local end forces; A, S broadcast against (members, candidates)
+    N = np.abs(forces[:, [0, 3], :]).max(axis=1)
+    M = np.abs(forces[:, [2, 5], :]).max(axis=1)
+    stress = N[:, None, :] / A[..., None] + M[:, None, :] / S[..., None]
+    return stress.max(axis=-1) / allowable_stress
+
+def size_sections(frame_model, catalogue, F, allowable_stress, drift_limit=None, unit_weight=1.0,
+                  members=None, max_iterations=50, tolerance=1e-6, materials_data=()):
+    # materials_data: materials of the catalogue sections, whose E replaces the member's
+    order, cat_A, cat_I, cat_S, cat_E = catalogue_arrays(catalogue, materials_data)
+    num_candidates = len(cat_A)
+    F = np.asarray(F, dtype=float).reshape(frame_model.num_dof, -1)
+    members = np.arange(frame_model.num_elements) if members is None else np.asarray(members, dtype=int)
+
+    # The stiffness matrix is assembled once; every iteration only scatters the changed members
+    system = frame_model.reanalysis_system()
+    L = system.L[members]
+    own_E = system.E[members].copy()
+    choice = np.full(len(members), num_candidates - 1)
+    floor = np.zeros(len(members), dtype=int)
+    system.update(members, cat_A[choice], cat_I[choice], _member_E(own_E, cat_E, choice))
+
+    converged = False
+    stress_ratio = drift_ratio = np.inf
+    for iteration in range(1, max_iterations + 1):
+        U = system.solve(F)
+        forces = np.stack([system.element_forces(U[:, c]) for c in range(F.shape[1])], axis=-1)[members]
+
+        # Fully stressed design: lightest candidate that carries the current member forces
+        candidate_ratios = member_stress_ratios(forces, np.broadcast_to(cat_A, (len(members), num_candidates)),
+                                                np.broadcast_to(cat_S, (len(members), num_candidates)), allowable_stress)
+        feasible = candidate_ratios <= 1 + tolerance
+        required = np.where(feasible.any(axis=1), feasible.argmax(axis=1), num_candidates - 1)
+        stress_ratio = candidate_ratios[np.arange(len(members)), choice].max()
+
+        drift_ratio = 0.0
+        if drift_limit is not None:
+            ratios = drift_ratios(frame_model.coords, U)
+            node, case = np.unravel_index(ratios.argmax(), ratios.shape)
+            drift_ratio = ratios[node, case]
+            if drift_ratio > drift_limit * (1 + tolerance):
+                floor = np.maximum(floor, _drift_upgrades(system, frame_model, U[:, case], node, drift_ratio - drift_limit,
+                                                          members, choice, cat_A, cat_I, L * unit_weight,
+                                                          own_E, cat_E))
+
+        new_choice = np.maximum(required, floor)
+        feasible_design = stress_ratio <= 1 + tolerance and (drift_limit is None or drift_ratio <= drift_limit * (1 + tolerance))
+        if np.array_equal(new_choice, choice) and feasible_design:
+            converged = True
+            break
+
+        changed = new_choice != choice
+        choice = new_choice
+        system.update(members[changed], cat_A[choice[changed]], cat_I[choice[changed]],
+                      _member_E(own_E[changed], cat_E, choice[changed]))
+
+    return {
+        "sections": order[choice],
+        "A": cat_A[choice],
+        "I": cat_I[choice],
+        "E": _member_E(own_E, cat_E, choice),
+        "weight": float((cat_A[choice] * L).sum() * unit_weight),
+        "stress_ratio": float(stress_ratio),
+        "drift_ratio": float(drift_ratio),
+        "iterations": iteration,
+        "converged": converged,
+    }
+
+def _drift_upgrades(system, frame_model, U, node, excess, members, choice, cat_A, cat_I, weight_per_area, own_E, cat_E):
+    # Adjoint sensitivities of the critical drift; upgrade the members that reduce it most per unit weight.
+    # The stiffness goes with E*A and E*I, so an upgrade to another material changes both factors
+    a = _drift_vector(frame_model.coords, node)
+    dA, dI = system.sensitivities(U, system.solve(a))
+    sign = np.sign(a @ U)
+
+    upgrade = np.minimum(choice + 1, len(cat_A) - 1)
+    E, E_upgrade = _member_E(own_E, cat_E, choice), _member_E(own_E, cat_E, upgrade)
+    reduction = -sign / E * (dA[members] * (E_upgrade * cat_A[upgrade] - E * cat_A[choice]) +
+                             dI[members] * (E_upgrade * cat_I[upgrade] - E * cat_I[choice]))
+    added_weight = np.maximum((cat_A[upgrade] - cat_A[choice]) * weight_per_area, 1e-300)
+    candidates = np.flatnonzero((reduction > 0) & (upgrade > choice))
+    if len(candidates) == 0:
+        return choice
+
+    ranked = candidates[np.argsort(-reduction[candidates] / added_weight[candidates])]
+    needed = np.searchsorted(np.cumsum(reduction[ranked]), excess) + 1
+    floor = choice.copy()
+    floor[ranked[:needed]] = upgrade[ranked[:needed]]
+    return floor
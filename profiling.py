@@ -0,0 +1,144 @@
+import contextlib
+import functools
+import json
+import time
+import tracemalloc
+
+# Opt-in stage profiler. While disabled, stage() returns a shared null context
+# and profiled functions cost one global lookup per call.
+
+_active = None
+_NULL_STAGE = contextlib.nullcontext()
+
+
+class Profiler:
+    def __init__(self, track_memory=False):
+        self.track_memory = track_memory
+        self.stages = {}
+        self._stack = []
+        self._started_tracing = False
+
+    def start(self):
+        if self.track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    def stop(self):
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    @contextlib.contextmanager
+    def stage(self, name, **info):
+        path = f"{self._stack[-1]['path']}/{name}" if self._stack else name
+        frame = {"path": path, "info": dict(info), "start_memory": 0, "peak": 0}
+        if self.track_memory and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                self._stack[-1]["peak"] = max(self._stack[-1]["peak"], peak)
+            tracemalloc.reset_peak()
+            frame["start_memory"] = current
+            frame["peak"] = current
+        self._stack.append(frame)
+        start = time.perf_counter()
+        try:
+            yield frame["info"]
+        finally:
+            elapsed = time.perf_counter() - start
+            self._stack.pop()
+            self._finish(frame, elapsed)
+
+    def _finish(self, frame, elapsed):
+        record = self.stages.setdefault(frame["path"], {"calls": 0, "seconds": 0.0})
+        record["calls"] += 1
+        record["seconds"] += elapsed
+        if self.track_memory and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            peak = max(frame["peak"], peak)
+            if self._stack:
+                self._stack[-1]["peak"] = max(self._stack[-1]["peak"], peak)
+            record["peak_bytes"] = max(record.get("peak_bytes", 0), peak - frame["start_memory"])
+            record["allocated_bytes"] = record.get("allocated_bytes", 0) + current - frame["start_memory"]
+        record.update(frame["info"])
+
+    def note(self, **info):
+        if self._stack:
+            self._stack[-1]["info"].update(info)
+
+    def to_dict(self):
+        return {"stages": [dict(path=path, **record) for path, record in self.stages.items()]}
+
+    def to_json(self, indent=2):
+        return json.dumps(self.to_dict(), indent=indent, default=float)
+
+    def save(self, filepath):
+        with open(filepath, 'w') as f:
+            f.write(self.to_json())
+
+
+def enable(track_memory=False):
+    global _active
+    disable()
+    _active = Profiler(track_memory)
+    _active.start()
+    return _active
+
+
+def disable():
+    global _active
+    profiler = _active
+    _active = None
+    if profiler is not None:
+        profiler.stop()
+    return profiler
+
+
+def enabled():
+    return _active is not None
+
+
+def active():
+    return _active
+
+
+def stage(name, **info):
+    if _active is None:
+        return _NULL_STAGE
+    return _active.stage(name, **info)
+
+
+def note(**info):
+    if _active is not None:
+        _active.note(**info)
+
+
+def matrix_info(K):
+    # Shape and stored non-zeros of a dense or scipy sparse matrix
+    if hasattr(K, "nnz"):
+        return {"shape": list(K.shape), "nnz": int(K.nnz)}
+    return {"shape": list(K.shape), "nnz": int((K != 0).sum())}
+
+
+def profiled(name=None):
+    def decorator(func):
+        stage_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _active is None:
+                return func(*args, **kwargs)
+            with _active.stage(stage_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@contextlib.contextmanager
+def profile(filepath=None, track_memory=False):
+    profiler = enable(track_memory)
+    try:
+        yield profiler
+    finally:
+        disable()
+        if filepath:
+            profiler.save(filepath)
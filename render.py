@@ -0,0 +1,392 @@
+import tkinter as tk
+import numpy as np
+import spatial
+
+# Retained-mode drawing of the model on a Tk canvas. Every node, element and
+# load keeps its canvas items under its own tag ("node3", "element7", ...), and
+# render() only deletes and recreates the entities whose drawing changed.
+
+# Level of detail, from full to sparse. Each level drops or merges glyphs so
+# that the total number of canvas items stays under max_items.
+FULL, NO_LABELS, AGGREGATED, STRUCTURE_ONLY = range(4)
+
+class ModelRenderer:
+    def __init__(self, canvas, width=800, height=600, max_items=20000):
+        self.canvas = canvas
+        self.width = width
+        self.height = height
+        self.max_items = max_items
+        self.margin = 30  # glyphs reach this far past their anchor point
+        self.arrow_spacing = 20
+        self.max_arrows = 5  # per load once labels are dropped
+        self.min_glyph_pixels = 4  # loads on shorter members are hidden
+        self.transform = None
+        self.detail = FULL
+        self.drawn = {}  # tag -> signature of what is currently drawn
+        self.model_data = None
+        self.node_points = np.zeros((0, 2))
+        self.element_segments = np.zeros((0, 4))
+        self.node_index = None
+        self.element_index = None
+        self.overlays = {}  # key -> canvas items
+        self.overlay_data = {}  # key -> (flattened model-coordinate polylines, colour)
+        self.overlay_key = None
+
+    # ----------------- Transform -----------------
+    # transform = (scale, offset_x, offset_y): canvas x = offset_x + x * scale,
+    # canvas y = offset_y - y * scale
+    def fit(self, x, y):
+        min_x, max_x = x.min(), x.max()
+        min_y, max_y = y.min(), y.max()
+        width_m = max_x - min_x if max_x != min_x else 1
+        height_m = max_y - min_y if max_y != min_y else 1
+        scale = min((self.width - 100) / width_m, (self.height - 100) / height_m) * 0.9
+        return (float(scale), float(self.width / 2 - (max_x + min_x) / 2 * scale), float(self.height / 2 + (max_y + min_y) / 2 * scale))
+
+    def to_canvas(self, x, y):
+        scale, offset_x, offset_y = self.transform
+        return offset_x + np.asarray(x) * scale, offset_y - np.asarray(y) * scale
+
+    def to_world(self, x, y):
+        scale, offset_x, offset_y = self.transform
+        return (np.asarray(x) - offset_x) / scale, (offset_y - np.asarray(y)) / scale
+
+    # ----------------- Navigation -----------------
+    # Zoom and pan transform the existing canvas items in place; refresh()
+    # afterwards only adds entities that came into view and drops culled ones.
+    def zoom(self, factor, x, y):
+        if self.transform is None:
+            return
+        scale, offset_x, offset_y = self.transform
+        self.canvas.scale("model", x, y, factor, factor)
+        self.transform = (scale * factor, x + (offset_x - x) * factor, y + (offset_y - y) * factor)
+
+    def pan(self, dx, dy):
+        if self.transform is None:
+            return
+        scale, offset_x, offset_y = self.transform
+        self.canvas.move("model", dx, dy)
+        self.transform = (scale, offset_x + dx, offset_y + dy)
+
+    def refresh(self):
+        if self.model_data is not None:
+            self.render(*self.model_data)
+
+    def resize(self, width, height):
+        # The canvas changed size: cull against the new viewport and draw what came into view
+        if (width, height) == (self.width, self.height):
+            return
+        self.width = width
+        self.height = height
+        self.refresh()
+
+    def fit_view(self):
+        if self.model_data is not None:
+            self.render(*self.model_data, fit=True)
+
+    # ----------------- Hit testing -----------------
+    def pick(self, x, y, radius=6):
+        # Entity tag under canvas point (x, y): nodes win over members within radius pixels
+        if self.transform is None:
+            return None
+        wx, wy = self.to_world(x, y)
+        tolerance = radius / self.transform[0]
+        if self.node_index is None:
+            self.node_index = spatial.PointIndex(self.node_points)
+            self.element_index = spatial.SegmentIndex(self.element_segments)
+        if len(self.node_points):
+            node = self.node_index.nearest(wx, wy, tolerance)
+            if node >= 0:
+                return f"node{node}"
+        if len(self.element_segments):
+            element = self.element_index.nearest(wx, wy, tolerance)
+            if element >= 0:
+                return f"element{element}"
+        return None
+
+    def highlight(self, tag):
+        self.canvas.delete("highlight")
+        if tag is None:
+            return
+        if tag.startswith("node"):
+            if int(tag[4:]) >= len(self.node_points):
+                return
+            x, y = self.to_canvas(*self.node_points[int(tag[4:])])
+            self.canvas.create_oval(x - 8, y - 8, x + 8, y + 8, outline="red", width=2, tags=("model", "highlight"))
+        elif int(tag[7:]) < len(self.element_segments):
+            x1, y1 = self.to_canvas(*self.element_segments[int(tag[7:]), :2])
+            x2, y2 = self.to_canvas(*self.element_segments[int(tag[7:]), 2:])
+            self.canvas.create_line(x1, y1, x2, y2, fill="red", width=4, tags=("model", "highlight"))
+
+    # ----------------- Result overlays -----------------
+    # Overlays are drawn once per key and afterwards only shown or hidden, so
+    # switching load cases never touches the model items.
+    def show_overlay(self, key, polylines=None, fill="red"):
+        if polylines is not None:
+            self.overlay_data[key] = (polylines, fill)
+        for other, items in self.overlays.items():
+            if other != key:
+                for item in items:
+                    self.canvas.itemconfigure(item, state="hidden")
+        self.overlay_key = key if key in self.overlay_data else None
+        if self.overlay_key is None or self.transform is None:
+            return
+        if key in self.overlays:
+            for item in self.overlays[key]:
+                self.canvas.itemconfigure(item, state="normal")
+            return
+        items = []
+        for line in self.overlay_data[key][0]:
+            if len(line) < 4:
+                continue
+            x, y = self.to_canvas(line[0::2], line[1::2])
+            items.append(self.canvas.create_line(*np.column_stack([x, y]).ravel().tolist(), fill=self.overlay_data[key][1],
+                                                 tags=("model", "overlay")))
+        self.overlays[key] = items
+
+    def clear_overlays(self):
+        self.canvas.delete("overlay")
+        self.overlays = {}
+        self.overlay_data = {}
+        self.overlay_key = None
+
+    # ----------------- Culling and level of detail -----------------
+    def visible_region(self):
+        return (-self.margin, -self.margin, self.width + self.margin, self.height + self.margin)
+
+    def visible_points(self, x, y):
+        left, top, right, bottom = self.visible_region()
+        return (x >= left) & (x <= right) & (y >= top) & (y <= bottom)
+
+    def visible_segments(self, x1, y1, x2, y2):
+        # Bounding-box overlap; may keep a few segments that just miss the corner
+        left, top, right, bottom = self.visible_region()
+        return ((np.maximum(x1, x2) >= left) & (np.minimum(x1, x2) <= right) &
+                (np.maximum(y1, y2) >= top) & (np.minimum(y1, y2) <= bottom))
+
+    def choose_detail(self, num_nodes, num_supports, num_releases, num_elements, load_pixels, num_point_loads):
+        # Estimated item count per level; the first level under the cap wins
+        arrows = np.floor(load_pixels / self.arrow_spacing).astype(int) + 1
+        estimates = [
+            2 * num_nodes + 3 * num_supports + num_releases + num_elements + arrows.sum() + num_point_loads,
+            num_nodes + 3 * num_supports + num_releases + num_elements + np.minimum(arrows, self.max_arrows).sum() + num_point_loads,
+            num_nodes + num_supports + num_releases + num_elements + len(load_pixels) + num_point_loads,
+            num_supports + num_elements,
+        ]
+        for level, estimate in enumerate(estimates):
+            if estimate <= self.max_items:
+                return level
+        return STRUCTURE_ONLY
+
+    # ----------------- Rendering -----------------
+    def clear(self):
+        self.canvas.delete("model")
+        self.drawn = {}
+        self.overlays = {}
+
+    def render(self, nodes_data, elements_data, udl_data=(), vdl_data=(), point_load_data=(), fit=False):
+        self.model_data = (nodes_data, elements_data, udl_data, vdl_data, point_load_data)
+        self.node_index = self.element_index = None
+        if not nodes_data and not elements_data:
+            self.clear()
+            self.clear_overlays()
+            self.transform = None
+            return
+
+        nodes = np.array([n[:2] for n in nodes_data], dtype=float).reshape(-1, 2)
+        ends = np.array([e[:4] for e in elements_data], dtype=float).reshape(-1, 4)
+        self.node_points = nodes
+        self.element_segments = ends
+        if fit or self.transform is None:
+            self.transform = self.fit(np.concatenate([nodes[:, 0], ends[:, 0], ends[:, 2]]),
+                                      np.concatenate([nodes[:, 1], ends[:, 1], ends[:, 3]]))
+            self.clear()
+
+        node_x, node_y = self.to_canvas(nodes[:, 0], nodes[:, 1])
+        x1, y1 = self.to_canvas(ends[:, 0], ends[:, 1])
+        x2, y2 = self.to_canvas(ends[:, 2], ends[:, 3])
+        element_pixels = np.hypot(x2 - x1, y2 - y1)
+        node_visible = self.visible_points(node_x, node_y)
+        element_visible = self.visible_segments(x1, y1, x2, y2)
+        supported = np.array([bool(n[2]) for n in nodes_data], dtype=bool)
+        released = np.array([bool(e[4]) + bool(e[5]) for e in elements_data], dtype=int).reshape(-1)
+
+        distributed = [(k, "udl", load[0]) for k, load in enumerate(udl_data)] + [(k, "vdl", load[0]) for k, load in enumerate(vdl_data)]
+        load_elements = np.array([element_index for k, kind, element_index in distributed], dtype=int)
+        load_shown = element_visible[load_elements] & (element_pixels[load_elements] >= self.min_glyph_pixels)
+        point_elements = np.array([load[0] for load in point_load_data], dtype=int)
+        point_shown = element_visible[point_elements] & (element_pixels[point_elements] >= self.min_glyph_pixels)
+
+        self.detail = self.choose_detail(
+            int(node_visible.sum()), int((node_visible & supported).sum()), int(released[element_visible].sum()),
+            int(element_visible.sum()), element_pixels[load_elements][load_shown], int(point_shown.sum()))
+        budget = max(self.max_items - int((node_visible & supported).sum()), 0)
+        if self.detail == STRUCTURE_ONLY and element_visible.sum() > budget:
+            # Still over the cap: keep the longest visible members
+            order = np.argsort(-np.where(element_visible, element_pixels, -1), kind="stable")
+            element_visible = np.zeros_like(element_visible)
+            element_visible[order[:budget]] = True
+
+        node_xy = np.column_stack([node_x, node_y]).tolist()
+        element_xy = np.column_stack([x1, y1, x2, y2]).tolist()
+        node_world = nodes.tolist()
+        element_world = ends.tolist()
+        level = self.detail
+        # Glyphs have a fixed pixel size, so they are redrawn once zoom has changed by half an octave
+        glyph = round(2 * np.log2(self.transform[0]))
+
+        # Signatures are in model coordinates, so items moved by zoom() and pan() stay valid
+        wanted = {}
+        first_at = {}
+        for i in np.flatnonzero(node_visible if level < STRUCTURE_ONLY else node_visible & supported).tolist():
+            labelled = first_at.setdefault(tuple(node_world[i]), i) == i
+            support = nodes_data[i][2]
+            wanted[f"node{i}"] = ((*node_world[i], support, labelled, level, glyph),
+                                  self.draw_node, (i, *node_xy[i], support, labelled, level))
+        for j in np.flatnonzero(element_visible).tolist():
+            e = elements_data[j]
+            releases = (e[4], e[5]) if level < STRUCTURE_ONLY else ("", "")
+            wanted[f"element{j}"] = ((*element_world[j], *releases, glyph if any(releases) else None),
+                                     self.draw_element, (*element_xy[j], *releases))
+
+        if level < STRUCTURE_ONLY:
+            max_arrows = None if level == FULL else self.max_arrows
+            for (k, kind, element_index), shown in zip(distributed, load_shown.tolist()):
+                if not shown:
+                    continue
+                if kind == "udl":
+                    element_index, magnitude, direction, start_pos, end_pos = udl_data[k]
+                    start_mag = end_mag = magnitude
+                    fill = "purple"
+                else:
+                    element_index, start_mag, end_mag, direction, start_pos, end_pos = vdl_data[k]
+                    fill = "orange"
+                signature = (*element_world[element_index], start_mag, end_mag, direction, level, glyph)
+                args = (*element_xy[element_index], start_mag, end_mag, direction, fill)
+                if level == AGGREGATED:
+                    wanted[f"{kind}{k}"] = (signature, self.draw_load_envelope, args)
+                else:
+                    wanted[f"{kind}{k}"] = (signature, self.draw_load_arrows, args + (max_arrows,))
+
+            for k, shown in enumerate(point_shown.tolist()):
+                if not shown:
+                    continue
+                element_index, magnitude, direction, distance = point_load_data[k]
+                e = elements_data[element_index]
+                t = distance / np.sqrt((e[2] - e[0])**2 + (e[3] - e[1])**2)
+                ex1, ey1, ex2, ey2 = element_xy[element_index]
+                wanted[f"point_load{k}"] = ((*element_world[element_index], magnitude, direction, distance, glyph),
+                                            self.draw_point_load, (ex1 + t * (ex2 - ex1), ey1 + t * (ey2 - ey1), magnitude, direction))
+
+        self.sync(wanted)
+        if self.overlay_key is not None:
+            self.show_overlay(self.overlay_key)
+            self.canvas.tag_raise("overlay")
+
+    def sync(self, wanted):
+        # wanted: tag -> (signature, draw function, arguments)
+        for tag in [tag for tag in self.drawn if tag not in wanted]:
+            self.canvas.delete(tag)
+            del self.drawn[tag]
+        for tag, (signature, draw, args) in wanted.items():
+            if self.drawn.get(tag) == signature:
+                continue
+            if tag in self.drawn:
+                self.canvas.delete(tag)
+            draw(*args, tags=("model", tag.rstrip("0123456789"), tag))
+            self.drawn[tag] = signature
+
+    def item_ids(self, tag):
+        return list(self.canvas.find_withtag(tag))
+
+    # ----------------- Drawing -----------------
+    def draw_node(self, i, x, y, support, labelled, level=FULL, tags=()):
+        if labelled and level < STRUCTURE_ONLY:
+            self.canvas.create_oval(x - 4, y - 4, x + 4, y + 4, fill="black", tags=tags)
+            if level == FULL:
+                self.canvas.create_text(x + 10, y - 10, text=f"N{i+1}", fill="blue", tags=tags)
+        if support:
+            if level >= AGGREGATED:
+                self.draw_support_marker(x, y, tags)
+            else:
+                self.draw_support(x, y, support, tags)
+
+    def draw_element(self, x1, y1, x2, y2, release_start, release_end, tags=()):
+        self.canvas.create_line(x1, y1, x2, y2, width=2, tags=tags)
+        if release_start:
+            self.draw_moment_release(x1, y1, release_start, tags)
+        if release_end:
+            self.draw_moment_release(x2, y2, release_end, tags)
+
+    def draw_support(self, x, y, support, tags=()):
+        size = 20
+        base = 8
+
+        if support == "xy":  # Pinned
+            self.canvas.create_polygon(x - base, y + size, x + base, y + size, x, y, fill="blue", outline="black", tags=tags)
+
+        elif support == "y":  # Vertical Roller
+            self.canvas.create_polygon(x - base, y + size, x + base, y + size, x, y, fill="white", outline="black", tags=tags)
+            self.canvas.create_oval(x - 10, y + size, x - 6, y + size + 4, fill="black", tags=tags)
+            self.canvas.create_oval(x + 6, y + size, x + 10, y + size + 4, fill="black", tags=tags)
+
+        elif support == "x":  # Horizontal Roller
+            self.canvas.create_polygon(x, y - base, x, y + base, x - size, y, fill="white", outline="black", tags=tags)
+            self.canvas.create_oval(x - size - 8, y - 5, x - size - 4, y - 1, fill="black", tags=tags)
+            self.canvas.create_oval(x - size - 8, y + 1, x - size - 4, y + 5, fill="black", tags=tags)
+
+        elif support == "xyZ":  # Fixed
+            self.canvas.create_line(x - base, y + size, x + base, y + size, width=4, fill="black", tags=tags)
+            self.canvas.create_line(x, y, x, y + size, width=2, fill="blue", tags=tags)
+
+        elif support == "Z":  # Only moment fixed
+            self.canvas.create_oval(x - 5, y - 5, x + 5, y + 5, outline="green", width=2, tags=tags)
+
+        else:
+            # Fallback logic for any combinations
+            if "x" in support:
+                self.canvas.create_line(x - base, y, x + base, y, fill="red", width=2, tags=tags)
+            if "y" in support:
+                self.canvas.create_line(x, y - base, x, y + base, fill="red", width=2, tags=tags)
+            if "Z" in support:
+                self.canvas.create_oval(x - 5, y - 5, x + 5, y + 5, outline="green", width=2, tags=tags)
+
+    def draw_moment_release(self, x, y, release, tags=()):
+        size = 5
+        if "X" in release or "Y" in release:
+            self.canvas.create_oval(x - size, y - size, x + size, y + size, outline="green", width=2, tags=tags)
+
+    def draw_support_marker(self, x, y, tags=()):
+        self.canvas.create_polygon(x - 4, y + 6, x + 4, y + 6, x, y, fill="blue", tags=tags)
+
+    def draw_load_arrows(self, x1, y1, x2, y2, start_mag, end_mag, direction, fill, max_arrows=None, tags=()):
+        length = np.sqrt((x2 - x1)**2 + (y2 - y1)**2)
+        num_arrows = max(int(length / self.arrow_spacing), 1)
+        if max_arrows is not None:
+            num_arrows = min(num_arrows, max_arrows)
+
+        t = np.linspace(0, 1, num_arrows + 1)
+        xs = (x1 + t * (x2 - x1)).tolist()
+        ys = (y1 + t * (y2 - y1)).tolist()
+        mags = (start_mag + t * (end_mag - start_mag)).tolist()
+        for x, y, mag in zip(xs, ys, mags):
+            if direction == "Y":
+                self.canvas.create_line(x, y, x, y + mag, arrow=tk.LAST, fill=fill, tags=tags)
+            elif direction == "X":
+                self.canvas.create_line(x, y, x + mag, y, arrow=tk.LAST, fill=fill, tags=tags)
+
+    def draw_load_envelope(self, x1, y1, x2, y2, start_mag, end_mag, direction, fill, tags=()):
+        # One outlined polygon between the member and the arrow tips
+        if direction == "Y":
+            tips = (x2, y2 + end_mag, x1, y1 + start_mag)
+        elif direction == "X":
+            tips = (x2 + end_mag, y2, x1 + start_mag, y1)
+        else:
+            return
+        self.canvas.create_polygon(x1, y1, x2, y2, *tips, fill="", outline=fill, tags=tags)
+
+    def draw_point_load(self, x, y, magnitude, direction, tags=()):
+        if direction == "Y":
+            self.canvas.create_line(x, y, x, y + magnitude, arrow=tk.LAST, fill="red", width=2, tags=tags)
+        elif direction == "X":
+            self.canvas.create_line(x, y, x + magnitude, y, arrow=tk.LAST, fill="red", width=2, tags=tags)
@@ -0,0 +1,254 @@
+import numpy as np
+
+# Dimension symbols used by the section dialogs, keyed by section type
+SECTION_DIMENSIONS = {
+    "I / Wide Flange": ["h", "b₁", "t₁", "tw", "b₂", "t₂", "r"],
+    "Channel": ["h", "b", "tf", "tw", "r"],
+    "Tee": ["b", "tf", "d", "tw", "r"],
+    "Angle": ["b", "d", "t", "r"],
+    "Double Angle": ["b", "d", "t", "r", "Spacing"],
+    "Double Channel": ["h", "b", "tf", "tw", "r", "Spacing"],
+    "Pipe": ["OD", "t"],
+    "Tube": ["b", "h", "t", "r"],
+    "Rectangular": ["b", "h"],
+    "Circular": ["d"],
+}
+
+PROPERTY_NAMES = ["A", "Ix", "Iy", "Sx", "Sy", "Zx", "Zy", "J", "Avy", "Avx"]
+
+_property_cache = {}
+
+
+def dimension_key(label):
+    # "Outside height (h)" -> "h", "Spacing" -> "Spacing"
+    if "(" in label and label.endswith(")"):
+        return label[label.rfind("(") + 1:-1]
+    return label
+
+
+def _rect_torsion(b, h):
+    a = np.maximum(b, h)
+    c = np.minimum(b, h)
+    return a * c**3 * (1 / 3 - 0.21 * c / a * (1 - c**4 / (12 * a**4)))
+
+
+def _plastic_modulus(width, depth, centre, area):
+    # Plastic neutral axis by bisection on the area below it, then first moment about it
+    lo = centre - depth / 2
+    hi = centre + depth / 2
+    low = lo.min(axis=0)
+    high = hi.max(axis=0)
+    for _ in range(60):
+        mid = (low + high) / 2
+        below = (width * np.clip(mid - lo, 0, depth)).sum(axis=0)
+        under = below < area / 2
+        low = np.where(under, mid, low)
+        high = np.where(under, high, mid)
+    yp = (low + high) / 2
+    g = lambda u: u * np.abs(u) / 2
+    return (width * (g(hi - yp) - g(lo - yp))).sum(axis=0)
+
+
+def _rectangles_properties(rects):
+    # rects: list of (width, height, x centre, y centre), each broadcast over the catalogue
+    values = np.broadcast_arrays(*[np.asarray(v, dtype=float) for rect in rects for v in rect])
+    b, h, xc, yc = np.moveaxis(np.reshape(values, (len(rects), 4) + values[0].shape), 1, 0)
+    a = b * h
+    A = a.sum(axis=0)
+    x0 = (a * xc).sum(axis=0) / A
+    y0 = (a * yc).sum(axis=0) / A
+    Ix = (b * h**3 / 12 + a * (yc - y0)**2).sum(axis=0)
+    Iy = (h * b**3 / 12 + a * (xc - x0)**2).sum(axis=0)
+    cy = np.maximum((yc + h / 2).max(axis=0) - y0, y0 - (yc - h / 2).min(axis=0))
+    cx = np.maximum((xc + b / 2).max(axis=0) - x0, x0 - (xc - b / 2).min(axis=0))
+    return {
+        "A": A,
+        "Ix": Ix,
+        "Iy": Iy,
+        "Sx": Ix / cy,
+        "Sy": Iy / cx,
+        "Zx": _plastic_modulus(b, h, yc, A),
+        "Zy": _plastic_modulus(h, b, xc, A),
+        "J": _rect_torsion(b, h).sum(axis=0),
+    }
+
+
+# Fillet and corner radii are ignored, which slightly underestimates every property.
+def _i_section(d):
+    h, b1, t1, tw, b2, t2 = d["h"], d["b₁"], d["t₁"], d["tw"], d["b₂"], d["t₂"]
+    web = h - t1 - t2
+    p = _rectangles_properties([
+        (b1, t1, 0, h - t1 / 2),
+        (tw, web, 0, t2 + web / 2),
+        (b2, t2, 0, t2 / 2),
+    ])
+    p["Avy"] = h * tw
+    p["Avx"] = b1 * t1 + b2 * t2
+    return p
+
+
+def _channel_rects(h, b, tf, tw, x=0, side=1):
+    flange = b - tw
+    return [
+        (tw, h, x + side * tw / 2, h / 2),
+        (flange, tf, x + side * (tw + flange / 2), h - tf / 2),
+        (flange, tf, x + side * (tw + flange / 2), tf / 2),
+    ]
+
+
+def _channel(d):
+    h, b, tf, tw = d["h"], d["b"], d["tf"], d["tw"]
+    p = _rectangles_properties(_channel_rects(h, b, tf, tw))
+    p["Avy"] = h * tw
+    p["Avx"] = 2 * b * tf
+    return p
+
+
+def _double_channel(d):
+    h, b, tf, tw, s = d["h"], d["b"], d["tf"], d["tw"], d["Spacing"]
+    p = _rectangles_properties(_channel_rects(h, b, tf, tw, s / 2, 1) + _channel_rects(h, b, tf, tw, -s / 2, -1))
+    p["Avy"] = 2 * h * tw
+    p["Avx"] = 4 * b * tf
+    return p
+
+
+def _tee(d):
+    b, tf, depth, tw = d["b"], d["tf"], d["d"], d["tw"]
+    stem = depth - tf
+    p = _rectangles_properties([
+        (b, tf, 0, depth - tf / 2),
+        (tw, stem, 0, stem / 2),
+    ])
+    p["Avy"] = depth * tw
+    p["Avx"] = b * tf
+    return p
+
+
+def _angle_rects(b, depth, t, x=0, side=1):
+    leg = b - t
+    return [
+        (t, depth, x + side * t / 2, depth / 2),
+        (leg, t, x + side * (t + leg / 2), t / 2),
+    ]
+
+
+def _angle(d):
+    b, depth, t = d["b"], d["d"], d["t"]
+    p = _rectangles_properties(_angle_rects(b, depth, t))
+    p["Avy"] = depth * t
+    p["Avx"] = b * t
+    return p
+
+
+def _double_angle(d):
+    b, depth, t, s = d["b"], d["d"], d["t"], d["Spacing"]
+    p = _rectangles_properties(_angle_rects(b, depth, t, s / 2, 1) + _angle_rects(b, depth, t, -s / 2, -1))
+    p["Avy"] = 2 * depth * t
+    p["Avx"] = 2 * b * t
+    return p
+
+
+def _tube(d):
+    b, h, t = d["b"], d["h"], d["t"]
+    p = _rectangles_properties([
+        (b, t, 0, h - t / 2),
+        (b, t, 0, t / 2),
+        (t, h - 2 * t, -(b - t) / 2, h / 2),
+        (t, h - 2 * t, (b - t) / 2, h / 2),
+    ])
+    # Closed section: Bredt's formula on the wall centreline
+    enclosed = (b - t) * (h - t)
+    p["J"] = 4 * enclosed**2 * t / (2 * (b - t) + 2 * (h - t))
+    p["Avy"] = 2 * (h - 2 * t) * t
+    p["Avx"] = 2 * (b - 2 * t) * t
+    return p
+
+
+def _rectangular(d):
+    b, h = d["b"], d["h"]
+    p = _rectangles_properties([(b, h, 0, h / 2)])
+    p["Avy"] = 5 / 6 * p["A"]
+    p["Avx"] = 5 / 6 * p["A"]
+    return p
+
+
+def _solid_or_hollow_circle(outer, inner):
+    A = np.pi * (outer**2 - inner**2) / 4
+    I = np.pi * (outer**4 - inner**4) / 64
+    S = I / (outer / 2)
+    Z = (outer**3 - inner**3) / 6
+    return {"A": A, "Ix": I, "Iy": I, "Sx": S, "Sy": S, "Zx": Z, "Zy": Z, "J": 2 * I}
+
+
+def _pipe(d):
+    p = _solid_or_hollow_circle(d["OD"], d["OD"] - 2 * d["t"])
+    p["Avy"] = p["A"] / 2
+    p["Avx"] = p["A"] / 2
+    return p
+
+
+def _circular(d):
+    p = _solid_or_hollow_circle(d["d"], 0 * d["d"])
+    p["Avy"] = 0.9 * p["A"]
+    p["Avx"] = 0.9 * p["A"]
+    return p
+
+
+_SHAPES = {
+    "I / Wide Flange": _i_section,
+    "Channel": _channel,
+    "Tee": _tee,
+    "Angle": _angle,
+    "Double Angle": _double_angle,
+    "Double Channel": _double_channel,
+    "Pipe": _pipe,
+    "Tube": _tube,
+    "Rectangular": _rectangular,
+    "Circular": _circular,
+}
+
+
+def section_properties(section_type, dimensions):
+    # dimensions: {symbol: scalar or array}; every returned property has the broadcast shape
+    if section_type not in _SHAPES:
+        raise ValueError(f"Unknown section type: {section_type}")
+    dims = {key: np.asarray(dimensions.get(key, 0.0), dtype=float) for key in SECTION_DIMENSIONS[section_type]}
+    return _SHAPES[section_type](dims)
+
+
+def catalogue_properties(section_type, rows):
+    # rows: list of property dicts as stored in sections_data (dialog labels or bare symbols)
+    columns = {key: [] for key in SECTION_DIMENSIONS[section_type]}
+    for row in rows:
+        dims = {dimension_key(label): value for label, value in row.items()}
+        for key in columns:
+            columns[key].append(dims.get(key, 0.0))
+    return section_properties(section_type, {key: np.array(values) for key, values in columns.items()})
+
+
+def _section_key(section_type, properties):
+    return (section_type, tuple(sorted((dimension_key(label), float(value)) for label, value in properties.items())))
+
+
+def compute_sections(sections_data):
+    # One property dict per section in sections_data, computed once per distinct section
+    missing = {}
+    for section in sections_data:
+        key = _section_key(section[1], section[2])
+        if key not in _property_cache:
+            missing.setdefault(section[1], {})[key] = section[2]
+
+    for section_type, pending in missing.items():
+        values = catalogue_properties(section_type, list(pending.values()))
+        for i, key in enumerate(pending):
+            _property_cache[key] = {name: float(values[name][i]) for name in PROPERTY_NAMES}
+
+    return [_property_cache[_section_key(section[1], section[2])] for section in sections_data]
+
+
+def get_section_properties(section_type, properties):
+    return compute_sections([["", section_type, properties, None]])[0]
+
+
+def clear_cache():
+    _property_cache.clear()
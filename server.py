@@ -0,0 +1,307 @@
+import argparse
+import http.client
+import http.server
+import json
+import os
+import queue
+import socket
+import socketserver
+import threading
+import time
+from collections import OrderedDict, deque
+from urllib.parse import parse_qs, urlparse
+import numpy as np
+import analysis
+import cache
+import diagnostics
+
+# Local analysis service. Jobs are save_project JSON documents (see
+# analysis.py) posted over HTTP on a TCP port or a Unix socket; they queue
+# for a pool of worker threads. Stiffness systems of recently analysed
+# structures stay in memory with their factorization, keyed by the model
+# hash, so a repeat job on the same structure with new loads only runs the
+# triangular solves.
+#
+#   POST /jobs[?wait=1]        submit a project; with wait, reply with the finished job
+#   GET  /jobs/<id>[?wait=s]   job status and result, waiting up to s seconds
+#   GET  /metrics              queue depth, job counts, warm hits, latency percentiles
+
+class WarmSystems:
+    # Least recently used reanalysis systems (factorized on first solve), keyed by model hash
+    def __init__(self, size=8):
+        self.size = size
+        self.systems = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, frame_model, sparse=True):
+        key = cache.model_key(frame_model, sparse=sparse)
+        with self.lock:
+            if key in self.systems:
+                self.systems.move_to_end(key)
+                self.hits += 1
+                return self.systems[key]
+            self.misses += 1
+        entry = (frame_model.reanalysis_system(sparse), threading.Lock())
+        with self.lock:
+            entry = self.systems.setdefault(key, entry)
+            while len(self.systems) > self.size:
+                self.systems.popitem(last=False)
+        return entry
+
+    def __len__(self):
+        return len(self.systems)
+
+class Job:
+    def __init__(self, job_id, project):
+        self.id = job_id
+        self.project = project
+        self.status = "queued"
+        self.submitted = time.perf_counter()
+        self.started = None
+        self.finished = None
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+
+    def to_dict(self):
+        data = {"id": self.id, "status": self.status}
+        if self.finished is not None:
+            data["wait_seconds"] = self.started - self.submitted
+            data["run_seconds"] = self.finished - self.started
+        if self.result is not None:
+            data["result"] = self.result
+        if self.error is not None:
+            data["error"] = self.error
+        return data
+
+def _percentiles(values):
+    if not values:
+        return {"count": 0}
+    values = np.asarray(values)
+    return {"count": len(values), "mean": float(values.mean()), "p50": float(np.percentile(values, 50)),
+            "p95": float(np.percentile(values, 95)), "max": float(values.max())}
+
+class JobServer:
+    def __init__(self, workers=None, warm=8, result_cache=None, history=1000):
+        # result_cache: optional cache.ResultCache shared with Analyze for solutions kept on disk;
+        # history: finished jobs (and latency samples) kept for lookups and metrics
+        self.queue = queue.Queue()
+        self.warm = WarmSystems(warm)
+        self.result_cache = result_cache
+        self.jobs = OrderedDict()
+        self.history = history
+        self.lock = threading.Lock()
+        self.next_id = 1
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.latency = deque(maxlen=history)
+        self.wait_times = deque(maxlen=history)
+        self.workers = [threading.Thread(target=self._work, daemon=True) for _ in range(workers or os.cpu_count() or 1)]
+        for worker in self.workers:
+            worker.start()
+
+    def submit(self, project):
+        with self.lock:
+            job = Job(str(self.next_id), project)
+            self.next_id += 1
+            self.jobs[job.id] = job
+            while len(self.jobs) > self.history and next(iter(self.jobs.values())).done.is_set():
+                self.jobs.popitem(last=False)
+        self.queue.put(job)
+        return job
+
+    def job(self, job_id):
+        return self.jobs.get(job_id)
+
+    def _work(self):
+        while True:
+            job = self.queue.get()
+            if job is None:
+                break
+            with self.lock:
+                self.running += 1
+            job.started = time.perf_counter()
+            job.status = "running"
+            try:
+                job.result = self.analyze(job.project)
+                job.status = "done"
+            except Exception as error:
+                # Any failure fails the job only; the worker lives on to take the next one
+                job.error = str(error) if not isinstance(error, KeyError) else f"Missing project field {error}."
+                job.status = "failed"
+            finally:
+                job.finished = time.perf_counter()
+                job.project = None
+                with self.lock:
+                    self.running -= 1
+                    self.completed += job.status == "done"
+                    self.failed += job.status != "done"
+                    self.latency.append(job.finished - job.submitted)
+                    self.wait_times.append(job.started - job.submitted)
+                job.done.set()
+
+    def analyze(self, project):
+        frame_model = analysis.build_model(project)
+        case_names, F, factors, members = analysis.project_load_cases(frame_model, project)
+        issues = diagnostics.diagnose(frame_model, F=F)
+        if issues:
+            raise ValueError(diagnostics.report(issues))
+        system, lock = self.warm.get(frame_model)
+        with lock:
+            if self.result_cache is None:
+                U = system.solve(F)
+            else:
+                U = cache.cached_solve(self.result_cache, system, frame_model, F, sparse=True, precision=system.precision)
+        return {"cases": case_names, "displacements": U.T.tolist(), "max_displacement": float(np.abs(U).max())}
+
+    def metrics(self):
+        with self.lock:
+            return {
+                "queue_depth": self.queue.qsize(),
+                "running": self.running,
+                "completed": self.completed,
+                "failed": self.failed,
+                "workers": len(self.workers),
+                "warm_systems": len(self.warm),
+                "warm_hits": self.warm.hits,
+                "warm_misses": self.warm.misses,
+                "latency_seconds": _percentiles(list(self.latency)),
+                "queue_wait_seconds": _percentiles(list(self.wait_times)),
+            }
+
+    def close(self):
+        for worker in self.workers:
+            self.queue.put(None)
+        for worker in self.workers:
+            worker.join()
+
+# ---------------- HTTP front end ----------------
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, data):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != "/jobs":
+            return self._reply(404, {"error": "Not found."})
+        try:
+            project = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        except ValueError:
+            return self._reply(400, {"error": "The body is not valid JSON."})
+        job = self.server.jobs.submit(project)
+        if parse_qs(url.query).get("wait", ["0"])[0] not in ("", "0"):
+            job.done.wait()
+            return self._reply(200, job.to_dict())
+        self._reply(202, job.to_dict())
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/metrics":
+            return self._reply(200, self.server.jobs.metrics())
+        if url.path.startswith("/jobs/"):
+            job = self.server.jobs.job(url.path[len("/jobs/"):])
+            if job is None:
+                return self._reply(404, {"error": "Unknown job."})
+            wait = parse_qs(url.query).get("wait")
+            if wait:
+                job.done.wait(float(wait[0]))
+            return self._reply(200, job.to_dict())
+        self._reply(404, {"error": "Not found."})
+
+class _TCPServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    daemon_threads = True
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+def make_server(jobs, address):
+    # address: (host, port) for TCP, or a filesystem path for a Unix socket
+    if isinstance(address, str):
+        if os.path.exists(address):
+            os.unlink(address)
+        server = _UnixServer(address, _Handler)
+    else:
+        server = _TCPServer(tuple(address), _Handler)
+    server.jobs = jobs
+    return server
+
+class _UnixConnection(http.client.HTTPConnection):
+    def __init__(self, path, timeout):
+        super().__init__("localhost", timeout=timeout)
+        self.path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.path)
+
+class Client:
+    def __init__(self, address, timeout=300):
+        self.address = address
+        self.timeout = timeout
+
+    def _request(self, method, path, data=None):
+        if isinstance(self.address, str):
+            connection = _UnixConnection(self.address, self.timeout)
+        else:
+            connection = http.client.HTTPConnection(*self.address, timeout=self.timeout)
+        try:
+            body = None if data is None else json.dumps(data)
+            connection.request(method, path, body, {"Content-Type": "application/json"} if body else {})
+            response = connection.getresponse()
+            result = json.loads(response.read())
+        finally:
+            connection.close()
+        if response.status >= 400:
+            raise ValueError(result.get("error", f"HTTP {response.status}"))
+        return result
+
+    def submit(self, project, wait=False):
+        return self._request("POST", "/jobs?wait=1" if wait else "/jobs", project)
+
+    def job(self, job_id, wait=None):
+        return self._request("GET", f"/jobs/{job_id}" + (f"?wait={wait}" if wait else ""))
+
+    def analyze(self, project):
+        return self.submit(project, wait=True)
+
+    def metrics(self):
+        return self._request("GET", "/metrics")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve frame analyses of project JSON files.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--socket", help="listen on this Unix socket instead of TCP")
+    parser.add_argument("--workers", type=int, default=None, help="worker threads, all cores by default")
+    parser.add_argument("--warm", type=int, default=8, help="factorized structures kept in memory")
+    parser.add_argument("--cache", action="store_true", help="also keep solutions in the on-disk result cache")
+    args = parser.parse_args(argv)
+
+    jobs = JobServer(args.workers, args.warm, cache.ResultCache() if args.cache else None)
+    server = make_server(jobs, args.socket or (args.host, args.port))
+    print(f"Serving on {args.socket or f'http://{args.host}:{server.server_address[1]}'}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        jobs.close()
+
+if __name__ == "__main__":
+    main()
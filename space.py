@@ -0,0 +1,118 @@
+import numpy as np
+import fem
+import model
+import profiling
+
+# Space frames: 6 DOFs per node (ux, uy, uz, rx, ry, rz) and 12x12 beam-column
+# elements with axial, torsional (G*J) and biaxial bending stiffness. The
+# global axes extend the 2D ones, with y up and z out of the drawing plane, so
+# a planar frame at z = 0 reproduces the 2D results with its in-plane bending
+# on Iz. Element matrices are built in batches and go through the same
+# assembly and solver functions as the 2D model.
+#
+# Local axes: x runs from the start node to the end node, y lies in the plane
+# of x and the element's reference vector, and z = x cross y. The reference
+# defaults to global Y, and to global -X for members parallel to Y, so beams
+# bend about local z under gravity and columns sway about local z in the
+# XY plane.
+
+SUPPORT_CODES = "xyzXYZ"
+
+def local_axes(coords, connectivity, reference=None):
+    # Member lengths and rotation matrices (rows: local x, y, z in global coordinates)
+    d = coords[connectivity[:, 1]] - coords[connectivity[:, 0]]
+    L = np.linalg.norm(d, axis=1)
+    x = d / L[:, None]
+    if reference is None:
+        vertical = np.abs(x[:, 1]) > 1 - 1e-9
+        reference = np.where(vertical[:, None], [-1.0, 0.0, 0.0], [0.0, 1.0, 0.0])
+    reference = np.broadcast_to(np.asarray(reference, dtype=float), x.shape)
+    z = np.cross(x, reference)
+    norm = np.linalg.norm(z, axis=1)
+    if (norm < 1e-9).any():
+        raise ValueError(f"The reference vector of element E{np.flatnonzero(norm < 1e-9)[0] + 1} is parallel to it.")
+    z /= norm[:, None]
+    y = np.cross(z, x)
+    return L, np.stack([x, y, z], axis=1)
+
+def transformation_matrices(R):
+    T = np.zeros((len(R), 12, 12))
+    for i in range(0, 12, 3):
+        T[:, i:i + 3, i:i + 3] = R
+    return T
+
+@profiling.profiled()
+def local_stiffness_matrices(L, E, G, A, Iy, Iz, J, release_start=None, release_end=None):
+    # release_start/release_end: both bending moments released at that end (torsion is kept)
+    m = len(L)
+    k = np.zeros((m, 12, 12))
+    axial, torsion = E * A / L, G * J / L
+    for i, j, value in ((0, 6, axial), (3, 9, torsion)):
+        k[:, i, i] = k[:, j, j] = value
+        k[:, i, j] = k[:, j, i] = -value
+
+    # Bending in the local x-y plane (about z, Iz), then in the x-z plane (about y, Iy),
+    # where a positive rotation about y lowers z ahead of the node, flipping the coupling terms
+    for (v1, r1, v2, r2), EI, sign in (((1, 5, 7, 11), E * Iz, 1), ((2, 4, 8, 10), E * Iy, -1)):
+        a, b, c, e = 12 * EI / L**3, sign * 6 * EI / L**2, 4 * EI / L, 2 * EI / L
+        k[:, v1, v1] = k[:, v2, v2] = a
+        k[:, v1, v2] = k[:, v2, v1] = -a
+        k[:, v1, r1] = k[:, r1, v1] = k[:, v1, r2] = k[:, r2, v1] = b
+        k[:, v2, r1] = k[:, r1, v2] = k[:, v2, r2] = k[:, r2, v2] = -b
+        k[:, r1, r1] = k[:, r2, r2] = c
+        k[:, r1, r2] = k[:, r2, r1] = e
+
+    for dofs, released in (((4, 5), release_start), ((10, 11), release_end)):
+        if released is not None:
+            for dof in dofs:
+                fem._condense_dofs(k, dof, np.asarray(released, dtype=bool))
+    return k
+
+class SpaceFrameModel:
+    def __init__(self, coords, connectivity, E, G, A, Iy, Iz, J, supports, release_start=None, release_end=None,
+                 reference=None):
+        # supports: codes from SUPPORT_CODES per node (x, y, z translations; X, Y, Z rotations);
+        # reference: optional vector per element (or one for all) fixing the local y axis
+        self.coords = np.asarray(coords, dtype=float).reshape(-1, 3)
+        self.connectivity = np.asarray(connectivity, dtype=int).reshape(-1, 2)
+        m = len(self.connectivity)
+        self.E, self.G, self.A, self.Iy, self.Iz, self.J = (np.broadcast_to(np.asarray(x, dtype=float), (m,)).copy()
+                                                            for x in (E, G, A, Iy, Iz, J))
+        self.release_start = np.zeros(m, dtype=bool) if release_start is None else np.asarray(release_start, dtype=bool)
+        self.release_end = np.zeros(m, dtype=bool) if release_end is None else np.asarray(release_end, dtype=bool)
+        self.supports = list(supports)
+        self.reference = reference
+
+    @property
+    def num_nodes(self):
+        return len(self.coords)
+
+    @property
+    def num_elements(self):
+        return len(self.connectivity)
+
+    @property
+    def num_dof(self):
+        return self.num_nodes * 6
+
+    def boundary_conditions(self):
+        return model.support_dofs(self.supports, SUPPORT_CODES)
+
+    def element_matrices(self):
+        # (local stiffness, transformation, DOF map) of every element
+        L, R = local_axes(self.coords, self.connectivity, self.reference)
+        k_local = local_stiffness_matrices(L, self.E, self.G, self.A, self.Iy, self.Iz, self.J,
+                                           self.release_start, self.release_end)
+        return k_local, transformation_matrices(R), fem.element_dof_map(self.connectivity, 6)
+
+    def stiffness_matrix(self, sparse=True):
+        k_local, T, dof_map = self.element_matrices()
+        return fem.assemble_global_matrix(fem.to_global(k_local, T), dof_map, self.num_dof, sparse)
+
+    def solve(self, F, sparse=True, precision="double"):
+        return fem.solve(self.stiffness_matrix(sparse), F, self.boundary_conditions(), precision=precision)
+
+    def element_forces(self, U):
+        # Local end forces (N, Vy, Vz, T, My, Mz at each end) of every element
+        k_local, T, dof_map = self.element_matrices()
+        return fem.element_forces(k_local, T, U, dof_map)
@@ -0,0 +1,141 @@
+import numpy as np
+
+# Uniform-grid spatial indexes over node points and member segments, built
+# with numpy in one pass. Queries only look at the grid cells a search box covers.
+
+_ROW = np.int64(1) << 31
+
+class _Grid:
+    def __init__(self, boxes, cell_size):
+        boxes = np.asarray(boxes, dtype=float).reshape(-1, 4)
+        self.cell_size = float(cell_size)
+        self.origin = boxes[:, :2].min(axis=0) if len(boxes) else np.zeros(2)
+        ix0, iy0 = self._cell(boxes[:, 0], boxes[:, 1])
+        ix1, iy1 = self._cell(boxes[:, 2], boxes[:, 3])
+        wide = ix1 - ix0 + 1
+        counts = wide * (iy1 - iy0 + 1)
+        items = np.repeat(np.arange(len(boxes)), counts)
+        local = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        keys = (ix0[items] + local % wide[items]) * _ROW + iy0[items] + local // wide[items]
+        order = np.argsort(keys, kind="stable")
+        self.keys = keys[order]
+        self.items = items[order]
+
+    def _cell(self, x, y):
+        return (np.floor((np.asarray(x) - self.origin[0]) / self.cell_size).astype(np.int64),
+                np.floor((np.asarray(y) - self.origin[1]) / self.cell_size).astype(np.int64))
+
+    def candidates(self, xmin, ymin, xmax, ymax):
+        ix0, iy0 = self._cell(xmin, ymin)
+        ix1, iy1 = self._cell(xmax, ymax)
+        gx, gy = np.meshgrid(np.arange(ix0, ix1 + 1), np.arange(iy0, iy1 + 1))
+        wanted = (gx * _ROW + gy).ravel()
+        lo = np.searchsorted(self.keys, wanted, side="left")
+        hi = np.searchsorted(self.keys, wanted, side="right")
+        if not (hi > lo).any():
+            return np.zeros(0, dtype=int)
+        return np.unique(np.concatenate([self.items[a:b] for a, b in zip(lo, hi) if b > a]))
+
+def _default_cell_size(extent, count):
+    return max(float(extent) / max(np.sqrt(count), 1.0), 1e-9)
+
+class PointIndex:
+    def __init__(self, points, cell_size=None):
+        self.points = np.asarray(points, dtype=float).reshape(-1, 2)
+        if cell_size is None:
+            extent = np.ptp(self.points, axis=0).max() if len(self.points) else 1.0
+            cell_size = _default_cell_size(extent, len(self.points))
+        self.grid = _Grid(np.hstack([self.points, self.points]), cell_size)
+
+    def within(self, x, y, radius):
+        candidates = self.grid.candidates(x - radius, y - radius, x + radius, y + radius)
+        d = np.hypot(self.points[candidates, 0] - x, self.points[candidates, 1] - y)
+        return candidates[d <= radius]
+
+    def nearest(self, x, y, radius):
+        candidates = self.within(x, y, radius)
+        if len(candidates) == 0:
+            return -1
+        d = np.hypot(self.points[candidates, 0] - x, self.points[candidates, 1] - y)
+        return int(candidates[np.argmin(d)])
+
+    def neighbours(self, queries, tolerance):
+        # Every (query, point, distance) pair closer than tolerance, found through the grid cells around each query
+        queries = np.asarray(queries, dtype=float).reshape(-1, 2)
+        ix, iy = self.grid._cell(queries[:, 0], queries[:, 1])
+        reach = int(np.ceil(tolerance / self.grid.cell_size))
+        owners, found = [], []
+        for dx in range(-reach, reach + 1):
+            for dy in range(-reach, reach + 1):
+                keys = (ix + dx) * _ROW + iy + dy
+                lo = np.searchsorted(self.grid.keys, keys, side="left")
+                counts = np.searchsorted(self.grid.keys, keys, side="right") - lo
+                owner = np.repeat(np.arange(len(queries)), counts)
+                offset = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+                owners.append(owner)
+                found.append(self.grid.items[lo[owner] + offset])
+        owner = np.concatenate(owners) if owners else np.zeros(0, dtype=int)
+        point = np.concatenate(found) if found else np.zeros(0, dtype=int)
+        d = np.hypot(self.points[point, 0] - queries[owner, 0], self.points[point, 1] - queries[owner, 1])
+        close = d <= tolerance
+        return owner[close], point[close], d[close]
+
+    def locate(self, queries, tolerance):
+        # Nearest point within tolerance of every query (the lowest index on ties), -1 where there is none
+        count = len(np.asarray(queries).reshape(-1, 2))
+        owner, point, d = self.neighbours(queries, tolerance)
+        result = np.full(count, -1, dtype=int)
+        order = np.lexsort((point, d, owner))
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = owner[order][1:] != owner[order][:-1]
+        result[owner[order][first]] = point[order][first]
+        return result
+
+def tolerance_index(points, tolerance):
+    # Cells about the size of the tolerance hold one node each however the nodes are spread;
+    # they only grow where the cell keys would otherwise overflow
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    extent = np.ptp(points, axis=0).max() if len(points) else 1.0
+    return PointIndex(points, max(tolerance, extent * 2.0**-30))
+
+def merge_points(points, tolerance):
+    # Label of every point: the lowest index among the points it coincides with (chains are merged)
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    labels = np.arange(len(points))
+    if len(points) == 0:
+        return labels
+    index = tolerance_index(points, tolerance)
+    owner, point, d = index.neighbours(points, tolerance)
+    while True:
+        updated = labels.copy()
+        np.minimum.at(updated, owner, labels[point])
+        updated = updated[updated]
+        if np.array_equal(updated, labels):
+            return labels
+        labels = updated
+
+class SegmentIndex:
+    def __init__(self, segments, cell_size=None):
+        self.segments = np.asarray(segments, dtype=float).reshape(-1, 4)
+        if cell_size is None:
+            lengths = np.hypot(self.segments[:, 2] - self.segments[:, 0], self.segments[:, 3] - self.segments[:, 1])
+            cell_size = max(float(np.median(lengths)), 1e-9) if len(lengths) else 1.0
+        s = self.segments
+        boxes = np.column_stack([np.minimum(s[:, 0], s[:, 2]), np.minimum(s[:, 1], s[:, 3]),
+                                 np.maximum(s[:, 0], s[:, 2]), np.maximum(s[:, 1], s[:, 3])])
+        self.grid = _Grid(boxes, cell_size)
+
+    def distances(self, candidates, x, y):
+        s = self.segments[candidates]
+        d = s[:, 2:] - s[:, :2]
+        length2 = np.maximum((d**2).sum(axis=1), 1e-300)
+        t = np.clip(((x - s[:, 0]) * d[:, 0] + (y - s[:, 1]) * d[:, 1]) / length2, 0, 1)
+        return np.hypot(s[:, 0] + t * d[:, 0] - x, s[:, 1] + t * d[:, 1] - y)
+
+    def nearest(self, x, y, radius):
+        candidates = self.grid.candidates(x - radius, y - radius, x + radius, y + radius)
+        if len(candidates) == 0:
+            return -1
+        d = self.distances(candidates, x, y)
+        best = np.argmin(d)
+        return int(candidates[best]) if d[best] <= radius else -1
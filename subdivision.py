@@ -0,0 +1,184 @@
+import numpy as np
+import fem
+import model
+
+# Members are split at their point loads, at the ends of their distributed
+# loads and at output stations, and the nodes inside a member are condensed
+# out at the element level (Schur complement of the member's own chain of
+# sub-elements). The global system keeps one 6-DOF element per member and only
+# receives the equivalent end loads; the internal displacements are recovered
+# member by member after the solve. Members without loads are exact as a
+# single cubic element, so they are never split.
+#
+# Loads follow the drawing convention: a positive "Y" magnitude acts
+# downwards and a positive "X" magnitude to the right. Distributed loads are
+# per unit length along the member; an end position at or before the start
+# position means the load runs to the end of the member.
+
+CHUNK = 2048
+
+def _direction_vectors(directions):
+    directions = np.array([str(d).upper() for d in directions], dtype=str).reshape(-1)
+    return np.column_stack([(directions == "X").astype(float), -(directions == "Y").astype(float)])
+
+def member_loads(L, udl_data=(), vdl_data=(), point_load_data=()):
+    # (point loads: element, position, global force) and
+    # (distributed loads: element, start, end, global intensity at start, at end)
+    m = len(L)
+    point_element = np.array([p[0] for p in point_load_data], dtype=int)
+    point_position = np.array([p[3] for p in point_load_data], dtype=float)
+    point_force = np.array([p[1] for p in point_load_data], dtype=float)[:, None] * _direction_vectors([p[2] for p in point_load_data])
+
+    rows = [[u[0], u[1], u[1], u[2], u[3], u[4]] for u in udl_data] + [list(v) for v in vdl_data]
+    dist_element = np.array([r[0] for r in rows], dtype=int)
+    directions = _direction_vectors([r[3] for r in rows])
+    w_start = np.array([r[1] for r in rows], dtype=float)[:, None] * directions
+    w_end = np.array([r[2] for r in rows], dtype=float)[:, None] * directions
+    a = np.array([r[4] for r in rows], dtype=float)
+    b = np.array([r[5] for r in rows], dtype=float)
+
+    for element in (point_element, dist_element):
+        bad = (element < 0) | (element >= m)
+        if bad.any():
+            raise ValueError(f"Load on element E{element[bad][0] + 1}, which does not exist.")
+    point_position = np.clip(point_position, 0.0, L[point_element])
+    a = np.clip(a, 0.0, L[dist_element])
+    b = np.where(b > a, np.clip(b, 0.0, L[dist_element]), L[dist_element])
+    return (point_element, point_position, point_force), (dist_element, a, b, w_start, w_end)
+
+def consistent_loads(length, p1, p2, q1, q2):
+    # Local end loads of a sub-element under linearly varying axial (p) and transverse (q) load
+    l = length
+    f = np.empty((len(l), 6))
+    f[:, 0] = l * (2 * p1 + p2) / 6
+    f[:, 3] = l * (p1 + 2 * p2) / 6
+    f[:, 1] = l * (7 * q1 + 3 * q2) / 20
+    f[:, 4] = l * (3 * q1 + 7 * q2) / 20
+    f[:, 2] = l**2 * (3 * q1 + 2 * q2) / 60
+    f[:, 5] = -l**2 * (2 * q1 + 3 * q2) / 60
+    return f
+
+class MemberSubdivision:
+    def __init__(self, frame_model, udl_data=(), vdl_data=(), point_load_data=(), stations=5, tolerance=model.NODE_TOLERANCE):
+        # stations: equally spaced output points added to every loaded member
+        self.num_dof = frame_model.num_dof
+        self.connectivity = frame_model.connectivity
+        self.L, self.c, self.s = fem.element_geometry(frame_model.coords, frame_model.connectivity)
+        self.T = fem.transformation_matrices(self.c, self.s)
+        self.dof_map = fem.element_dof_map(frame_model.connectivity)
+        m = len(self.L)
+        (point_element, point_position, point_force), (dist_element, a, b, w_start, w_end) = member_loads(
+            self.L, udl_data, vdl_data, point_load_data)
+
+        # Split positions: member ends, load positions and stations on loaded members
+        loaded = np.unique(np.concatenate([point_element, dist_element]))
+        t = np.linspace(0.0, 1.0, max(stations, 2))
+        element = np.concatenate([np.repeat(np.arange(m), 2), point_element, dist_element, dist_element,
+                                  np.repeat(loaded, len(t))])
+        position = np.concatenate([np.column_stack([np.zeros(m), self.L]).ravel(), point_position, a, b,
+                                   (self.L[loaded][:, None] * t).ravel()])
+        length = self.L[element]
+        position = np.where(position < tolerance, 0.0, np.where(position > length - tolerance, length, position))
+        order = np.lexsort((position, element))
+        sorted_element, sorted_position = element[order], position[order]
+        keep = np.ones(len(order), dtype=bool)
+        keep[1:] = (sorted_element[1:] != sorted_element[:-1]) | (np.diff(sorted_position) > tolerance)
+        point_of = np.empty(len(order), dtype=int)
+        point_of[order] = np.cumsum(keep) - 1
+
+        # Chain points and sub-elements; the sub-element starting at point j of member e is j - e
+        self.point_element = sorted_element[keep]
+        self.point_position = sorted_position[keep]
+        self.points = np.bincount(self.point_element, minlength=m)
+        self.point_offsets = np.concatenate([[0], np.cumsum(self.points)])
+        starts = np.flatnonzero(self.point_element[1:] == self.point_element[:-1])
+        self.segment_member = self.point_element[starts]
+        self.segment_first_point = starts
+        self.segment_start = self.point_position[starts]
+        self.segment_length = np.diff(self.point_position)[starts]
+        self.segment_offsets = self.point_offsets - np.arange(m + 1)
+        sm = self.segment_member
+        self.k_segment = fem.local_stiffness_matrices(self.segment_length, frame_model.E[sm], frame_model.A[sm], frame_model.I[sm])
+
+        # Distributed loads in local axes on every sub-element they cover
+        count = len(self.segment_member)
+        self.p = np.zeros((count, 2))
+        self.q = np.zeros((count, 2))
+        first = point_of[2 * m + len(point_element) + np.arange(len(dist_element))] - dist_element
+        last = point_of[2 * m + len(point_element) + len(dist_element) + np.arange(len(dist_element))] - dist_element
+        covered = last - first
+        load = np.repeat(np.arange(len(dist_element)), covered)
+        segment = np.repeat(first, covered) + np.arange(covered.sum()) - np.repeat(np.cumsum(covered) - covered, covered)
+        if len(segment):
+            e = dist_element[load]
+            span = b[load] - a[load]
+            for column, x in enumerate((self.segment_start[segment], self.segment_start[segment] + self.segment_length[segment])):
+                w = w_start[load] + (w_end[load] - w_start[load]) * ((x - a[load]) / span)[:, None]
+                np.add.at(self.p[:, column], segment, w[:, 0] * self.c[e] + w[:, 1] * self.s[e])
+                np.add.at(self.q[:, column], segment, -w[:, 0] * self.s[e] + w[:, 1] * self.c[e])
+        self.f_segment = consistent_loads(self.segment_length, self.p[:, 0], self.p[:, 1], self.q[:, 0], self.q[:, 1])
+
+        # Load on the chain DOFs of every member: sub-element loads plus the point loads at their chain points
+        chain_load = np.zeros(3 * len(self.point_element))
+        np.add.at(chain_load, 3 * self.segment_first_point[:, None] + np.arange(6), self.f_segment)
+        j = point_of[2 * m + np.arange(len(point_element))]
+        e = point_element
+        np.add.at(chain_load, 3 * j, point_force[:, 0] * self.c[e] + point_force[:, 1] * self.s[e])
+        np.add.at(chain_load, 3 * j + 1, -point_force[:, 0] * self.s[e] + point_force[:, 1] * self.c[e])
+
+        self.k_condensed = np.zeros((m, 6, 6))
+        self.f_condensed = np.zeros((m, 6))
+        self.groups = []
+        keys = np.column_stack([self.points, frame_model.release_start, frame_model.release_end])
+        unique, inverse = np.unique(keys, axis=0, return_inverse=True)
+        for g, (points, release_start, release_end) in enumerate(unique.tolist()):
+            members = np.flatnonzero(inverse.reshape(-1) == g)
+            for chunk in range(0, len(members), CHUNK):
+                self._condense(members[chunk:chunk + CHUNK], points, release_start, release_end, chain_load)
+
+    def _condense(self, members, points, release_start, release_end, chain_load):
+        n = 3 * points
+        # Released end rotations belong to the member, so they are condensed with the internal DOFs
+        slots = [i for i, released in zip(range(6), [0, 0, release_start, 0, 0, release_end]) if not released]
+        ext = np.array([0, 1, 2, n - 3, n - 2, n - 1])[slots]
+        internal = np.setdiff1d(np.arange(n), ext)
+        K = np.zeros((len(members), n, n))
+        first = self.segment_offsets[members]
+        for k in range(points - 1):
+            K[:, 3 * k:3 * k + 6, 3 * k:3 * k + 6] += self.k_segment[first + k]
+        F = chain_load[3 * self.point_offsets[members][:, None] + np.arange(n)]
+
+        Kie = K[:, internal][:, :, ext]
+        Kee = K[:, ext][:, :, ext]
+        if len(internal):
+            Kii = K[:, internal][:, :, internal]
+            R = np.linalg.solve(Kii, Kie)
+            g = np.linalg.solve(Kii, F[:, internal, None])[:, :, 0]
+        else:
+            R = np.zeros((len(members), 0, len(ext)))
+            g = np.zeros((len(members), 0))
+        slots = np.array(slots)
+        self.k_condensed[members[:, None, None], slots[:, None], slots] = Kee - np.einsum('eij,eik->ejk', Kie, R)
+        self.f_condensed[members[:, None], slots] = F[:, ext] - np.einsum('eij,ei->ej', Kie, g)
+        self.groups.append((members, n, ext, internal, slots, R, g))
+
+    def load_vector(self):
+        # Equivalent nodal loads of the member loads in global DOFs
+        F = np.zeros(self.num_dof)
+        np.add.at(F, self.dof_map, np.einsum('eji,ej->ei', self.T, self.f_condensed))
+        return F
+
+    def recover(self, U, factor=1.0):
+        # Local end displacements and end forces of every sub-element for one load case;
+        # factor scales the member loads the same way the case scaled load_vector()
+        u = np.einsum('eij,ej->ei', self.T, U[self.dof_map])
+        chain = np.zeros(3 * len(self.point_element))
+        for members, n, ext, internal, slots, R, g in self.groups:
+            uc = np.zeros((len(members), n))
+            ue = u[members][:, slots]
+            uc[:, ext] = ue
+            uc[:, internal] = factor * g - np.einsum('eij,ej->ei', R, ue)
+            chain[3 * self.point_offsets[members][:, None] + np.arange(n)] = uc
+        u_segment = chain[3 * self.segment_first_point[:, None] + np.arange(6)]
+        forces = np.einsum('eij,ej->ei', self.k_segment, u_segment) - factor * self.f_segment
+        return u_segment, forces
@@ -0,0 +1,187 @@
+import hashlib
+import numpy as np
+import fem
+import model
+import profiling
+
+# Superelements for repeated modules (bays, storeys, panels). Every element is
+# given a module label; nodes whose elements all belong to one module are
+# internal to it and are condensed out with a Schur complement, leaving a
+# stiffness matrix over the module's boundary DOFs. Modules with the same
+# geometry relative to their own origin, the same members and the same
+# supports on internal nodes share one signature, so the condensation is done
+# once per signature and reused for every instance. Internal displacements are
+# only recovered when asked for.
+
+def grid_modules(frame_model, width, height, origin=None):
+    # Module label per element from the cell of a regular width x height grid holding its midpoint
+    coords = frame_model.coords
+    origin = coords.min(axis=0) if origin is None else np.asarray(origin, dtype=float)
+    middle = (coords[frame_model.connectivity[:, 0]] + coords[frame_model.connectivity[:, 1]]) / 2
+    cell = np.floor((middle - origin) / (width, height) + 1e-9).astype(np.int64)
+    cell -= cell.min(axis=0) if len(cell) else 0
+    return cell[:, 0] * (cell[:, 1].max() + 1 if len(cell) else 1) + cell[:, 1]
+
+def internal_nodes(connectivity, labels, num_nodes):
+    # Nodes whose elements all carry the same label (>= 0)
+    labels = np.asarray(labels, dtype=np.int64)
+    low = np.full(num_nodes, np.iinfo(np.int64).max)
+    high = np.full(num_nodes, -1)
+    np.minimum.at(low, connectivity.ravel(), np.repeat(labels, 2))
+    np.maximum.at(high, connectivity.ravel(), np.repeat(labels, 2))
+    return (low == high) & (high >= 0)
+
+@profiling.profiled()
+def condense(K, internal, boundary):
+    # (boundary stiffness, inverse of the internal block, internal-boundary block)
+    Kii = K[np.ix_(internal, internal)]
+    Kib = K[np.ix_(internal, boundary)]
+    try:
+        Kii_inv = np.linalg.inv(Kii)
+    except np.linalg.LinAlgError:
+        raise ValueError("A module is unstable once its boundary nodes are held.")
+    return K[np.ix_(boundary, boundary)] - Kib.T @ Kii_inv @ Kib, Kii_inv, Kib
+
+class SuperelementSystem:
+    def __init__(self, frame_model, labels, sparse=True, cache=None, tolerance=model.NODE_TOLERANCE):
+        # labels: module per element, -1 for elements assembled on their own.
+        # cache: signature -> condensed module, shared between systems to reuse earlier condensations
+        self.cache = {} if cache is None else cache
+        self.num_dof = frame_model.num_dof
+        labels = np.asarray(labels, dtype=np.int64)
+        connectivity = frame_model.connectivity
+        L, c, s = fem.element_geometry(frame_model.coords, connectivity)
+        k_local = fem.local_stiffness_matrices(L, frame_model.E, frame_model.A, frame_model.I,
+                                               frame_model.release_start, frame_model.release_end)
+        k_global = fem.to_global(k_local, fem.transformation_matrices(c, s))
+        dof_map = fem.element_dof_map(connectivity)
+
+        internal_node = internal_nodes(connectivity, labels, frame_model.num_nodes)
+        fixed = np.zeros(self.num_dof, dtype=bool)
+        fixed[np.asarray(frame_model.boundary_conditions(), dtype=int)] = True
+
+        self.instances = []
+        self.groups = {}
+        order = np.argsort(labels, kind="stable")
+        bounds = np.flatnonzero(np.diff(labels[order])) + 1
+        for elements in np.split(order, bounds):
+            if len(elements) == 0 or labels[elements[0]] < 0:
+                continue
+            key, dofs, internal, boundary, ends = self._instance(frame_model, elements, internal_node, fixed, tolerance)
+            if not len(internal):
+                continue
+            if key not in self.cache:
+                K = np.zeros((len(dofs), len(dofs)))
+                local = ends[:, [0, 0, 0, 1, 1, 1]] * 3 + np.array([0, 1, 2, 0, 1, 2])
+                np.add.at(K, (np.repeat(local, 6, axis=1), np.tile(local, (1, 6))), k_global[elements].reshape(-1, 36))
+                self.cache[key] = condense(K, internal, boundary)
+            self.groups.setdefault(key, []).append(len(self.instances))
+            self.instances.append((key, elements, dofs[internal], dofs[boundary]))
+        self.condensed_elements = np.zeros(len(labels), dtype=bool)
+        for key, elements, internal, boundary in self.instances:
+            self.condensed_elements[elements] = True
+
+        # Retained DOFs are the free DOFs that no module condenses
+        self.internal = np.zeros(self.num_dof, dtype=bool)
+        for key, elements, internal, boundary in self.instances:
+            self.internal[internal] = True
+        self.free_dof = np.flatnonzero(~fixed & ~self.internal)
+        self.reduced = np.full(self.num_dof, -1)
+        self.reduced[self.free_dof] = np.arange(len(self.free_dof))
+
+        # Single elements plus every instance of every superelement, reduced to the retained DOFs
+        single = ~self.condensed_elements
+        rows = [np.repeat(dof_map[single], 6, axis=1).ravel()]
+        cols = [np.tile(dof_map[single], (1, 6)).ravel()]
+        values = [k_global[single].ravel()]
+        for key, members in self.groups.items():
+            S = self.cache[key][0]
+            B = np.array([self.instances[i][3] for i in members])
+            rows.append(np.repeat(B, B.shape[1], axis=1).ravel())
+            cols.append(np.tile(B, (1, B.shape[1])).ravel())
+            values.append(np.broadcast_to(S.ravel(), (len(members), S.size)).ravel())
+        rows = self.reduced[np.concatenate(rows)]
+        cols = self.reduced[np.concatenate(cols)]
+        values = np.concatenate(values)
+        keep = (rows >= 0) & (cols >= 0)
+        n = len(self.free_dof)
+        if sparse and fem.sp is not None:
+            self.K = fem.sp.csr_matrix((values[keep], (rows[keep], cols[keep])), shape=(n, n))
+        else:
+            self.K = np.zeros((n, n))
+            np.add.at(self.K, (rows[keep], cols[keep]), values[keep])
+        self._factor = None
+
+    def _instance(self, frame_model, elements, internal_node, fixed, tolerance):
+        # Signature, DOFs in canonical order (nodes sorted by their position relative to the module's
+        # lowest corner), positions of the internal and boundary DOFs, and canonical element end nodes
+        unique = np.unique(frame_model.connectivity[elements])
+        grid = np.round((frame_model.coords[unique] - frame_model.coords[unique].min(axis=0)) / tolerance).astype(np.int64)
+        order = np.lexsort((grid[:, 1], grid[:, 0]))
+        rank = np.empty(len(unique), dtype=int)
+        rank[order] = np.arange(len(unique))
+        nodes, grid = unique[order], grid[order]
+        dofs = (nodes[:, None] * 3 + np.arange(3)).ravel()
+        is_internal = np.repeat(internal_node[nodes], 3)
+        internal = np.flatnonzero(is_internal & ~fixed[dofs])
+        boundary = np.flatnonzero(~is_internal)
+
+        ends = rank[np.searchsorted(unique, frame_model.connectivity[elements])]
+        members = np.column_stack([ends, frame_model.E[elements], frame_model.A[elements], frame_model.I[elements],
+                                   frame_model.release_start[elements], frame_model.release_end[elements]])
+        members = members[np.lexsort(members.T[::-1])]
+        digest = hashlib.sha1()
+        for part in (grid, is_internal, fixed[dofs], members):
+            digest.update(np.ascontiguousarray(part).tobytes())
+            digest.update(b"|")
+        return digest.hexdigest(), dofs, internal, boundary, ends
+
+    @property
+    def signatures(self):
+        return len(self.groups)
+
+    def condensed_loads(self, F):
+        # Free-DOF load vector with the loads on internal DOFs moved to the module boundaries
+        F = F.reshape(self.num_dof, -1)
+        R = F[self.free_dof].copy()
+        for key, members in self.groups.items():
+            S, Kii_inv, Kib = self.cache[key]
+            I = np.array([self.instances[i][2] for i in members])
+            B = np.array([self.instances[i][3] for i in members])
+            Y = np.einsum('ij,kjc->kic', Kii_inv, F[I])
+            contribution = -np.einsum('ji,kjc->kic', Kib, Y)
+            rows = self.reduced[B]
+            mask = rows >= 0
+            np.add.at(R, rows[mask], contribution[mask])
+        return R
+
+    @profiling.profiled("superelement_solve")
+    def solve(self, F, recover=False):
+        # Internal DOFs are left as NaN unless recover is set; see recover()
+        if self._factor is None:
+            self._factor = fem.factorize(self.K)
+        shape = F.shape
+        R = self.condensed_loads(F)
+        U = np.zeros((self.num_dof, R.shape[1]))
+        U[self.internal] = np.nan
+        U[self.free_dof] = self._factor.solve(R).reshape(len(self.free_dof), -1)
+        if recover:
+            self.recover(U, F)
+        return U.reshape(shape)
+
+    def recover(self, U, F, instances=None):
+        # Fill in the internal DOFs of the given module instances (all by default) in place
+        shape = U.shape
+        U = U.reshape(self.num_dof, -1)
+        F = F.reshape(self.num_dof, -1)
+        wanted = None if instances is None else set(instances)
+        for key, members in self.groups.items():
+            if wanted is not None:
+                members = [i for i in members if i in wanted]
+                if not members:
+                    continue
+            S, Kii_inv, Kib = self.cache[key]
+            I = np.array([self.instances[i][2] for i in members])
+            B = np.array([self.instances[i][3] for i in members])
+            U[I] = np.einsum('ij,kjc->kic', Kii_inv, F[I] - np.einsum('ij,kjc->kic', Kib, U[B]))
+        return U.reshape(shape)
@@ -0,0 +1,177 @@
+import tkinter as tk
+from tkinter import ttk
+import model
+
+# Dialog tables backed by a ttk.Treeview. The Treeview only draws the rows in
+# view, rows are inserted in chunks from the event loop, and a single Entry or
+# Combobox is placed over a cell while it is being edited.
+
+CHUNK = 2000
+
+class EditableTable:
+    def __init__(self, parent, headers, editors=None, label=None, height=15, on_select=None, on_edit=None):
+        # editors: column -> "entry" or a callable returning the shared list of choices
+        # label: format string for the row number column, e.g. "N{}"
+        self.frame = tk.Frame(parent)
+        self.columns = [str(c) for c in range(len(headers))]
+        self.tree = ttk.Treeview(self.frame, columns=self.columns, show="headings", height=height, selectmode="browse")
+        for column, header in zip(self.columns, headers):
+            self.tree.heading(column, text=header)
+            self.tree.column(column, width=110, anchor="center")
+        scrollbar = ttk.Scrollbar(self.frame, orient=tk.VERTICAL, command=self.scroll)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.editors = editors or {}
+        self.label = label
+        self.on_select = on_select
+        self.on_edit = on_edit
+        self.rows = []
+        self.editor = None
+        self.pending = None
+
+        self.tree.bind("<Double-1>", self.begin_edit)
+        self.tree.bind("<<TreeviewSelect>>", lambda event: self.on_select and self.on_select(self.selected()))
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.tree.bind(sequence, lambda event: self.finish_edit(), add="+")
+
+    def pack(self, **options):
+        self.frame.pack(**options)
+
+    def grid(self, **options):
+        self.frame.grid(**options)
+
+    def scroll(self, *args):
+        self.finish_edit()
+        self.tree.yview(*args)
+
+    # ----------------- Rows -----------------
+    def set_rows(self, rows):
+        self.finish_edit()
+        if self.pending is not None:
+            self.tree.after_cancel(self.pending)
+            self.pending = None
+        self.tree.delete(*self.tree.get_children())
+        self.rows = [list(row) for row in rows]
+        self.insert_rows(0)
+
+    def insert_rows(self, start):
+        # The first chunk is inserted now, the rest from the event loop so the dialog opens at once
+        self.pending = None
+        end = min(start + CHUNK, len(self.rows))
+        for index in range(start, end):
+            self.tree.insert("", "end", iid=str(index), values=self.values(index))
+        if end < len(self.rows):
+            self.pending = self.tree.after(1, self.insert_rows, end)
+
+    def values(self, index):
+        if self.label is not None:
+            self.rows[index][0] = self.label.format(index + 1)
+        return self.rows[index]
+
+    def append(self, row):
+        self.rows.append(list(row))
+        if self.pending is None:
+            self.tree.insert("", "end", iid=str(len(self.rows) - 1), values=self.values(len(self.rows) - 1))
+
+    def delete(self, index):
+        self.finish_edit()
+        self.rows.pop(index)
+        if index == len(self.rows) and self.pending is None:
+            self.tree.delete(str(index))
+        else:
+            self.set_rows(self.rows)
+
+    def set(self, index, column, value):
+        self.rows[index][column] = value
+        if self.tree.exists(str(index)):
+            self.tree.set(str(index), self.columns[column], value)
+
+    def selected(self):
+        selection = self.tree.selection()
+        return int(selection[0]) if selection else None
+
+    # ----------------- In-place editing -----------------
+    def begin_edit(self, event):
+        self.finish_edit()
+        item = self.tree.identify_row(event.y)
+        column = self.tree.identify_column(event.x)
+        if not item or not column:
+            return
+        index, column = int(item), int(column[1:]) - 1
+        editor = self.editors.get(column)
+        if editor is None:
+            return
+        x, y, width, height = self.tree.bbox(item, self.columns[column])
+        if editor == "entry":
+            widget = tk.Entry(self.tree)
+            widget.bind("<FocusOut>", lambda event: self.finish_edit())
+        else:
+            # The popdown list takes focus, so a Combobox commits on selection or Return instead
+            widget = ttk.Combobox(self.tree, values=editor())
+            widget.bind("<<ComboboxSelected>>", lambda event: self.finish_edit())
+        widget.insert(0, self.rows[index][column])
+        widget.place(x=x, y=y, width=width, height=height)
+        widget.bind("<Return>", lambda event: self.finish_edit())
+        widget.bind("<Escape>", lambda event: self.cancel_edit())
+        widget.focus_set()
+        self.editor = (widget, index, column)
+
+    def finish_edit(self):
+        if self.editor is None:
+            return
+        widget, index, column = self.editor
+        self.editor = None
+        value = widget.get()
+        widget.destroy()
+        if index < len(self.rows):
+            self.set(index, column, value)
+            if self.on_edit:
+                self.on_edit(index, column, value)
+
+    def cancel_edit(self):
+        if self.editor is not None:
+            self.editor[0].destroy()
+            self.editor = None
+
+# ----------------- Row conversion -----------------
+def node_names(count):
+    return [f"N{i+1}" for i in range(count)]
+
+def node_index(name, count):
+    # "N3" -> 2; raises ValueError for anything that is not an existing node
+    index = int(str(name).strip().lstrip("Nn")) - 1
+    if not 0 <= index < count:
+        raise ValueError(f"Unknown node {name}")
+    return index
+
+def node_rows(nodes_data, length_factor=1):
+    return [[f"N{i+1}", round(x * length_factor, 3), round(y * length_factor, 3), support]
+            for i, (x, y, support) in enumerate(nodes_data)]
+
+def nodes_from_rows(rows, length_factor=1):
+    return [[float(row[1]) / length_factor, float(row[2]) / length_factor, row[3]] for row in rows]
+
+def element_rows(nodes_data, elements_data, sections_data):
+    starts, ends = model.element_nodes(nodes_data, elements_data)
+    default_section = sections_data[0][0] if sections_data else ""
+    rows = []
+    for i, (e, start, end) in enumerate(zip(elements_data, starts.tolist(), ends.tolist())):
+        section = e[6] if len(e) > 6 else None
+        section_name = sections_data[section][0] if section is not None and 0 <= section < len(sections_data) else default_section
+        rows.append([f"E{i+1}", f"N{start+1}" if start >= 0 else "", f"N{end+1}" if end >= 0 else "", section_name, e[4], e[5]])
+    return rows
+
+def elements_from_rows(rows, nodes_data, sections_data):
+    section_index = {}
+    for i, section in enumerate(sections_data):
+        section_index.setdefault(section[0], i)
+    elements = []
+    for row in rows:
+        start = node_index(row[1], len(nodes_data))
+        end = node_index(row[2], len(nodes_data))
+        x1, y1 = nodes_data[start][:2]
+        x2, y2 = nodes_data[end][:2]
+        elements.append([x1, y1, x2, y2, row[4], row[5], section_index.get(row[3])])
+    return elements
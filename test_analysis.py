@@ -0,0 +1,67 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+import numpy as np
+import analysis
+import benchmark
+
+def portal_project(udl=10.0):
+    return {
+        "units": {"force": "kN", "length": "m", "temperature": "C"},
+        "nodes": [[0.0, 0.0, "xyZ"], [0.0, 3.0, ""], [4.0, 3.0, ""], [4.0, 0.0, "xyZ"]],
+        "elements": [[0.0, 0.0, 0.0, 3.0, "", "", None], [0.0, 3.0, 4.0, 3.0, "", "", None],
+                     [4.0, 3.0, 4.0, 0.0, "", "", None]],
+        "materials": [],
+        "sections": [],
+        "load_patterns": [],
+        "load_combinations": [["ULS", 1.4, 1.6, 0, 0], ["SLS", 1.0, 1.0, 0, 0]],
+        "udl": [[1, udl, "Y", 0.0, 0.0]],
+        "properties": {"E": 2e8, "A": 0.01, "I": 1e-4},
+    }
+
+class TestAnalysis(unittest.TestCase):
+
+    def test_dense_and_sparse_agree(self):
+        dense = analysis.analyze(portal_project())
+        sparse = analysis.analyze(portal_project(), sparse=True)
+        self.assertEqual(dense["cases"], ["ULS", "SLS"])
+        np.testing.assert_allclose(dense["displacements"], sparse["displacements"], atol=1e-15)
+
+    def test_project_without_loads(self):
+        project = portal_project()
+        project["udl"] = []
+        with self.assertRaisesRegex(ValueError, "Project has no loads"):
+            analysis.analyze(project)
+
+    def test_batch_worker_stays_light(self):
+        # A small model is checked and solved without loading scipy or tkinter
+        script = ("import json, sys, analysis; analysis.analyze(json.loads(sys.argv[1])); "
+                  "print(sorted({m.split('.')[0] for m in sys.modules} & {'scipy', 'tkinter'}))")
+        output = subprocess.run([sys.executable, "-c", script, json.dumps(portal_project())], capture_output=True, text=True,
+                                check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout
+        self.assertEqual(output.strip(), "[]")
+        record = benchmark.startup_times(["analysis"], repeats=1)[0]
+        self.assertEqual(record["heavy_modules"], [])
+        self.assertGreater(record["seconds"], record["import_seconds"])
+
+    def test_main(self):
+        with tempfile.TemporaryDirectory() as directory:
+            good = os.path.join(directory, "portal.json")
+            bad = os.path.join(directory, "empty.json")
+            output = os.path.join(directory, "results.jsonl")
+            with open(good, 'w') as f:
+                json.dump(portal_project(), f)
+            with open(bad, 'w') as f:
+                json.dump({"nodes": []}, f)
+            self.assertEqual(analysis.main([good, bad, "--output", output]), 1)
+            with open(output) as f:
+                records = [json.loads(line) for line in f]
+        self.assertEqual([r["status"] for r in records], ["done", "failed"])
+        self.assertEqual(records[0]["result"], analysis.analyze(portal_project()))
+        self.assertIn("Missing project field", records[1]["error"])
+
+if __name__ == '__main__':
+    unittest.main()
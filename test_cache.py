@@ -0,0 +1,102 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+import cache
+import fem
+import generators
+
+class TestCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = cache.ResultCache(self.directory.name)
+        self.frame_model = generators.multi_storey_frame(3, 4)
+        self.F = generators.nodal_loads(self.frame_model)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_solutions_are_reused(self):
+        F = np.column_stack([self.F, 1.4 * self.F, np.zeros_like(self.F)])
+        expected = self.frame_model.reanalysis_system().solve(F)
+        system = self.frame_model.reanalysis_system()
+        U = cache.cached_solve(self.cache, system, self.frame_model, F, precision="double")
+        np.testing.assert_allclose(U, expected, atol=1e-12 * np.abs(expected).max())
+        # One solution for both multiples of the load, plus the factorization
+        self.assertEqual(len(self.cache.entries()), 2)
+
+        # A fresh system for the same model never factorizes
+        system = self.frame_model.reanalysis_system()
+        U = cache.cached_solve(self.cache, system, self.frame_model, 0.9 * F, precision="double")
+        self.assertFalse(system.factored)
+        np.testing.assert_allclose(U, 0.9 * expected, atol=1e-12 * np.abs(expected).max())
+
+    def test_stored_factorization(self):
+        system = self.frame_model.reanalysis_system()
+        cache.cached_solve(self.cache, system, self.frame_model, self.F)
+        # A new load reuses the factorization from disk
+        F = generators.nodal_loads(self.frame_model, lateral=-3.0, gravity=-20.0)
+        system = self.frame_model.reanalysis_system()
+        U = cache.cached_solve(self.cache, system, self.frame_model, F)
+        self.assertIsInstance(system.factorize(), fem._StoredFactor)
+        expected = self.frame_model.reanalysis_system().solve(F)
+        np.testing.assert_allclose(U, expected, atol=1e-10 * np.abs(expected).max())
+
+        K = self.frame_model.reanalysis_system(sparse=False).K
+        factor = fem.stored_factor(fem.factor_arrays(fem.factorize(K)))
+        np.testing.assert_allclose(factor.solve(np.ones(len(K))), np.linalg.solve(K, np.ones(len(K))))
+
+    def test_model_changes_change_the_key(self):
+        key = cache.model_key(self.frame_model, precision="double")
+        self.assertEqual(key, cache.model_key(generators.multi_storey_frame(3, 4), precision="double"))
+        self.assertNotEqual(key, cache.model_key(self.frame_model, precision="mixed"))
+        self.frame_model.I[2] *= 2
+        self.assertNotEqual(key, cache.model_key(self.frame_model, precision="double"))
+
+    def test_corrupt_entries_are_dropped(self):
+        self.cache.put("a", {"U": np.arange(5.0)})
+        np.testing.assert_array_equal(self.cache.get("a")["U"], np.arange(5.0))
+        # Damage the stored values in place
+        with open(self.cache.path("a"), "r+b") as f:
+            data = f.read()
+            f.seek(data.index(np.arange(5.0).tobytes()))
+            f.write(np.full(5, 7.0).tobytes())
+        self.assertIsNone(self.cache.get("a"))
+        self.assertFalse(os.path.exists(self.cache.path("a")))
+        # An entry copied under another key does not match it
+        self.cache.put("b", {"U": np.arange(5.0)})
+        os.replace(self.cache.path("b"), self.cache.path("c"))
+        self.assertIsNone(self.cache.get("c"))
+
+    def test_least_recently_used_entries_are_evicted(self):
+        for i, key in enumerate("abc"):
+            self.cache.put(key, {"U": np.zeros(1000)})
+            os.utime(self.cache.path(key), ns=(i * 10**9, i * 10**9))
+        self.cache.get("a")
+        self.cache.max_bytes = 2.5 * os.path.getsize(self.cache.path("a"))
+        self.cache.evict()
+        self.assertIsNone(self.cache.get("b"))
+        self.assertIsNotNone(self.cache.get("a"))
+        self.assertIsNotNone(self.cache.get("c"))
+
+    def test_running_size_total(self):
+        # Puts under the limit keep a running total instead of scanning the directory
+        with mock.patch.object(self.cache, "entries", side_effect=AssertionError("scanned")):
+            for key in "abc":
+                self.cache.put(key, {"U": np.zeros(1000)})
+            self.cache.put("a", {"U": np.zeros(10)})
+            self.cache.remove("b")
+        self.assertEqual(self.cache.total, self.cache.size())
+        self.assertEqual(cache.ResultCache(self.directory.name).total, self.cache.total)
+        # Passing the limit scans and evicts back under it
+        self.cache.max_bytes = self.cache.total + 1
+        self.cache.put("d", {"U": np.zeros(1000)})
+        self.assertLessEqual(self.cache.total, self.cache.max_bytes)
+        self.assertEqual(self.cache.total, self.cache.size())
+        self.cache.clear()
+        self.assertEqual(self.cache.total, 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+import numpy as np
+import diagnostics
+import generators
+from model import FrameModel
+
+class TestDiagnostics(unittest.TestCase):
+
+    def frame(self, coords, connectivity, supports, release_start=None, release_end=None):
+        m = len(connectivity)
+        released = np.zeros(m, dtype=bool)
+        return FrameModel(coords, connectivity, np.full(m, 2e8), np.full(m, 0.01), np.full(m, 1e-4),
+                          released if release_start is None else release_start,
+                          released if release_end is None else release_end, supports)
+
+    def test_stable_models_pass(self):
+        self.assertEqual(diagnostics.diagnose(generators.multi_storey_frame(4, 5, beam_segments=2)), [])
+        self.assertEqual(diagnostics.diagnose(generators.truss(6)), [])
+
+    def test_components(self):
+        labels = diagnostics.components(6, [[0, 1], [4, 3], [1, 2], [3, 5]])
+        self.assertEqual(len(set(labels[[0, 1, 2]])), 1)
+        self.assertEqual(len(set(labels[[3, 4, 5]])), 1)
+        self.assertNotEqual(labels[0], labels[3])
+        groups = diagnostics.UnionFind(6)
+        for a, b in [[0, 1], [4, 3], [1, 2], [3, 5]]:
+            groups.union(a, b)
+        labels = groups.labels()
+        self.assertEqual(len(set(labels[[0, 1, 2]])), 1)
+        self.assertNotEqual(labels[0], labels[3])
+
+    def test_disconnected_part_without_supports(self):
+        coords = [[0, 0], [0, 3], [4, 3], [10, 0], [10, 3]]
+        frame_model = self.frame(coords, [[0, 1], [1, 2], [3, 4]], ["xyZ", "", "", "", ""])
+        issues = diagnostics.diagnose(frame_model)
+        self.assertEqual([i["kind"] for i in issues], ["supports"])
+        self.assertEqual(issues[0]["nodes"], [3, 4])
+        self.assertEqual(issues[0]["elements"], [2])
+        self.assertIn("N4, N5 has no supports", diagnostics.report(issues))
+
+    def test_rotation_about_a_single_pin(self):
+        frame_model = self.frame([[0, 0], [0, 3], [4, 3]], [[0, 1], [1, 2]], ["xy", "", ""])
+        issues = diagnostics.diagnose(frame_model)
+        self.assertEqual(issues[0]["kind"], "supports")
+        self.assertIn("can rotate", issues[0]["message"])
+        # Rollers only in y, all on one vertical line, cannot stop sway either
+        frame_model = self.frame([[0, 0], [0, 3], [4, 3]], [[0, 1], [1, 2]], ["y", "", ""])
+        self.assertIn("not restrained in x", diagnostics.diagnose(frame_model)[0]["message"])
+
+    def test_fully_released_node(self):
+        # Both members are pinned at the middle node, so its rotation has no stiffness
+        coords = [[0, 0], [4, 0], [8, 0]]
+        frame_model = self.frame(coords, [[0, 1], [1, 2]], ["xyZ", "", "xyZ"], np.array([False, True]), np.array([True, False]))
+        issues = diagnostics.diagnose(frame_model)
+        self.assertEqual([i["kind"] for i in issues], ["released"])
+        self.assertEqual(issues[0]["nodes"], [1])
+        self.assertEqual(issues[0]["elements"], [0, 1])
+        frame_model.supports[1] = "Z"
+        self.assertEqual(diagnostics.diagnose(frame_model), [])
+
+    def test_bad_members_and_loose_nodes(self):
+        frame_model = self.frame([[0, 0], [4, 0], [9, 9]], [[0, 1], [1, 1]], ["xyZ", "", ""])
+        frame_model.I[0] = 0.0
+        kinds = {i["kind"]: i for i in diagnostics.diagnose(frame_model)}
+        self.assertEqual(kinds["geometry"]["elements"], [1])
+        self.assertEqual(kinds["properties"]["elements"], [0])
+        self.assertEqual(kinds["unconnected"]["nodes"], [2])
+
+    def test_moment_at_truss_only_node(self):
+        frame_model = generators.truss(4, pinned=True)
+        F = np.zeros((frame_model.num_dof, 2))
+        F[1::3, 0] = -10.0
+        self.assertEqual(diagnostics.diagnose(frame_model, F=F), [])
+        F[3 * 6 + 2, 1] = 5.0
+        issues = diagnostics.diagnose(frame_model, F=F)
+        self.assertEqual([i["kind"] for i in issues], ["loads"])
+        self.assertEqual(issues[0]["nodes"], [6])
+        self.assertIn("N7", issues[0]["message"])
+        # With continuous chords the node keeps its rotation and the moment is carried
+        self.assertEqual(diagnostics.diagnose(generators.truss(4), F=F), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+import numpy as np
+import diagrams
+import model
+import subdivision
+
+class TestDiagrams(unittest.TestCase):
+
+    def setUp(self):
+        # 4 m cantilever along x in two members, fixed at x = 0, tip load P downwards
+        self.E, self.I, self.P = 2e8, 1e-4, 10.0
+        nodes = [[0.0, 0.0, "xyZ"], [2.0, 0.0, ""], [4.0, 0.0, ""]]
+        elements = [[0.0, 0.0, 2.0, 0.0, "", "", None], [2.0, 0.0, 4.0, 0.0, "", "", None]]
+        self.model = model.build_model(nodes, elements, [], [], {"E": self.E, "A": 0.01, "I": self.I})
+        F = np.zeros((self.model.num_dof, 2))
+        F[7, 0] = -self.P
+        F[7, 1] = -2 * self.P
+        U = self.model.reanalysis_system().solve(F)
+        self.results = diagrams.Results(self.model, U, ["P", "2P"])
+
+    def test_deformed_shape_matches_cantilever_deflection(self):
+        u = self.results.recover(0)[0]
+        points = diagrams.deformed_shape(self.results.start, u, self.results.L, self.results.c, self.results.s, 1.0, count=5)
+        x = np.array([0.0, 0.5, 1.0, 1.5, 2.0, 2.5, 3.0, 3.5, 4.0])
+        exact = -self.P * x**2 * (3 * 4.0 - x) / (6 * self.E * self.I)
+        np.testing.assert_allclose(points[:, :, 1].ravel(), np.concatenate([exact[:5], exact[4:]]), atol=1e-12)
+
+    def test_moment_and_shear(self):
+        forces = self.results.internal_forces(1)
+        np.testing.assert_allclose(forces["M"][0, 0], -2 * self.P * 4.0)
+        np.testing.assert_allclose(forces["M"][1, -1], 0.0, atol=1e-9)
+        np.testing.assert_allclose(forces["V"], 2 * self.P)
+        np.testing.assert_allclose(forces["N"], 0.0, atol=1e-9)
+
+    def test_members_are_chained_into_one_polyline(self):
+        self.assertEqual(diagrams.chains([[0, 1], [1, 2], [5, 6], [6, 7], [3, 4]]), [(0, 2), (2, 4), (4, 5)])
+        lines = self.results.polylines("Deformed", 0)
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(len(lines[0]), 2 * (2 * self.results.count - 1))
+        self.assertIs(self.results.polylines("Deformed", 0), lines)
+        moment = self.results.polylines("M", 0)
+        self.assertEqual(len(moment), 1)
+        self.assertEqual(len(moment[0]), 2 * 2 * (self.results.count + 2))
+
+    def test_released_end_rotation_and_span_load(self):
+        # Fixed at x = 0, hinged member end at a fixed node at x = 4, point load P at midspan
+        nodes = [[0.0, 0.0, "xyZ"], [4.0, 0.0, "xyZ"]]
+        elements = [[0.0, 0.0, 4.0, 0.0, "", "Y", None]]
+        frame_model = model.build_model(nodes, elements, [], [], {"E": self.E, "A": 0.01, "I": self.I})
+        members = subdivision.MemberSubdivision(frame_model, point_load_data=[[0, self.P, "Y", 2.0]])
+        U = frame_model.reanalysis_system().solve(members.load_vector()[:, None])
+        results = diagrams.Results(frame_model, U, ["P"], members=members)
+
+        u, forces = results.recover(0)
+        self.assertAlmostEqual(u[-1, 5], self.P * 4.0**2 / (32 * self.E * self.I))
+        M = results.internal_forces(0)["M"]
+        self.assertAlmostEqual(M[0, 0], -3 * self.P * 4.0 / 16)
+        self.assertAlmostEqual(M.max(), 5 * self.P * 4.0 / 32)
+        self.assertAlmostEqual(M[-1, -1], 0.0)
+        # One polyline with the baseline only at the member ends
+        lines = results.polylines("M", 0)
+        self.assertEqual(len(lines), 1)
+        np.testing.assert_allclose(lines[0][[0, 1, -2, -1]], [0.0, 0.0, 4.0, 0.0], atol=1e-12)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import multiprocessing
+import os
+import unittest
+from unittest import mock
+import numpy as np
+import domain
+import fem
+import generators
+import verification
+from model import FrameModel
+
+class TestDomain(unittest.TestCase):
+
+    def test_partition_is_balanced(self):
+        frame_model = generators.multi_storey_frame(20, 20)
+        labels = domain.partition(frame_model, 5)
+        counts = np.bincount(labels)
+        self.assertEqual(len(counts), 5)
+        self.assertLessEqual(counts.max() - counts.min(), 1)
+
+    def test_matches_direct_solve(self):
+        frame_model = verification.random_model(2000, 3)
+        F = np.random.default_rng(0).normal(size=(frame_model.num_dof, 2))
+        expected = verification.SOLVERS["sparse"][0](frame_model, F)
+        with domain.DomainSolver(frame_model, parts=4) as solver:
+            self.assertGreater(len(solver.interface_dof), 0)
+            self.assertLess(len(solver.interface_dof), len(solver.free_dof) / 4)
+            U = solver.solve(F)
+            self.assertLess(verification.relative_error(U, expected), 1e-9)
+            # Workers keep their factorizations between solves
+            np.testing.assert_allclose(solver.solve(F[:, 0]), U[:, 0])
+
+    def test_unstable_subdomain(self):
+        # The middle node only has pin-ended members, so its rotation has no stiffness
+        frame_model = FrameModel([(0, 0), (2, 0), (4, 0)], [(0, 1), (1, 2)], np.full(2, 2e8), np.full(2, 0.01),
+                                 np.full(2, 1e-4), [False, True], [True, False], ["xyZ", "", "xyZ"])
+        with self.assertRaises(ValueError):
+            domain.DomainSolver(frame_model, parts=1)
+
+    @unittest.skipUnless("fork" in multiprocessing.get_all_start_methods(), "needs fork to inject the failure into workers")
+    def test_worker_failure_cleans_up(self):
+        frame_model = generators.multi_storey_frame(4, 4)
+        shared = set(os.listdir("/dev/shm")) if os.path.isdir("/dev/shm") else set()
+        with mock.patch.object(fem, "factorize", side_effect=MemoryError("no room")):
+            with self.assertRaisesRegex(ValueError, "MemoryError: no room"):
+                domain.DomainSolver(frame_model, parts=3, context=multiprocessing.get_context("fork"))
+        self.assertEqual(multiprocessing.active_children(), [])
+        if os.path.isdir("/dev/shm"):
+            self.assertEqual(set(os.listdir("/dev/shm")) - shared, set())
+
+if __name__ == '__main__':
+    unittest.main()
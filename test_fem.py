@@ -1,6 +1,7 @@
 import unittest
 import numpy as np
 import fem
+import generators
 
 class TestFem(unittest.TestCase):
 
@@ -21,5 +22,104 @@ class TestFem(unittest.TestCase):
         U = fem.solve(K, F, boundary_conditions)
         self.assertNotAlmostEqual(U[4], 0)
 
+    def test_released_member_is_condensed(self):
+        node1 = fem.Node(0, 0)
+        node2 = fem.Node(10, 0)
+        element = fem.FrameElement(node1, node2, 29000, 10, 100, "X", "")
+        k = fem.get_element_stiffness_matrix(element)
+        np.testing.assert_allclose(k, k.T)
+        self.assertAlmostEqual(k[1, 1], 3 * 29000 * 100 / 10**3)
+        self.assertEqual(k[2, 2], 0)
+
+    def test_batched_matches_reference(self):
+        coords = np.array([[0, 0], [0, 4], [5, 4], [5, 0]], dtype=float)
+        connectivity = np.array([[0, 1], [1, 2], [2, 3]])
+        release_start = np.array([False, True, False])
+        release_end = np.array([False, True, True])
+        E = np.full(3, 29000.0)
+        A = np.array([10.0, 12.0, 10.0])
+        I = np.array([100.0, 150.0, 100.0])
+
+        nodes = [fem.Node(x, y) for x, y in coords]
+        elements = [fem.FrameElement(nodes[a], nodes[b], E[i], A[i], I[i], "X" if release_start[i] else "", "Y" if release_end[i] else "")
+                    for i, (a, b) in enumerate(connectivity)]
+        K_reference = fem.assemble_stiffness_matrix(elements, nodes)
+
+        L, c, s = fem.element_geometry(coords, connectivity)
+        k_local = fem.local_stiffness_matrices(L, E, A, I, release_start, release_end)
+        k_global = fem.to_global(k_local, fem.transformation_matrices(c, s))
+        K = fem.assemble_global_matrix(k_global, fem.element_dof_map(connectivity), 12)
+        np.testing.assert_allclose(K.toarray() if fem.issparse(K) else K, K_reference, atol=1e-9)
+
+        # One element per chunk, so every entry goes through the band merge
+        for sparse in (True, False):
+            K = fem.assemble_threaded(coords, connectivity, E, A, I, release_start, release_end, threads=2, chunk=1, sparse=sparse)
+            np.testing.assert_allclose(K.toarray() if fem.issparse(K) else K, K_reference, atol=1e-9)
+
+    def test_reanalysis_update_matches_rebuild(self):
+        coords = np.array([[0, 0], [0, 4], [5, 4], [5, 0]], dtype=float)
+        connectivity = np.array([[0, 1], [1, 2], [2, 3]])
+        bcs = [0, 1, 2, 9, 10, 11]
+        F = np.zeros(12)
+        F[3] = 10
+        F[7] = -20
+        system = fem.ReanalysisSystem(coords, connectivity, [29000] * 3, [10] * 3, [100] * 3, None, None, bcs)
+        system.update([1], 20, 300)
+        rebuilt = fem.ReanalysisSystem(coords, connectivity, [29000] * 3, [10, 20, 10], [100, 300, 100], None, None, bcs)
+        np.testing.assert_allclose(system.solve(F), rebuilt.solve(F))
+
+        system.update([0, 2], [10, 15], [100, 150], E=[20000, 35000])
+        rebuilt = fem.ReanalysisSystem(coords, connectivity, [20000, 29000, 35000], [10, 20, 15], [100, 300, 150], None, None, bcs)
+        np.testing.assert_allclose(system.solve(F), rebuilt.solve(F))
+
+    def test_mixed_precision_refines_to_double(self):
+        rng = np.random.default_rng(0)
+        n = 60
+        B = rng.normal(size=(n, n))
+        K = B @ B.T + n * np.eye(n)
+        F = rng.normal(size=(n, 2))
+        factor = fem.factorize(K, "mixed")
+        expected = np.linalg.solve(K, F)
+        np.testing.assert_allclose(factor.solve(F), expected, atol=1e-12 * np.abs(expected).max())
+        self.assertFalse(factor.fallback)
+        self.assertLessEqual(factor.iterations, 5)
+
+    def test_mixed_precision_falls_back_when_refinement_stalls(self):
+        # Condition number far beyond what float32 can resolve
+        Q = np.linalg.qr(np.random.default_rng(1).normal(size=(40, 40)))[0]
+        K = Q @ np.diag(np.logspace(0, 12, 40)) @ Q.T
+        F = np.ones(40)
+        factor = fem.factorize(K, "mixed")
+        U = factor.solve(F)
+        self.assertTrue(factor.fallback)
+        np.testing.assert_allclose(U, np.linalg.solve(K, F), rtol=1e-6)
+
+    def test_truss_nodes_drop_rotations(self):
+        frame_model = generators.truss(6, pinned=True)
+        n = frame_model.num_nodes
+        np.testing.assert_array_equal(fem.truss_rotation_dofs(frame_model.connectivity, frame_model.release_start,
+                                                              frame_model.release_end, n), np.arange(n) * 3 + 2)
+        system = frame_model.reanalysis_system()
+        self.assertEqual(len(system.free_dof), 2 * n - 3)
+        self.assertLess(np.linalg.cond(system.K.toarray()), 1e6)
+
+        # Same displacements as a plain two-DOF-per-node truss
+        F = generators.nodal_loads(frame_model)
+        U = system.solve(F)
+        L, c, s = fem.element_geometry(frame_model.coords, frame_model.connectivity)
+        K = np.zeros((2 * n, 2 * n))
+        for (a, b), l, ci, si, E, A in zip(frame_model.connectivity, L, c, s, frame_model.E, frame_model.A):
+            d = np.array([-ci, -si, ci, si])
+            dofs = [2 * a, 2 * a + 1, 2 * b, 2 * b + 1]
+            K[np.ix_(dofs, dofs)] += E * A / l * np.outer(d, d)
+        free = np.setdiff1d(np.arange(2 * n), [0, 1, 2 * (6 + 1) - 1])
+        expected = np.zeros(2 * n)
+        expected[free] = np.linalg.solve(K[np.ix_(free, free)], np.column_stack([F[0::3], F[1::3]]).ravel()[free])
+        np.testing.assert_allclose(U.reshape(n, 3)[:, :2].ravel(), expected, atol=1e-12 * np.abs(expected).max())
+        self.assertTrue((U[2::3] == 0).all())
+
+        # Chord nodes of the usual truss keep their rotations
+        self.assertEqual(len(generators.truss(6).reanalysis_system().free_dof), 3 * n - 3)
+
 if __name__ == '__main__':
     unittest.main()
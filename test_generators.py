@@ -0,0 +1,21 @@
+import unittest
+import numpy as np
+import fem
+import generators
+
+class TestGenerators(unittest.TestCase):
+
+    def test_sizes_are_close_to_target(self):
+        for kind in ["portal", "frame", "truss", "random"]:
+            frame_model = generators.model_of_size(kind, 1000)
+            self.assertLess(abs(frame_model.num_elements - 1000), 150, kind)
+
+    def test_models_are_solvable(self):
+        for kind in ["portal", "frame", "truss", "random"]:
+            frame_model = generators.model_of_size(kind, 100)
+            U = frame_model.reanalysis_system().solve(generators.nodal_loads(frame_model))
+            self.assertTrue(np.all(np.isfinite(U)), kind)
+            self.assertGreater(np.abs(U).max(), 0, kind)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+import history
+
+def frame():
+    nodes = [[0.0, 0.0, "xyZ"], [0.0, 3.0, ""], [4.0, 3.0, ""], [4.0, 0.0, "xy"]]
+    elements = [[0.0, 0.0, 0.0, 3.0, "", "", 0], [0.0, 3.0, 4.0, 3.0, "", "", 1], [4.0, 3.0, 4.0, 0.0, "", "", 0]]
+    sections = [["C1", "Rectangular", {"b": 0.3, "h": 0.3}, 0], ["B1", "Rectangular", {"b": 0.2, "h": 0.5}, 0]]
+    return {"nodes": nodes, "elements": elements, "sections": sections, "materials": [["Steel", 77, 2e8, 0.3, 8e7, 1.2e-5]], "udl": []}
+
+def copy_state(state):
+    return {name: [list(row) for row in rows] for name, rows in state.items()}
+
+class TestHistory(unittest.TestCase):
+
+    def setUp(self):
+        self.state = frame()
+        self.history = history.History(self.state)
+
+    def test_undo_redo_round_trip(self):
+        original = copy_state(self.state)
+        self.state["nodes"][1][0] = 0.5
+        self.state["elements"][0][2] = 0.5
+        self.history.commit(self.state, "move node")
+        moved = copy_state(self.state)
+        self.state["elements"].pop(1)
+        self.state["udl"].append([0, 10.0, "Y", 0, 3])
+        self.history.commit(self.state, "remove member")
+        removed = copy_state(self.state)
+
+        self.history.undo(self.state)
+        self.assertEqual(self.state, moved)
+        self.history.undo(self.state)
+        self.assertEqual(self.state, original)
+        self.assertFalse(self.history.can_undo())
+        self.history.redo(self.state)
+        self.history.redo(self.state)
+        self.assertEqual(self.state, removed)
+
+        # Rows handed back to the tables are copies, so editing them leaves the history intact
+        self.history.undo(self.state)
+        self.state["elements"][1][4] = "X"
+        self.history.redo(self.state)
+        self.history.undo(self.state)
+        self.assertEqual(self.state["elements"][1][4], "")
+
+    def test_steps_store_only_changed_rows(self):
+        state = {"elements": [[i, 0, i + 1, 0, "", "", 0] for i in range(10000)]}
+        steps = history.History(state)
+        for i in range(100):
+            state["elements"][i * 50][6] = 1
+            steps.commit(state)
+        state["elements"].insert(5000, [0, 1, 1, 1, "", "", 0])
+        steps.commit(state)
+        stored = sum(len(diff[3]) for label, diffs in steps.undo_stack for diff in diffs.values())
+        self.assertEqual(stored, 101)
+        # The snapshot shares its rows with the steps instead of copying them again
+        self.assertIs(steps.snapshot["elements"][5000], steps.undo_stack[-1][1]["elements"][3][0])
+
+    def test_invalidation(self):
+        self.state["elements"][1][6] = 0
+        changed = self.history.commit(self.state)
+        self.assertEqual(history.invalidated(changed, self.state["elements"], self.state["sections"]), (False, {1}, False))
+
+        self.state["sections"][0][2] = {"b": 0.4, "h": 0.4}
+        changed = history.merge_changes(changed, self.history.commit(self.state))
+        self.assertEqual(history.invalidated(changed, self.state["elements"], self.state["sections"]), (False, {0, 1, 2}, False))
+
+        self.state["udl"].append([0, 5.0, "Y", 0, 3])
+        changed = self.history.commit(self.state)
+        self.assertEqual(history.invalidated(changed, self.state["elements"], self.state["sections"]), (False, set(), True))
+
+        self.state["elements"][2][5] = "Y"
+        changed = self.history.commit(self.state)
+        self.assertTrue(history.invalidated(changed, self.state["elements"], self.state["sections"])[0])
+        changed = self.history.undo(self.state)
+        self.assertEqual(self.state["elements"][2][5], "")
+        self.assertTrue(history.invalidated(changed, self.state["elements"], self.state["sections"])[0])
+
+if __name__ == '__main__':
+    unittest.main()
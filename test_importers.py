@@ -0,0 +1,94 @@
+import os
+import tempfile
+import time
+import unittest
+import numpy as np
+import importers
+import model
+
+def write(directory, name, text):
+    filepath = os.path.join(directory, name)
+    with open(filepath, 'w') as f:
+        f.write(text)
+    return filepath
+
+def dxf(segments, layer="0"):
+    lines = ["0", "SECTION", "2", "HEADER", "0", "ENDSEC", "0", "SECTION", "2", "ENTITIES"]
+    for x1, y1, x2, y2 in segments:
+        lines += ["0", "LINE", "8", layer, "10", str(x1), "20", str(y1), "30", "0.0", "11", str(x2), "21", str(y2), "31", "0.0"]
+    lines += ["0", "CIRCLE", "8", layer, "10", "1.0", "20", "1.0", "40", "0.5"]
+    lines += ["0", "ENDSEC", "0", "EOF"]
+    return "\n".join(lines) + "\n"
+
+class TestImporters(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def test_node_and_element_tables(self):
+        nodes = importers.read_csv(write(self.directory, "nodes.csv", "x,y,support\n0,0,xyZ\n0,3000,\n4000,3000,\n"))
+        self.assertEqual(importers.table_kind(nodes), "nodes")
+        nodes_data = importers.nodes_from_columns(nodes, 0.001)
+        self.assertEqual(nodes_data, [[0.0, 0.0, "xyZ"], [0.0, 3.0, ""], [4.0, 3.0, ""]])
+
+        elements = importers.read_csv(write(self.directory, "elements.csv",
+                                            "start,end,release_start,release_end,section\nN1,N2,,,W1\n2,3,X,,\n"))
+        self.assertEqual(importers.table_kind(elements), "elements")
+        sections_data = [["W1", "Rectangular", {"b": 0.2, "h": 0.4}, None]]
+        nodes_out, elements_data = importers.elements_from_columns(elements, nodes_data, sections_data)
+        self.assertEqual(nodes_out, nodes_data)
+        self.assertEqual(elements_data, [[0.0, 0.0, 0.0, 3.0, "", "", 0], [0.0, 3.0, 4.0, 3.0, "X", "", None]])
+
+    def test_coordinate_elements_share_nodes(self):
+        columns = importers.read_csv(write(self.directory, "lines.csv", "x1,y1,x2,y2\n0,0,0,3\n0,3.0000000001,4,3\n4,3,4,0\n"))
+        nodes_data, elements_data = importers.elements_from_columns(columns, [[0.0, 0.0, "xy"]])
+        self.assertEqual(len(nodes_data), 4)
+        self.assertEqual(nodes_data[0], [0.0, 0.0, "xy"])
+        self.assertEqual(elements_data[1][:2], elements_data[0][2:4])
+        np.testing.assert_array_equal(model.element_nodes(nodes_data, elements_data)[0], [0, 1, 2])
+
+    def test_sections_and_loads(self):
+        columns = importers.read_csv(write(self.directory, "sections.csv", "name,type,material,b,h\nR1,Rectangular,Steel,200,400\n"))
+        self.assertEqual(importers.table_kind(columns), "sections")
+        self.assertEqual(importers.sections_from_columns(columns, [["Steel"]], 0.001),
+                         [["R1", "Rectangular", {"b": 0.2, "h": 0.4}, 0]])
+
+        columns = importers.read_csv(write(self.directory, "loads.csv",
+                                           "type,element,magnitude,end_magnitude,direction,start,end,distance\n"
+                                           "udl,E1,10,,Y,0,4,\nvdl,2,5,10,X,0,2,\npoint,1,20,,Y,,,1.5\n"))
+        self.assertEqual(importers.table_kind(columns), "loads")
+        udl, vdl, point = importers.loads_from_columns(columns)
+        self.assertEqual(udl, [[0, 10.0, "Y", 0.0, 4.0]])
+        self.assertEqual(vdl, [[1, 5.0, 10.0, "X", 0.0, 2.0]])
+        self.assertEqual(point, [[0, 20.0, "Y", 1.5]])
+        self.assertEqual(importers.loads_from_columns(columns, num_elements=2)[1], vdl)
+        with self.assertRaisesRegex(ValueError, "element that does not exist"):
+            importers.loads_from_columns(columns, num_elements=1)
+        columns["element"] = ["E0", "E1", "E1"]
+        with self.assertRaisesRegex(ValueError, "element that does not exist"):
+            importers.loads_from_columns(columns, num_elements=2)
+
+    def test_dxf_lines(self):
+        filepath = write(self.directory, "frame.dxf", dxf([(0, 0, 0, 3), (0, 3, 4, 3), (4, 3, 4, 0)], layer="W1"))
+        segments, layers = importers.read_dxf_lines(filepath)
+        np.testing.assert_array_equal(segments, [[0, 0, 0, 3], [0, 3, 4, 3], [4, 3, 4, 0]])
+        self.assertEqual(layers, ["W1"] * 3)
+        nodes_data, elements_data = importers.elements_from_dxf(filepath, sections_data=[["W1", "Circular", {"d": 0.1}, None]])
+        self.assertEqual(len(nodes_data), 4)
+        self.assertEqual([e[6] for e in elements_data], [0, 0, 0])
+
+    def test_large_import(self):
+        n = 200
+        x, y = np.meshgrid(np.arange(n + 1.0), np.arange(n + 1.0))
+        rows = [f"{a},{b},{a + 1},{b}" for a, b in zip(x[:, :-1].ravel(), y[:, :-1].ravel())]
+        rows += [f"{a},{b},{a},{b + 1}" for a, b in zip(x[:-1].ravel(), y[:-1].ravel())]
+        filepath = write(self.directory, "grid.csv", "x1,y1,x2,y2\n" + "\n".join(rows) + "\n")
+        start = time.perf_counter()
+        nodes_data, elements_data = importers.elements_from_columns(importers.read_csv(filepath))
+        elapsed = time.perf_counter() - start
+        self.assertEqual(len(elements_data), 2 * n * (n + 1))
+        self.assertEqual(len(nodes_data), (n + 1)**2)
+        self.assertLess(elapsed, 10.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+import numpy as np
+import model
+
+class TestModel(unittest.TestCase):
+
+    def setUp(self):
+        self.nodes = [[0.0, 0.0, "xyZ"], [0.0, 3.0, ""], [4.0, 3.0, ""], [4.0, 0.0, "xy"]]
+        # Element ends carry round-off from unit conversion
+        self.elements = [[0.0, 0.0, 0.0, 0.1 * 30, "", "", None],
+                         [0.0, 3.0 + 1e-12, 4.0, 3.0, "", "", None],
+                         [4.0, 3.0, 4.0, 1e-13, "", "", None]]
+        self.properties = {"E": 2e8, "A": 0.01, "I": 1e-4}
+
+    def test_build_model_snaps_round_off(self):
+        frame_model = model.build_model(self.nodes, self.elements, [], [], self.properties)
+        np.testing.assert_array_equal(frame_model.connectivity, [[0, 1], [1, 2], [2, 3]])
+        self.assertEqual(frame_model.boundary_conditions(), [0, 1, 2, 9, 10])
+
+    def test_build_model_rejects_dangling_element(self):
+        self.elements.append([9.0, 9.0, 4.0, 3.0, "", "", None])
+        with self.assertRaisesRegex(ValueError, "E4"):
+            model.build_model(self.nodes, self.elements, [], [], self.properties)
+
+    def test_merge_coincident_nodes(self):
+        nodes = self.nodes + [[4.0 + 1e-9, 0.0, "Z"]]
+        elements = self.elements + [[4.0 + 1e-9, 0.0, 0.0, 0.0, "", "", None]]
+        merged_nodes, merged_elements, merged = model.merge_coincident_nodes(nodes, elements)
+        self.assertEqual(merged, 1)
+        self.assertEqual(merged_nodes[3], [4.0, 0.0, "xyZ"])
+        self.assertEqual(merged_elements[3][:4], [4.0, 0.0, 0.0, 0.0])
+        self.assertEqual(merged_elements[1][:4], [0.0, 3.0, 4.0, 3.0])
+        np.testing.assert_array_equal(model.element_nodes(merged_nodes, merged_elements)[1], [1, 2, 3, 0])
+
+if __name__ == '__main__':
+    unittest.main()
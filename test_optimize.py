@@ -0,0 +1,63 @@
+import unittest
+import numpy as np
+import generators
+import optimize
+
+class TestOptimize(unittest.TestCase):
+
+    def setUp(self):
+        self.catalogue = [[f"R{i}", "Rectangular", {"Width (b)": 0.1 + 0.02 * i, "Height (h)": 0.2 + 0.04 * i}, None]
+                          for i in range(30)]
+
+    def test_meets_stress_and_drift_limits(self):
+        frame_model = generators.multi_storey_frame(3, 4)
+        F = np.zeros(frame_model.num_dof)
+        upper = frame_model.coords[:, 1] > 0
+        F[0::3][upper] = 10.0
+        F[1::3][upper] = -50.0
+        result = optimize.size_sections(frame_model, self.catalogue, F, 250e3, drift_limit=1 / 400)
+        self.assertTrue(result["converged"])
+        self.assertLessEqual(result["stress_ratio"], 1 + 1e-6)
+        self.assertLessEqual(result["drift_ratio"], 1 / 400 * (1 + 1e-6))
+        self.assertLess(result["sections"].min(), len(self.catalogue) - 1)
+
+    def test_mixed_material_catalogue(self):
+        # The light end of the catalogue is timber, 20 times less stiff than the steel members being sized
+        materials = [["Steel", 78.5, 2e8, 0.3, 7.7e7, 1.2e-5], ["Timber", 5.0, 1e7, 0.3, 6e5, 5e-6]]
+        catalogue = [[f"T{i}", "Rectangular", {"Width (b)": 0.1 + 0.02 * i, "Height (h)": 0.2 + 0.04 * i}, 1]
+                     for i in range(10)]
+        catalogue += [[f"S{i}", "Rectangular", {"Width (b)": 0.3 + 0.02 * i, "Height (h)": 0.6 + 0.04 * i}, 0]
+                      for i in range(5)]
+        frame_model = generators.multi_storey_frame(2, 2)
+        F = np.zeros(frame_model.num_dof)
+        F[0::3][frame_model.coords[:, 1] > 0] = 5.0
+        result = optimize.size_sections(frame_model, catalogue, F, 1e9, drift_limit=1 / 300, materials_data=materials)
+        self.assertTrue(result["converged"])
+        expected_E = [materials[catalogue[i][3]][2] for i in result["sections"]]
+        np.testing.assert_array_equal(result["E"], expected_E)
+
+        # An independent analysis with the chosen sections and their materials meets the limit
+        system = frame_model.reanalysis_system()
+        system.update(np.arange(frame_model.num_elements), result["A"], result["I"], expected_E)
+        U = system.solve(F[:, None])
+        self.assertAlmostEqual(optimize.drift_ratios(frame_model.coords, U).max(), result["drift_ratio"])
+        self.assertLessEqual(result["drift_ratio"], 1 / 300 * (1 + 1e-6))
+
+    def test_drift_is_per_storey(self):
+        # Two storeys of 3 m: the upper storey only drifts by its own 10 mm, not the 40 mm at the roof
+        coords = np.array([[0, 0], [4, 0], [0, 3], [4, 3], [0, 6], [4, 6]], dtype=float)
+        U = np.zeros(18)
+        U[0::3] = [0, 0, 0.03, 0.03, 0.04, 0.04]
+        np.testing.assert_allclose(optimize.drift_ratios(coords, U), [0, 0, 0.01, 0.01, 0.01 / 3, 0.01 / 3])
+        np.testing.assert_allclose(optimize._drift_vector(coords, 4) @ U, 0.01 / 3)
+
+    def test_stress_only_picks_lightest_feasible(self):
+        frame_model = generators.portal_frame(1)
+        F = np.zeros(frame_model.num_dof)
+        F[7] = -1.0
+        result = optimize.size_sections(frame_model, self.catalogue, F, 250e3)
+        self.assertTrue(result["converged"])
+        np.testing.assert_array_equal(result["sections"], [0, 0, 0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import json
+import unittest
+import numpy as np
+import fem
+import generators
+import profiling
+
+class TestProfiling(unittest.TestCase):
+
+    def tearDown(self):
+        profiling.disable()
+
+    def test_disabled_records_nothing(self):
+        self.assertFalse(profiling.enabled())
+        self.assertIs(profiling.stage("anything"), profiling.stage("other"))
+        profiling.note(ignored=True)
+
+    def test_nested_stages_and_matrix_info(self):
+        frame_model = generators.multi_storey_frame(2, 2)
+        with profiling.profile(track_memory=True) as profiler:
+            with profiling.stage("analysis", elements=frame_model.num_elements):
+                L, c, s = fem.element_geometry(frame_model.coords, frame_model.connectivity)
+                k_local = fem.local_stiffness_matrices(L, frame_model.E, frame_model.A, frame_model.I)
+                k_global = fem.to_global(k_local, fem.transformation_matrices(c, s))
+                K = fem.assemble_global_matrix(k_global, fem.element_dof_map(frame_model.connectivity), frame_model.num_dof)
+                fem.solve(K, generators.nodal_loads(frame_model), frame_model.boundary_conditions())
+
+        stages = {r["path"]: r for r in json.loads(profiler.to_json())["stages"]}
+        self.assertEqual(stages["analysis"]["elements"], frame_model.num_elements)
+        self.assertIn("analysis/assemble_global_matrix", stages)
+        solve = stages["analysis/solve"]
+        self.assertEqual(solve["shape"][0], frame_model.num_dof - 9)
+        self.assertGreater(solve["nnz"], 0)
+        self.assertIn("peak_bytes", solve)
+        if fem.issparse(K):
+            self.assertGreaterEqual(stages["analysis/solve/factorize"]["fill_in"], 1.0)
+
+    def test_calls_are_aggregated(self):
+        nodes = [fem.Node(0, 0), fem.Node(10, 0)]
+        element = fem.FrameElement(nodes[0], nodes[1], 29000, 10, 100)
+        with profiling.profile() as profiler:
+            for _ in range(5):
+                fem.get_element_forces(element, np.zeros(6), nodes)
+        self.assertEqual(profiler.stages["get_element_forces"]["calls"], 5)
+
+if __name__ == '__main__':
+    unittest.main()
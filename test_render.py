@@ -0,0 +1,197 @@
+import unittest
+import numpy as np
+import generators
+import render
+
+class FakeCanvas:
+    # Records canvas items the way Tk would, without needing a display
+    def __init__(self):
+        self.items = {}
+        self.next_id = 1
+        self.created = 0
+
+    def _create(self, kind, *coords, tags=(), **options):
+        item = self.next_id
+        self.next_id += 1
+        self.created += 1
+        self.items[item] = {"kind": kind, "coords": list(coords), "tags": set((tags,) if isinstance(tags, str) else tags)}
+        return item
+
+    def create_line(self, *coords, **options):
+        return self._create("line", *coords, **options)
+
+    def create_oval(self, *coords, **options):
+        return self._create("oval", *coords, **options)
+
+    def create_polygon(self, *coords, **options):
+        return self._create("polygon", *coords, **options)
+
+    def create_text(self, *coords, **options):
+        return self._create("text", *coords, **options)
+
+    def find_withtag(self, tag):
+        if isinstance(tag, int):
+            return (tag,) if tag in self.items else ()
+        return tuple(i for i, item in self.items.items() if tag == "all" or tag in item["tags"])
+
+    def delete(self, tag):
+        for item in self.find_withtag(tag):
+            del self.items[item]
+
+    def scale(self, tag, x, y, sx, sy):
+        for item in self.find_withtag(tag):
+            c = self.items[item]["coords"]
+            self.items[item]["coords"] = [x + (v - x) * sx if k % 2 == 0 else y + (v - y) * sy for k, v in enumerate(c)]
+
+    def move(self, tag, dx, dy):
+        for item in self.find_withtag(tag):
+            c = self.items[item]["coords"]
+            self.items[item]["coords"] = [v + (dx if k % 2 == 0 else dy) for k, v in enumerate(c)]
+
+    def itemconfigure(self, item, **options):
+        for i in self.find_withtag(item):
+            self.items[i].update(options)
+
+    def tag_raise(self, tag):
+        pass
+
+    def coords(self, item, *coords):
+        if coords:
+            self.items[item]["coords"] = list(coords)
+        return self.items[item]["coords"]
+
+def frame():
+    nodes = [[0, 0, "xyZ"], [0, 3, ""], [4, 3, ""], [8, 3, ""], [8, 0, "xy"]]
+    elements = [[0, 0, 0, 3, "", ""], [0, 3, 4, 3, "", ""], [4, 3, 8, 3, "", "Y"], [8, 3, 8, 0, "", ""]]
+    return nodes, elements
+
+class TestRender(unittest.TestCase):
+
+    def setUp(self):
+        self.canvas = FakeCanvas()
+        self.renderer = render.ModelRenderer(self.canvas)
+
+    def test_rerender_without_changes_creates_nothing(self):
+        nodes, elements = frame()
+        self.renderer.render(nodes, elements, udl_data=[[1, 10, "Y", 0, 4]])
+        created = self.canvas.created
+        self.assertGreater(created, 0)
+        self.renderer.render(nodes, elements, udl_data=[[1, 10, "Y", 0, 4]])
+        self.assertEqual(self.canvas.created, created)
+
+    def test_moving_one_node_redraws_only_it_and_attached_elements(self):
+        nodes, elements = frame()
+        self.renderer.render(nodes, elements)
+        untouched = {tag: self.renderer.item_ids(tag) for tag in ["node0", "node1", "node3", "element0", "element3"]}
+
+        # Stays inside the model bounds, so the fit-to-canvas transform is unchanged
+        nodes[2][0] = 5
+        elements[1][2] = 5
+        elements[2][0] = 5
+        self.renderer.render(nodes, elements)
+
+        for tag, ids in untouched.items():
+            self.assertEqual(self.renderer.item_ids(tag), ids, tag)
+        self.assertNotEqual(self.renderer.item_ids("element1"), [])
+
+    def test_removed_entities_are_deleted(self):
+        nodes, elements = frame()
+        self.renderer.render(nodes, elements)
+        self.renderer.render(nodes[:4], elements[:2] + [[4, 3, 8, 3, "", ""]])
+        self.assertEqual(self.renderer.item_ids("node4"), [])
+        self.assertEqual(self.renderer.item_ids("element3"), [])
+        self.renderer.render([], [])
+        self.assertEqual(self.renderer.item_ids("model"), [])
+
+    def test_item_count_is_capped(self):
+        frame_model = generators.multi_storey_frame(30, 30)
+        nodes = [[x, y, s] for (x, y), s in zip(frame_model.coords.tolist(), frame_model.supports)]
+        elements = [[*nodes[a][:2], *nodes[b][:2], "", ""] for a, b in frame_model.connectivity.tolist()]
+        udl = [[j, 10, "Y", 0, 1] for j in range(len(elements))]
+
+        self.renderer.max_items = 5000
+        self.renderer.render(nodes, elements, udl)
+        self.assertLessEqual(len(self.canvas.items), 5000)
+        self.assertEqual(self.renderer.detail, render.AGGREGATED)
+
+        self.renderer.max_items = 1000
+        self.renderer.render(nodes, elements, udl)
+        self.assertLessEqual(len(self.canvas.items), 1000)
+        self.assertEqual(self.renderer.detail, render.STRUCTURE_ONLY)
+
+    def test_segments_outside_viewport_are_culled(self):
+        x1 = np.array([10.0, -500.0, -500.0])
+        y1 = np.array([10.0, 10.0, 300.0])
+        x2 = np.array([20.0, -400.0, 1500.0])
+        y2 = np.array([20.0, 20.0, 300.0])
+        np.testing.assert_array_equal(self.renderer.visible_segments(x1, y1, x2, y2), [True, False, True])
+
+    def test_resize_draws_newly_visible_members(self):
+        nodes, elements = frame()
+        self.renderer.render(nodes, elements, fit=True)
+        # Pan the right-hand column past the 800 px edge, then widen the canvas to show it again
+        x, y = self.renderer.to_canvas(8, 3)
+        self.renderer.pan(900 - float(x), 0)
+        self.renderer.refresh()
+        self.assertEqual(self.renderer.item_ids("element3"), [])
+        self.renderer.resize(1200, 600)
+        self.assertNotEqual(self.renderer.item_ids("element3"), [])
+
+    def test_zoom_and_pan_reuse_items(self):
+        nodes, elements = frame()
+        self.renderer.render(nodes, elements)
+        x, y = self.renderer.to_canvas(8, 3)
+        created = self.canvas.created
+        self.renderer.zoom(1.1, 400, 300)
+        self.renderer.pan(25, -10)
+        self.renderer.refresh()
+        self.assertEqual(self.canvas.created, created)
+        line = self.canvas.items[self.renderer.item_ids("element1")[0]]["coords"]
+        expected = self.renderer.to_canvas(np.array([0, 4]), np.array([3, 3]))
+        np.testing.assert_allclose(line[0::2], expected[0])
+        np.testing.assert_allclose(line[1::2], expected[1])
+        np.testing.assert_allclose(self.renderer.to_world(*self.renderer.to_canvas(8, 3)), [8, 3])
+
+    def test_zoom_keeps_point_under_cursor(self):
+        nodes, elements = frame()
+        self.renderer.render(nodes, elements)
+        x, y = self.renderer.to_canvas(4, 3)
+        self.renderer.zoom(3.0, float(x), float(y))
+        np.testing.assert_allclose(self.renderer.to_canvas(4, 3), [x, y])
+
+    def test_pick(self):
+        nodes, elements = frame()
+        self.renderer.render(nodes, elements)
+        x, y = self.renderer.to_canvas(4, 3)
+        self.assertEqual(self.renderer.pick(float(x) + 2, float(y)), "node2")
+        x, y = self.renderer.to_canvas(2, 3)
+        self.assertEqual(self.renderer.pick(float(x), float(y) + 3), "element1")
+        self.assertIsNone(self.renderer.pick(float(x), float(y) + 100))
+
+    def test_switching_overlays_reuses_items(self):
+        nodes, elements = frame()
+        self.renderer.render(nodes, elements)
+        model_items = set(self.canvas.items)
+        deformed = [np.array([0, 0, 0.1, 3, 4, 3.1, 8, 3, 8, 0])]
+        moment = [np.array([0, 3, 2, 4, 4, 3]), np.array([8, 3, 8, 0])]
+        self.renderer.show_overlay("deformed", deformed)
+        self.renderer.show_overlay("moment", moment, "blue")
+        created = self.canvas.created
+        self.assertEqual(created, len(model_items) + 3)
+
+        self.renderer.show_overlay("deformed")
+        self.renderer.show_overlay(None)
+        self.renderer.show_overlay("moment")
+        self.assertEqual(self.canvas.created, created)
+        states = {item: self.canvas.items[item].get("state") for item in self.canvas.find_withtag("overlay")}
+        self.assertEqual(sorted(states.values()), ["hidden", "normal", "normal"])
+        self.assertTrue(model_items <= set(self.canvas.items))
+
+        # Overlays follow the model through re-renders and go away with clear_overlays
+        self.renderer.render(nodes, elements)
+        self.assertEqual(self.canvas.created, created)
+        self.renderer.clear_overlays()
+        self.assertEqual(set(self.canvas.items), model_items)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,33 @@
+import unittest
+import numpy as np
+import sections
+
+class TestSections(unittest.TestCase):
+
+    def test_rectangle(self):
+        p = sections.get_section_properties("Rectangular", {"Width (b)": 0.2, "Height (h)": 0.4})
+        self.assertAlmostEqual(p["A"], 0.08)
+        self.assertAlmostEqual(p["Ix"], 0.2 * 0.4**3 / 12)
+        self.assertAlmostEqual(p["Sx"], 0.2 * 0.4**2 / 6)
+        self.assertAlmostEqual(p["Zx"], 0.2 * 0.4**2 / 4)
+
+    def test_i_section_plastic_modulus(self):
+        dims = {"h": 0.3, "b₁": 0.15, "t₁": 0.01, "tw": 0.006, "b₂": 0.15, "t₂": 0.01}
+        p = sections.section_properties("I / Wide Flange", dims)
+        self.assertAlmostEqual(float(p["Zx"]), 0.15 * 0.01 * 0.29 + 0.006 * 0.28**2 / 4)
+
+    def test_pipe_catalogue_is_vectorized(self):
+        p = sections.section_properties("Pipe", {"OD": np.array([0.1, 0.2]), "t": 0.005})
+        ri = np.array([0.045, 0.095])
+        ro = np.array([0.05, 0.1])
+        np.testing.assert_allclose(p["Ix"], np.pi / 4 * (ro**4 - ri**4))
+
+    def test_compute_sections_memoizes(self):
+        sections.clear_cache()
+        data = [["S1", "Circular", {"Diameter (d)": 0.1}, None], ["S2", "Circular", {"Diameter (d)": 0.1}, None]]
+        props = sections.compute_sections(data)
+        self.assertIs(props[0], props[1])
+        self.assertAlmostEqual(props[0]["J"], np.pi * 0.1**4 / 32)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+import numpy as np
+import analysis
+import server
+from test_analysis import portal_project
+
+class TestServer(unittest.TestCase):
+
+    def setUp(self):
+        self.jobs = server.JobServer(workers=2)
+
+    def tearDown(self):
+        self.jobs.close()
+
+    def expected(self, project):
+        frame_model = analysis.build_model(project)
+        names, F, factors, members = analysis.project_load_cases(frame_model, project)
+        return frame_model.reanalysis_system().solve(F)
+
+    def test_jobs_reuse_warm_factorizations(self):
+        for load in (10.0, 25.0, -5.0):
+            job = self.jobs.submit(portal_project(load))
+            self.assertTrue(job.done.wait(30))
+            self.assertEqual(job.status, "done", job.error)
+            self.assertEqual(job.result["cases"], ["ULS", "SLS"])
+            np.testing.assert_allclose(np.array(job.result["displacements"]).T, self.expected(portal_project(load)))
+        metrics = self.jobs.metrics()
+        self.assertEqual((metrics["warm_misses"], metrics["warm_hits"]), (1, 2))
+        self.assertEqual(metrics["completed"], 3)
+        self.assertEqual(metrics["latency_seconds"]["count"], 3)
+        self.assertEqual(metrics["queue_depth"], 0)
+
+    def test_failed_jobs_report_why(self):
+        project = portal_project()
+        project["nodes"][0][2] = ""
+        project["nodes"][3][2] = ""
+        job = self.jobs.submit(project)
+        job.done.wait(30)
+        self.assertEqual(job.status, "failed")
+        self.assertIn("has no supports", job.error)
+        job = self.jobs.submit({"nodes": []})
+        job.done.wait(30)
+        self.assertIn("Missing project field", job.error)
+        self.assertEqual(self.jobs.metrics()["failed"], 2)
+
+    def test_bad_field_types_do_not_stop_the_workers(self):
+        jobs = server.JobServer(workers=1)
+        self.addCleanup(jobs.close)
+        bad = []
+        for field, value in (("units", "SI"), ("properties", [2e8]), ("udl", {"1": 10.0})):
+            project = portal_project()
+            project[field] = value
+            bad.append(jobs.submit(project))
+        self.assertTrue(all(job.done.wait(30) for job in bad))
+        with mock.patch.object(analysis, "build_model", side_effect=AttributeError("unexpected")):
+            crashed = jobs.submit(portal_project())
+            self.assertTrue(crashed.done.wait(30))
+        self.assertEqual((crashed.status, crashed.error), ("failed", "unexpected"))
+        good = jobs.submit(portal_project())
+        self.assertTrue(good.done.wait(30))
+        self.assertEqual(good.status, "done", good.error)
+        self.assertEqual([job.status for job in bad], ["failed"] * 3)
+        self.assertIn("'units' must be a JSON object", bad[0].error)
+        metrics = jobs.metrics()
+        self.assertEqual((metrics["running"], metrics["failed"], metrics["completed"]), (0, 4, 1))
+
+    def serve(self, address):
+        http_server = server.make_server(self.jobs, address)
+        thread = threading.Thread(target=http_server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(http_server.server_close)
+        self.addCleanup(http_server.shutdown)
+        return http_server
+
+    def test_http_and_unix_socket(self):
+        http_server = self.serve(("127.0.0.1", 0))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "frame.sock")
+            self.serve(path)
+            for address in (http_server.server_address[:2], path):
+                client = server.Client(address)
+                job = client.analyze(portal_project())
+                self.assertEqual(job["status"], "done")
+                np.testing.assert_allclose(np.array(job["result"]["displacements"]).T, self.expected(portal_project()))
+                queued = client.submit(portal_project(12.0))
+                self.assertEqual(client.job(queued["id"], wait=30)["status"], "done")
+                self.assertGreaterEqual(client.metrics()["completed"], 2)
+                with self.assertRaisesRegex(ValueError, "Unknown job"):
+                    client.job("999")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+import numpy as np
+import generators
+import space
+from space import SpaceFrameModel
+
+class TestSpace(unittest.TestCase):
+
+    def setUp(self):
+        self.E, self.G, self.A, self.Iy, self.Iz, self.J = 2e8, 8e7, 0.01, 2e-5, 1e-4, 3e-5
+        self.L = 4.0
+
+    def cantilever(self, end, reference=None):
+        return SpaceFrameModel([[0, 0, 0], end], [[0, 1]], self.E, self.G, self.A, self.Iy, self.Iz, self.J,
+                               ["xyzXYZ", ""], reference=reference)
+
+    def test_cantilever(self):
+        frame_model = self.cantilever([self.L, 0, 0])
+        F = np.zeros(12)
+        F[6:10] = [5.0, -3.0, 2.0, 1.5]
+        U = frame_model.solve(F)
+        EA, EIy, EIz, GJ = self.E * self.A, self.E * self.Iy, self.E * self.Iz, self.G * self.J
+        np.testing.assert_allclose(U[6:12], [5.0 * self.L / EA, -3.0 * self.L**3 / (3 * EIz), 2.0 * self.L**3 / (3 * EIy),
+                                             1.5 * self.L / GJ, -2.0 * self.L**2 / (2 * EIy), -3.0 * self.L**2 / (2 * EIz)])
+        # End forces balance the loads
+        forces = frame_model.element_forces(U)[0]
+        np.testing.assert_allclose(forces[6:10], [5.0, -3.0, 2.0, 1.5], atol=1e-9)
+
+    def test_reference_vector_turns_the_section(self):
+        F = np.zeros(12)
+        F[7] = -3.0
+        U = self.cantilever([self.L, 0, 0]).solve(F)
+        self.assertAlmostEqual(U[7], -3.0 * self.L**3 / (3 * self.E * self.Iz))
+        # Local y along global z puts the weak axis in the vertical plane
+        U = self.cantilever([self.L, 0, 0], reference=[0, 0, 1]).solve(F)
+        self.assertAlmostEqual(U[7], -3.0 * self.L**3 / (3 * self.E * self.Iy))
+        with self.assertRaisesRegex(ValueError, "E1"):
+            self.cantilever([self.L, 0, 0], reference=[1, 0, 0]).solve(F)
+
+    def test_planar_frame_matches_2d(self):
+        frame_model = generators.multi_storey_frame(3, 4)
+        F = generators.nodal_loads(frame_model)
+        expected = frame_model.reanalysis_system().solve(F)
+        n = frame_model.num_nodes
+        coords = np.column_stack([frame_model.coords, np.zeros(n)])
+        # Out-of-plane DOFs are held, in-plane supports carry over
+        supports = ["zXY" + s for s in frame_model.supports]
+        solid = SpaceFrameModel(coords, frame_model.connectivity, frame_model.E, 8e7, frame_model.A, frame_model.I,
+                                frame_model.I, 2e-4, supports)
+        F3 = np.zeros(solid.num_dof)
+        F3[0::6], F3[1::6] = F[0::3], F[1::3]
+        U = solid.solve(F3)
+        np.testing.assert_allclose(U.reshape(n, 6)[:, [0, 1, 5]].ravel(), expected, atol=1e-12 * np.abs(expected).max())
+
+    def test_space_frame(self):
+        frame_model = generators.space_frame(2, 3, 4)
+        self.assertEqual(frame_model.num_elements, 12 * 4 + 2 * 4 * 4 + 3 * 3 * 4)
+        K = frame_model.stiffness_matrix()
+        np.testing.assert_allclose((K - K.T).toarray(), 0, atol=1e-6)
+        dense = frame_model.stiffness_matrix(sparse=False)
+        np.testing.assert_allclose(K.toarray(), dense, rtol=1e-12, atol=1e-6)
+        # Released bending moments at both ends leave only axial and torsional stiffness
+        k = space.local_stiffness_matrices(np.array([2.0]), 1.0, 1.0, 1.0, 1.0, 1.0, 1.0, [True], [True])[0]
+        self.assertEqual(np.count_nonzero(np.abs(k) > 1e-12), 8)
+
+if __name__ == '__main__':
+    unittest.main()
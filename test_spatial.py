@@ -0,0 +1,47 @@
+import unittest
+import numpy as np
+import spatial
+
+class TestSpatial(unittest.TestCase):
+
+    def test_point_index_matches_brute_force(self):
+        rng = np.random.default_rng(0)
+        points = rng.uniform(0, 100, (2000, 2))
+        index = spatial.PointIndex(points)
+        for x, y in rng.uniform(0, 100, (50, 2)):
+            d = np.hypot(points[:, 0] - x, points[:, 1] - y)
+            np.testing.assert_array_equal(np.sort(index.within(x, y, 3.0)), np.flatnonzero(d <= 3.0))
+            expected = int(np.argmin(d)) if d.min() <= 3.0 else -1
+            self.assertEqual(index.nearest(x, y, 3.0), expected)
+
+    def test_segment_index_matches_brute_force(self):
+        rng = np.random.default_rng(1)
+        start = rng.uniform(0, 100, (500, 2))
+        segments = np.hstack([start, start + rng.uniform(-10, 10, (500, 2))])
+        index = spatial.SegmentIndex(segments)
+        everything = np.arange(len(segments))
+        for x, y in rng.uniform(0, 100, (50, 2)):
+            d = index.distances(everything, x, y)
+            expected = int(np.argmin(d)) if d.min() <= 2.0 else -1
+            self.assertEqual(index.nearest(x, y, 2.0), expected)
+
+    def test_locate_with_tolerance(self):
+        rng = np.random.default_rng(2)
+        points = rng.uniform(0, 10, (1000, 2))
+        index = spatial.tolerance_index(points, 1e-6)
+        queries = np.vstack([points[::7] + 1e-9, [[-5.0, -5.0]]])
+        expected = np.append(np.arange(0, 1000, 7), -1)
+        np.testing.assert_array_equal(index.locate(queries, 1e-6), expected)
+
+    def test_merge_points(self):
+        points = [[0, 0], [1, 0], [0, 1e-9], [1 + 5e-7, 0], [1 + 1e-6, 0], [2, 2]]
+        # Chains of coincident points collapse onto their lowest index
+        np.testing.assert_array_equal(spatial.merge_points(points, 6e-7), [0, 1, 0, 1, 1, 5])
+        np.testing.assert_array_equal(spatial.merge_points(np.zeros((4, 2)), 1e-6), [0, 0, 0, 0])
+
+    def test_empty(self):
+        self.assertEqual(spatial.PointIndex(np.zeros((0, 2))).nearest(0, 0, 1), -1)
+        self.assertEqual(spatial.SegmentIndex(np.zeros((0, 4))).nearest(0, 0, 1), -1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+import numpy as np
+import fem
+import model
+import subdivision
+
+class TestSubdivision(unittest.TestCase):
+
+    def setUp(self):
+        self.E, self.A, self.I = 2e8, 0.01, 1e-4
+        self.properties = {"E": self.E, "A": self.A, "I": self.I}
+
+    def beam(self, supports, release_end="", length=6.0):
+        nodes = [[0.0, 0.0, supports[0]], [length, 0.0, supports[1]]]
+        elements = [[0.0, 0.0, length, 0.0, "", release_end, None]]
+        return model.build_model(nodes, elements, [], [], self.properties)
+
+    def test_condensed_stiffness_is_the_member_stiffness(self):
+        nodes = [[0, 0, "xyZ"], [0, 3, ""], [4, 3, ""], [8, 3, ""], [8, 0, "xy"]]
+        elements = [[0, 0, 0, 3, "", "", None], [0, 3, 4, 3, "X", "", None], [4, 3, 8, 3, "", "Y", None],
+                    [8, 3, 8, 0, "X", "Y", None]]
+        frame_model = model.build_model(nodes, elements, [], [], self.properties)
+        members = subdivision.MemberSubdivision(frame_model, udl_data=[[1, 5.0, "Y", 1.0, 3.0]],
+                                                point_load_data=[[2, 20.0, "Y", 1.5], [3, 4.0, "X", 1.0]])
+        np.testing.assert_array_equal(members.points, [2, 5, 6, 6])
+        L, c, s = fem.element_geometry(frame_model.coords, frame_model.connectivity)
+        k = fem.local_stiffness_matrices(L, frame_model.E, frame_model.A, frame_model.I,
+                                         frame_model.release_start, frame_model.release_end)
+        np.testing.assert_allclose(members.k_condensed, k, rtol=1e-9, atol=1e-6 * np.abs(k).max())
+
+    def test_point_load_at_distance(self):
+        # Simply supported, P at a from the left: deflection under the load P a^2 b^2 / (3 E I L)
+        frame_model = self.beam(["xy", "y"])
+        P, a, b = 30.0, 2.0, 4.0
+        members = subdivision.MemberSubdivision(frame_model, point_load_data=[[0, P, "Y", a]])
+        F = members.load_vector()
+        np.testing.assert_allclose(F[[1, 4]], [-P * b**2 * (3 * a + b) / 6.0**3, -P * a**2 * (a + 3 * b) / 6.0**3])
+        system = frame_model.reanalysis_system()
+        self.assertEqual(system.K.shape[0], frame_model.num_dof - 3)
+        u, forces = members.recover(system.solve(F))
+        load_point = np.flatnonzero(np.isclose(members.segment_start, a))[0]
+        self.assertAlmostEqual(u[load_point, 1], -P * a**2 * b**2 / (3 * self.E * self.I * 6.0))
+        # Shear jumps by P across the load
+        self.assertAlmostEqual(-forces[load_point - 1, 4] - forces[load_point, 1], P)
+
+    def test_uniform_load_on_fixed_beam(self):
+        frame_model = self.beam(["xyZ", "xyZ"])
+        w, L = 10.0, 6.0
+        members = subdivision.MemberSubdivision(frame_model, udl_data=[[0, w, "Y", 0.0, 0.0]])
+        F = members.load_vector()
+        np.testing.assert_allclose(F, [0, -w * L / 2, -w * L**2 / 12, 0, -w * L / 2, w * L**2 / 12], atol=1e-9)
+        u, forces = members.recover(np.zeros(frame_model.num_dof))
+        middle = np.flatnonzero(np.isclose(members.segment_start, L / 2))[0]
+        self.assertAlmostEqual(u[middle, 1], -w * L**4 / (384 * self.E * self.I))
+        self.assertAlmostEqual(forces[middle, 2], -w * L**2 / 24)
+
+        # Twice the load for a case with factor 2
+        u2, forces2 = members.recover(np.zeros(frame_model.num_dof), 2.0)
+        np.testing.assert_allclose(u2, 2 * u)
+
+    def test_load_on_missing_element(self):
+        frame_model = self.beam(["xy", "y"])
+        with self.assertRaisesRegex(ValueError, "E3"):
+            subdivision.MemberSubdivision(frame_model, vdl_data=[[2, 1.0, 2.0, "Y", 0.0, 1.0]])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+import numpy as np
+import generators
+import substructure
+import verification
+
+class TestSubstructure(unittest.TestCase):
+
+    def setUp(self):
+        # Every beam split into four members, so each bay and storey has three internal nodes
+        self.frame_model = generators.multi_storey_frame(6, 8, beam_segments=4)
+        self.labels = substructure.grid_modules(self.frame_model, 6.0, 3.5)
+        self.F = generators.nodal_loads(self.frame_model)
+
+    def test_matches_direct_solve(self):
+        system = substructure.SuperelementSystem(self.frame_model, self.labels)
+        U = system.solve(self.F, recover=True)
+        expected = verification.SOLVERS["sparse"][0](self.frame_model, self.F)
+        self.assertLess(verification.relative_error(U, expected), 1e-9)
+
+    def test_repeated_modules_are_condensed_once(self):
+        cache = {}
+        system = substructure.SuperelementSystem(self.frame_model, self.labels, cache=cache)
+        # Storeys with a column above the beam, and the roof beams
+        self.assertEqual(len(system.instances), 6 * 8)
+        self.assertEqual(system.signatures, 2)
+        self.assertEqual(len(cache), 2)
+        # Only the grid nodes are left in the global system
+        self.assertEqual(system.K.shape[0], 7 * 8 * 3)
+
+        taller = generators.multi_storey_frame(6, 12, beam_segments=4)
+        substructure.SuperelementSystem(taller, substructure.grid_modules(taller, 6.0, 3.5), cache=cache)
+        self.assertEqual(len(cache), 2)
+
+    def test_internal_results_on_demand(self):
+        system = substructure.SuperelementSystem(self.frame_model, self.labels)
+        U = system.solve(self.F)
+        self.assertTrue(np.isnan(U[system.internal]).all())
+        self.assertFalse(np.isnan(U[~system.internal]).any())
+        system.recover(U, self.F, instances=[0])
+        recovered = system.instances[0][2]
+        expected = system.solve(self.F, recover=True)
+        np.testing.assert_allclose(U[recovered], expected[recovered])
+        self.assertEqual(int(np.isnan(U).sum()), int(system.internal.sum()) - len(recovered))
+
+if __name__ == '__main__':
+    unittest.main()
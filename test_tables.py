@@ -0,0 +1,41 @@
+import unittest
+import tables
+
+class TestTables(unittest.TestCase):
+
+    def setUp(self):
+        self.nodes = [[0.0, 0.0, "xyZ"], [0.0, 3.0, ""], [4.0, 3.0, ""], [0.0, 3.0, ""]]
+        self.sections = [["W1", "Rectangular", {"b": 0.2, "h": 0.4}, 0], ["W2", "Circular", {"d": 0.3}, 0]]
+        self.elements = [[0.0, 0.0, 0.0, 3.0, "", "", 1], [0.0, 3.0, 4.0, 3.0, "X", "", None]]
+
+    def test_element_rows_round_trip(self):
+        rows = tables.element_rows(self.nodes, self.elements, self.sections)
+        self.assertEqual(rows[0], ["E1", "N1", "N2", "W2", "", ""])
+        # Coincident nodes resolve to the first one; a missing section falls back to the first section
+        self.assertEqual(rows[1], ["E2", "N2", "N3", "W1", "X", ""])
+        elements = tables.elements_from_rows(rows, self.nodes, self.sections)
+        self.assertEqual(elements[0], self.elements[0])
+        self.assertEqual(elements[1][:6], self.elements[1][:6])
+
+    def test_unknown_node_is_rejected(self):
+        rows = [["E1", "N1", "N9", "W1", "", ""]]
+        with self.assertRaises(ValueError):
+            tables.elements_from_rows(rows, self.nodes, self.sections)
+        with self.assertRaises(ValueError):
+            tables.elements_from_rows([["E1", "", "N2", "W1", "", ""]], self.nodes, self.sections)
+
+    def test_node_rows_in_millimetres(self):
+        rows = tables.node_rows(self.nodes, 1000)
+        self.assertEqual(rows[2], ["N3", 4000.0, 3000.0, ""])
+        self.assertEqual(tables.nodes_from_rows(rows, 1000), self.nodes)
+
+    def test_large_model_rows(self):
+        n = 50000
+        nodes = [[float(i), 0.0, ""] for i in range(n + 1)]
+        elements = [[float(i), 0.0, float(i + 1), 0.0, "", "", 0] for i in range(n)]
+        rows = tables.element_rows(nodes, elements, self.sections)
+        self.assertEqual(rows[-1][1:3], [f"N{n}", f"N{n+1}"])
+        self.assertEqual(tables.elements_from_rows(rows, nodes, self.sections), elements)
+
+if __name__ == '__main__':
+    unittest.main()
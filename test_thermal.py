@@ -0,0 +1,77 @@
+import unittest
+import numpy as np
+import generators
+import thermal
+from model import FrameModel
+
+class TestThermal(unittest.TestCase):
+
+    def setUp(self):
+        self.E, self.A, self.I, self.L = 2e8, 0.01, 1e-4, 5.0
+        self.alpha, self.depth = 1.2e-5, 0.3
+
+    def beam(self, end_support, release_end=False):
+        return FrameModel([[0, 0], [self.L, 0]], [[0, 1]], [self.E], [self.A], [self.I], [False], [release_end],
+                          ["xyZ", end_support])
+
+    def solve(self, frame_model, strain, curvature):
+        F = thermal.load_vectors(frame_model, strain, curvature)
+        U = frame_model.reanalysis_system().solve(F)
+        return U, thermal.member_forces(frame_model, U, strain, curvature)
+
+    def test_cantilever_moves_freely(self):
+        frame_model = self.beam("")
+        strain, curvature = thermal.temperature_strains(np.full(1, self.alpha), [[20.0], [0.0]], [[0.0], [10.0]], self.depth)
+        U, forces = self.solve(frame_model, strain, curvature)
+        kappa = -self.alpha * 10.0 / self.depth
+        np.testing.assert_allclose(U[3:, 0], [self.alpha * 20.0 * self.L, 0, 0], atol=1e-15)
+        np.testing.assert_allclose(U[3:, 1], [0, kappa * self.L**2 / 2, kappa * self.L])
+        # Hotter on top: the free end droops
+        self.assertLess(U[4, 1], 0)
+        np.testing.assert_allclose(forces, 0, atol=1e-9)
+
+    def test_restrained_members_carry_the_load(self):
+        frame_model = self.beam("xyZ")
+        U, forces = self.solve(frame_model, self.alpha * 20.0, 0.0)
+        np.testing.assert_array_equal(U, 0)
+        # Compression: N = -f0
+        self.assertAlmostEqual(forces[0, 0, 0], self.E * self.A * self.alpha * 20.0)
+
+        strain = thermal.lack_of_fit(frame_model, [0], [0.002])
+        U, forces = self.solve(frame_model, strain, 0.0)
+        self.assertAlmostEqual(forces[0, 0, 0], self.E * self.A * 0.002 / self.L)
+
+    def test_released_end(self):
+        # A released end at a held node is the same structure as a pin support
+        curvature = -self.alpha * 10.0 / self.depth
+        U, forces = self.solve(self.beam("xy"), 0.0, curvature)
+        U_released, forces_released = self.solve(self.beam("xyZ", release_end=True), 0.0, curvature)
+        np.testing.assert_allclose(U_released[:5], U[:5], atol=1e-15)
+        np.testing.assert_allclose(forces_released, forces, atol=1e-9)
+        # Propped cantilever: fixed-end moment 1.5 EI kappa, none at the pin
+        self.assertAlmostEqual(abs(forces[0, 0, 2]), 1.5 * self.E * self.I * abs(curvature))
+        self.assertAlmostEqual(forces[0, 0, 5], 0, places=9)
+
+    def test_temperature_sweep(self):
+        frame_model = generators.multi_storey_frame(3, 4)
+        alpha = np.full(frame_model.num_elements, self.alpha)
+        depth = np.full(frame_model.num_elements, self.depth)
+        system = frame_model.reanalysis_system()
+        seasons = [-25.0, 0.0, 15.0, 35.0]
+        gradients = [5.0, 0.0, -3.0, 12.0]
+        U = thermal.temperature_sweep(system, frame_model, alpha, seasons, gradients, depth)
+        strain, curvature = thermal.temperature_strains(alpha, np.array(seasons)[:, None], np.array(gradients)[:, None], depth)
+        expected = system.solve(thermal.load_vectors(frame_model, strain, curvature))
+        np.testing.assert_allclose(U, expected, atol=1e-12 * np.abs(expected).max())
+        with self.assertRaisesRegex(ValueError, "depth"):
+            thermal.temperature_strains(alpha, 0.0, 5.0)
+
+    def test_member_alpha(self):
+        frame_model = generators.portal_frame()
+        frame_model.section_index[:] = [0, 1, 0]
+        sections_data = [["S1", "Rectangular", {}, 0], ["S2", "Rectangular", {}, None]]
+        materials_data = [["Steel", 78.5, 2e8, 0.3, 7.7e7, 1.2e-5]]
+        np.testing.assert_array_equal(thermal.member_alpha(frame_model, sections_data, materials_data), [1.2e-5, 0, 1.2e-5])
+
+if __name__ == '__main__':
+    unittest.main()
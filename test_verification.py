@@ -0,0 +1,22 @@
+import unittest
+import verification
+
+class TestVerification(unittest.TestCase):
+
+    def assertAllPassed(self, records):
+        failed = [r for r in records if not r["passed"]]
+        self.assertFalse(failed, "\n" + verification.report(failed))
+
+    def test_closed_form_solutions(self):
+        records = verification.check_closed_form()
+        self.assertAllPassed(records)
+        self.assertEqual({r["solver"] for r in records}, set(verification.SOLVERS))
+
+    def test_random_models_match_reference(self):
+        self.assertAllPassed(verification.check_random([200, 1000], range(2)))
+
+    def test_large_random_models_match_sparse(self):
+        self.assertAllPassed(verification.check_random([5000], range(1)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+import numpy as np
+import fem
+
+# Temperature and initial-strain loads. Every load case is a free axial
+# strain and a free curvature per member:
+#   uniform temperature change dT:       strain = alpha * dT
+#   gradient dT across the depth h:      curvature = -alpha * dT / h (local +y face hotter by dT)
+#   lack of fit (member too long by e):  strain = e / L
+# They become equivalent nodal loads, EA*strain along the member and
+# EI*curvature as end moments, with released end moments moved to the shears
+# as the member's own stiffness does. Strains and curvatures are arrays of
+# shape (cases, elements), so all cases and members are turned into load
+# vectors at once and solved as extra columns against one factorization.
+# The response is linear, so a sweep of temperatures only needs the unit
+# cases (see temperature_sweep).
+
+ALPHA_COLUMN = 5
+
+def member_alpha(frame_model, sections_data, materials_data, default=0.0):
+    # Thermal expansion coefficient of every member from its section's material (materials_data column 5)
+    alpha = np.full(frame_model.num_elements, float(default))
+    for i, section_index in enumerate(frame_model.section_index.tolist()):
+        if 0 <= section_index < len(sections_data):
+            material_index = sections_data[section_index][3]
+            if material_index is not None and 0 <= material_index < len(materials_data):
+                alpha[i] = materials_data[material_index][ALPHA_COLUMN]
+    return alpha
+
+def member_depth(frame_model, section_properties):
+    # Depth of every member's section as 2 Ix / Sx, exact for doubly symmetric sections; NaN without a section
+    depth = np.full(frame_model.num_elements, np.nan)
+    for i, section_index in enumerate(frame_model.section_index.tolist()):
+        if 0 <= section_index < len(section_properties):
+            p = section_properties[section_index]
+            depth[i] = 2 * p["Ix"] / p["Sx"]
+    return depth
+
+def _cases(values, m):
+    return np.atleast_2d(np.broadcast_to(np.asarray(values, dtype=float), np.broadcast_shapes(np.shape(values), (m,))))
+
+def load_projection(frame_model):
+    # Per member matrix that moves the fixed-end loads at released rotations into the other DOFs
+    L, c, s = fem.element_geometry(frame_model.coords, frame_model.connectivity)
+    k = fem.local_stiffness_matrices(L, frame_model.E, frame_model.A, frame_model.I)
+    P = np.broadcast_to(np.eye(6), k.shape).copy()
+    for dof, released in ((2, frame_model.release_start), (5, frame_model.release_end)):
+        mask = np.asarray(released, dtype=bool) & (k[:, dof, dof] != 0)
+        P[mask] -= k[mask, :, dof, None] * P[mask, dof, None, :] / k[mask, dof, dof][:, None, None]
+        P[mask, dof, :] = 0
+        fem._condense_dofs(k, dof, mask)
+    return P
+
+def fixed_end_loads(frame_model, strain=0.0, curvature=0.0, projection=None):
+    # Local equivalent nodal loads, shape (cases, elements, 6)
+    m = frame_model.num_elements
+    strain, curvature = np.broadcast_arrays(_cases(strain, m), _cases(curvature, m))
+    N = frame_model.E * frame_model.A * strain
+    M = frame_model.E * frame_model.I * curvature
+    f = np.zeros(strain.shape + (6,))
+    f[..., 0], f[..., 3] = -N, N
+    f[..., 2], f[..., 5] = -M, M
+    P = load_projection(frame_model) if projection is None else projection
+    return np.einsum('eij,cej->cei', P, f)
+
+def load_vectors(frame_model, strain=0.0, curvature=0.0):
+    # Global load vectors, one column per case
+    L, c, s = fem.element_geometry(frame_model.coords, frame_model.connectivity)
+    T = fem.transformation_matrices(c, s)
+    f = np.einsum('eji,cej->cei', T, fixed_end_loads(frame_model, strain, curvature))
+    F = np.zeros((len(f), frame_model.num_dof))
+    np.add.at(F, (slice(None), fem.element_dof_map(frame_model.connectivity)), f)
+    return F.T
+
+def temperature_strains(alpha, uniform=0.0, gradient=0.0, depth=None):
+    # (strain, curvature) of temperature changes; gradient needs the section depths
+    strain = np.asarray(alpha) * np.asarray(uniform, dtype=float)
+    if np.any(np.asarray(gradient) != 0):
+        if depth is None or np.isnan(np.broadcast_to(depth, np.shape(alpha))).any():
+            raise ValueError("Temperature gradients need the depth of every member.")
+        curvature = -np.asarray(alpha) * np.asarray(gradient, dtype=float) / depth
+    else:
+        curvature = np.zeros_like(strain, dtype=float)
+    return strain, curvature
+
+def lack_of_fit(frame_model, elements, misfit):
+    # Strain case of members fabricated too long (misfit > 0) or too short by misfit
+    L, c, s = fem.element_geometry(frame_model.coords, frame_model.connectivity)
+    strain = np.zeros(frame_model.num_elements)
+    np.add.at(strain, np.asarray(elements, dtype=int), np.asarray(misfit, dtype=float) / L[elements])
+    return strain
+
+def member_forces(frame_model, U, strain=0.0, curvature=0.0):
+    # Local end forces of every member, shape (cases, elements, 6), for displacements U (num_dof, cases)
+    L, c, s = fem.element_geometry(frame_model.coords, frame_model.connectivity)
+    k_local = fem.local_stiffness_matrices(L, frame_model.E, frame_model.A, frame_model.I,
+                                           frame_model.release_start, frame_model.release_end)
+    T = fem.transformation_matrices(c, s)
+    U = np.asarray(U).reshape(frame_model.num_dof, -1)
+    u = np.einsum('eij,ejc->cei', T, U[fem.element_dof_map(frame_model.connectivity)])
+    return np.einsum('eij,cej->cei', k_local, u) - fixed_end_loads(frame_model, strain, curvature)
+
+def temperature_sweep(system, frame_model, alpha, uniform, gradient=None, depth=None):
+    # Displacements (num_dof, len(uniform)) for a series of temperature changes applied to every member,
+    # from one solve of the unit cases
+    unit = [temperature_strains(alpha, 1.0)]
+    if gradient is not None:
+        unit.append(temperature_strains(alpha, 0.0, 1.0, depth))
+    F = np.column_stack([load_vectors(frame_model, strain, curvature) for strain, curvature in unit])
+    U = system.solve(F)
+    factors = np.atleast_2d(np.asarray(uniform, dtype=float))
+    if gradient is not None:
+        factors = np.vstack([factors, np.broadcast_to(np.asarray(gradient, dtype=float), factors.shape[1:])])
+    return U @ factors
@@ -0,0 +1,198 @@
+import argparse
+import numpy as np
+import domain
+import fem
+import generators
+import substructure
+from benchmark import REFERENCE_LIMIT
+from model import FrameModel
+
+# Every solver path takes (frame_model, F, prescribed) and returns the full
+# displacement vector. Paths that cannot impose settlements register with
+# settlements=False and are skipped for those cases.
+SOLVERS = {}
+
+def register_solver(name, func, settlements=True):
+    SOLVERS[name] = (func, settlements)
+
+def _reference_solver(frame_model, F, prescribed=None):
+    nodes = [fem.Node(x, y) for x, y in frame_model.coords]
+    elements = [fem.FrameElement(nodes[a], nodes[b], frame_model.E[i], frame_model.A[i], frame_model.I[i],
+                                 "X" if frame_model.release_start[i] else "", "Y" if frame_model.release_end[i] else "")
+                for i, (a, b) in enumerate(frame_model.connectivity)]
+    K = fem.assemble_stiffness_matrix(elements, nodes)
+    return fem.solve(K, F, frame_model.boundary_conditions(), prescribed)
+
+def batched_stiffness_matrix(frame_model, sparse=True):
+    L, c, s = fem.element_geometry(frame_model.coords, frame_model.connectivity)
+    k_local = fem.local_stiffness_matrices(L, frame_model.E, frame_model.A, frame_model.I,
+                                           frame_model.release_start, frame_model.release_end)
+    k_global = fem.to_global(k_local, fem.transformation_matrices(c, s))
+    return fem.assemble_global_matrix(k_global, fem.element_dof_map(frame_model.connectivity), frame_model.num_dof, sparse)
+
+def _dense_solver(frame_model, F, prescribed=None):
+    return fem.solve(batched_stiffness_matrix(frame_model, sparse=False), F, frame_model.boundary_conditions(), prescribed)
+
+def _sparse_solver(frame_model, F, prescribed=None):
+    return fem.solve(batched_stiffness_matrix(frame_model, sparse=True), F, frame_model.boundary_conditions(), prescribed)
+
+def _mixed_solver(frame_model, F, prescribed=None):
+    return fem.solve(batched_stiffness_matrix(frame_model, sparse=False), F, frame_model.boundary_conditions(), prescribed,
+                     precision="mixed")
+
+def _threaded_solver(frame_model, F, prescribed=None):
+    K = fem.assemble_threaded(frame_model.coords, frame_model.connectivity, frame_model.E, frame_model.A, frame_model.I,
+                              frame_model.release_start, frame_model.release_end, chunk=256)
+    return fem.solve(K, F, frame_model.boundary_conditions(), prescribed)
+
+def _reanalysis_solver(frame_model, F, prescribed=None):
+    return frame_model.reanalysis_system().solve(F)
+
+def _substructure_solver(frame_model, F, prescribed=None):
+    # Modules of about 16 members on a square grid
+    extent = max(np.ptp(frame_model.coords, axis=0).max(), 1e-9)
+    cell = extent / max(2.0, np.sqrt(frame_model.num_elements / 16))
+    labels = substructure.grid_modules(frame_model, cell, cell)
+    return substructure.SuperelementSystem(frame_model, labels).solve(F, recover=True)
+
+def _domain_solver(frame_model, F, prescribed=None):
+    with domain.DomainSolver(frame_model, parts=3) as solver:
+        return solver.solve(F)
+
+register_solver("reference", _reference_solver)
+register_solver("dense", _dense_solver)
+register_solver("sparse", _sparse_solver)
+register_solver("threaded", _threaded_solver)
+register_solver("mixed", _mixed_solver)
+register_solver("reanalysis", _reanalysis_solver, settlements=False)
+register_solver("substructure", _substructure_solver, settlements=False)
+register_solver("domain", _domain_solver, settlements=False)
+
+def relative_error(actual, expected):
+    scale = np.max(np.abs(expected))
+    return float(np.max(np.abs(np.asarray(actual) - expected)) / (scale if scale > 0 else 1.0))
+
+# ---------------- Closed-form cases ----------------
+E, A, I, P, L = 2e8, 0.01, 1e-4, 10.0, 4.0
+
+def _beam(num_elements, supports, release_start=None, release_end=None, length=L):
+    coords = np.column_stack([np.linspace(0, length, num_elements + 1), np.zeros(num_elements + 1)])
+    connectivity = np.column_stack([np.arange(num_elements), np.arange(1, num_elements + 1)])
+    node_supports = [""] * (num_elements + 1)
+    for node, support in supports.items():
+        node_supports[node] = support
+    release_start = np.zeros(num_elements, dtype=bool) if release_start is None else release_start
+    release_end = np.zeros(num_elements, dtype=bool) if release_end is None else release_end
+    return FrameModel(coords, connectivity, np.full(num_elements, E), np.full(num_elements, A), np.full(num_elements, I),
+                      release_start, release_end, node_supports)
+
+def closed_form_cases():
+    # (name, model, F, prescribed or None, checked DOF, expected value, tolerance or None)
+    cases = []
+
+    cantilever = _beam(4, {0: "xyZ"})
+    F = np.zeros(cantilever.num_dof)
+    F[13] = -P
+    cases.append(("cantilever tip deflection", cantilever, F, None, 13, -P * L**3 / (3 * E * I), None))
+    cases.append(("cantilever tip rotation", cantilever, F, None, 14, -P * L**2 / (2 * E * I), None))
+    F = np.zeros(cantilever.num_dof)
+    F[12] = P
+    cases.append(("cantilever axial extension", cantilever, F, None, 12, P * L / (E * A), None))
+
+    fixed = _beam(2, {0: "xyZ", 2: "xyZ"})
+    F = np.zeros(fixed.num_dof)
+    F[4] = -P
+    cases.append(("fixed-fixed midspan deflection", fixed, F, None, 4, -P * L**3 / (192 * E * I), None))
+
+    # Simply supported span built from fixed supports and moment releases at both ends
+    released = _beam(2, {0: "xyZ", 2: "xyZ"}, np.array([True, False]), np.array([False, True]))
+    F = np.zeros(released.num_dof)
+    F[4] = -P
+    cases.append(("released ends midspan deflection", released, F, None, 4, -P * L**3 / (48 * E * I), None))
+
+    # Fixed-fixed beam with the right support settling by delta: midspan moves delta / 2
+    settled = _beam(2, {0: "xyZ", 2: "xyZ"})
+    delta = -0.01
+    prescribed = np.zeros(settled.num_dof)
+    prescribed[7] = delta
+    cases.append(("fixed-fixed support settlement", settled, np.zeros(settled.num_dof), prescribed, 4, delta / 2, None))
+    cases.append(("fixed-fixed settlement midspan rotation", settled, np.zeros(settled.num_dof), prescribed, 5,
+                  3 * delta / (2 * L), None))
+
+    # Fixed-base portal with a rigid beam: sway = H h^3 / (24 E I)
+    height, width = 3.0, 6.0
+    portal = FrameModel([(0, 0), (0, height), (width, height), (width, 0)], [(0, 1), (1, 2), (2, 3)],
+                        np.full(3, E), np.array([A * 1e4, A * 1e4, A * 1e4]), np.array([I, I * 1e6, I]),
+                        np.zeros(3), np.zeros(3), ["xyZ", "", "", "xyZ"])
+    F = np.zeros(portal.num_dof)
+    F[3] = P
+    # The beam is only nearly rigid, so the match is approximate
+    cases.append(("portal frame sway", portal, F, None, 3, P * height**3 / (24 * E * I), 1e-4))
+    return cases
+
+def check_closed_form(tolerance=1e-9):
+    records = []
+    for name, frame_model, F, prescribed, dof, expected, case_tolerance in closed_form_cases():
+        for solver_name, (solver, settlements) in SOLVERS.items():
+            if prescribed is not None and not settlements:
+                continue
+            value = solver(frame_model, F, prescribed)[dof]
+            error = relative_error(value, expected)
+            records.append({"case": name, "solver": solver_name, "expected": expected, "actual": float(value),
+                            "error": error, "passed": error <= (case_tolerance or tolerance)})
+    return records
+
+# ---------------- Randomized comparisons ----------------
+def random_model(size, seed):
+    # Random mesh with random member properties and pin-ended diagonals
+    rng = np.random.default_rng(seed)
+    frame_model = generators.model_of_size("random", size, seed)
+    m = frame_model.num_elements
+    frame_model.E = rng.uniform(0.5, 2.0, m) * generators.E_STEEL
+    frame_model.A = rng.uniform(0.5, 2.0, m) * generators.A_DEFAULT
+    frame_model.I = rng.uniform(0.5, 2.0, m) * generators.I_DEFAULT
+    d = frame_model.coords[frame_model.connectivity[:, 1]] - frame_model.coords[frame_model.connectivity[:, 0]]
+    diagonal = (np.abs(d[:, 0]) > 1.0) & (np.abs(d[:, 1]) > 1.0)
+    frame_model.release_start = diagonal & (rng.random(m) < 0.5)
+    frame_model.release_end = diagonal & (rng.random(m) < 0.5)
+    return frame_model
+
+def check_random(sizes, seeds, tolerance=1e-8):
+    # Each solver against the reference path, or against the sparse direct path above REFERENCE_LIMIT
+    records = []
+    for size in sizes:
+        for seed in seeds:
+            frame_model = random_model(size, seed)
+            rng = np.random.default_rng(seed + 1)
+            F = rng.normal(size=frame_model.num_dof)
+            baseline = "reference" if frame_model.num_elements <= REFERENCE_LIMIT else "sparse"
+            expected = SOLVERS[baseline][0](frame_model, F)
+            for solver_name, (solver, settlements) in SOLVERS.items():
+                if solver_name == baseline or (solver_name == "reference" and baseline != "reference"):
+                    continue
+                error = relative_error(solver(frame_model, F), expected)
+                records.append({"case": f"random size={size} seed={seed}", "solver": solver_name, "baseline": baseline,
+                                "elements": frame_model.num_elements, "error": error, "passed": error <= tolerance})
+    return records
+
+def report(records):
+    lines = [f"{'case':42} {'solver':12} {'rel. error':>12}  result"]
+    for r in records:
+        lines.append(f"{r['case']:42} {r['solver']:12} {r['error']:12.3e}  {'ok' if r['passed'] else 'FAIL'}")
+    return "\n".join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare every solver path against closed-form and reference results.")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[100, 1000, 10000])
+    parser.add_argument("--seeds", type=int, default=3)
+    parser.add_argument("--tolerance", type=float, default=1e-8)
+    args = parser.parse_args(argv)
+
+    records = check_closed_form() + check_random(args.sizes, range(args.seeds), args.tolerance)
+    print(report(records))
+    failed = [r for r in records if not r["passed"]]
+    print(f"\n{len(records) - len(failed)} passed, {len(failed)} failed")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())